@@ -0,0 +1,185 @@
+// Memory benchmark: server heap held per idle connection
+// Run with: ulimit -n 250000 && node --expose-gc bench/connection-memory.js
+//     [--connections 10000,50000,100000] [--synthetic]
+//
+// Forks server.js (see server-process.js) and, for each count, connects that many real
+// socket.io clients over websocket, sets a hobby on each and compares the server's post-GC
+// heap before and after over IPC. The difference per connection is everything the server
+// keeps for an idle user: the Socket.io socket, its engine.io connection and websocket, and
+// the per-connection state in socket.data. Clients disconnect again between counts.
+//
+// One source address can only hold about 28k connections to the server (the ephemeral port
+// range), so clients are spread over loopback source addresses 127.0.0.1, 127.0.0.2, ...
+// Both processes hold one descriptor per connection: raise the open-file limit above the
+// largest count first.
+//
+// --synthetic also prints the struct-layout comparison (legacy userInfo object vs compact
+// socket.data fields). It measures stand-in objects in this process, not sockets, and only
+// shows the difference between the two layouts.
+const crypto = require('crypto');
+const dictionary = require('../utils/dictionary');
+const { countryList } = require('../utils/countries');
+const { io: connect } = require('socket.io-client');
+const { sleep, startServer, request, once } = require('./server-process');
+
+const HOBBIES = ['singing', 'dancing', 'music', 'coding', 'gaming', 'art', 'books', 'travel'];
+const DEFAULT_CONNECTIONS = [10000, 50000, 100000];
+const SYNTHETIC_SIZES = [10000, 50000, 100000];
+const CONNECT_BATCH = 250;
+const CONNECTIONS_PER_SOURCE_ADDRESS = 20000;
+const SETTLE_MS = 1000;
+
+function parseArgs(argv) {
+    const args = { connections: DEFAULT_CONNECTIONS, synthetic: false };
+    for (let i = 0; i < argv.length; i++) {
+        if (argv[i] === '--synthetic') {
+            args.synthetic = true;
+        } else if (argv[i] === '--connections') {
+            args.connections = argv[++i].split(',').map(Number).filter(Boolean);
+        }
+    }
+    return args;
+}
+
+// Connect count clients in batches; each has its session and a hobby set
+async function connectClients(url, count) {
+    const clients = [];
+    for (let offset = 0; offset < count; offset += CONNECT_BATCH) {
+        const batch = await Promise.all(Array.from({ length: Math.min(CONNECT_BATCH, count - offset) }, async (_, i) => {
+            const index = offset + i;
+            const client = connect(url, {
+                transports: ['websocket'],
+                forceNew: true,
+                reconnection: false,
+                localAddress: `127.0.0.${1 + Math.floor(index / CONNECTIONS_PER_SOURCE_ADDRESS)}`
+            });
+            if (!await once(client, 'session', 10000)) {
+                throw new Error(`client ${index} did not get a session (is the open-file limit high enough?)`);
+            }
+            client.emit('set-hobby-preference', HOBBIES[index % HOBBIES.length]);
+            return client;
+        }));
+        clients.push(...batch);
+    }
+    return clients;
+}
+
+async function measureSockets(child, url, count) {
+    const before = await request(child, 'soak-snapshot');
+    const clients = await connectClients(url, count);
+    await sleep(SETTLE_MS);
+    const after = await request(child, 'soak-snapshot');
+
+    const connected = after.sizes.sockets - before.sizes.sockets;
+    clients.forEach(client => client.disconnect());
+    await sleep(SETTLE_MS);
+
+    if (connected !== count) {
+        throw new Error(`expected ${count} new sockets on the server, found ${connected}`);
+    }
+    return {
+        connections: count,
+        bytesPerConnection: Math.round((after.heapUsed - before.heapUsed) / count),
+        serverHeapMB: Number((after.heapUsed / 1048576).toFixed(1))
+    };
+}
+
+// Synthetic comparison: stand-in objects with only the fields the server sets, no sockets
+
+function heapUsed() {
+    global.gc();
+    global.gc();
+    return process.memoryUsage().heapUsed;
+}
+
+function createStandIn() {
+    return { id: crypto.randomBytes(15).toString('base64url'), data: {} };
+}
+
+// Stand-ins get varied countries and hobbies, as located users would have
+function countryOf(index) {
+    return countryList[index % countryList.length];
+}
+
+function hobbyOf(index) {
+    return HOBBIES[index % HOBBIES.length];
+}
+
+// Previous layout: userInfo object with a Date plus a duplicate userSockets entry
+function legacyState(sockets) {
+    const userSockets = new Map();
+    sockets.forEach((socket, index) => {
+        const country = countryOf(index);
+        userSockets.set(socket.id, socket);
+        socket.userInfo = {
+            id: socket.id,
+            hobby: hobbyOf(index),
+            country: country.country,
+            countryCode: country.countryCode,
+            flag: country.flag,
+            connectedAt: new Date()
+        };
+    });
+    return userSockets;
+}
+
+// Current layout: integer id, interned codes and a numeric timestamp on socket.data
+function compactState(sockets) {
+    let nextUserId = 1;
+    sockets.forEach((socket, index) => {
+        socket.data.uid = nextUserId++;
+        socket.data.hobby = dictionary.getHobbyCode(hobbyOf(index));
+        socket.data.country = dictionary.getCountryCode(countryOf(index).countryCode);
+        socket.data.connectedAt = Date.now();
+    });
+    return null;
+}
+
+function measureLayout(layout, count) {
+    const sockets = Array.from({ length: count }, createStandIn);
+    const before = heapUsed();
+    const retained = layout(sockets);
+    const after = heapUsed();
+
+    // Keep both alive until after the measurement
+    if (retained && retained.size !== count) {
+        throw new Error('unexpected state size');
+    }
+    return Math.round((after - before) / count);
+}
+
+async function main() {
+    const args = parseArgs(process.argv.slice(2));
+    if (args.synthetic && typeof global.gc !== 'function') {
+        throw new Error('--synthetic needs --expose-gc for stable numbers');
+    }
+
+    const { child, url } = await startServer();
+    const results = [];
+    try {
+        for (const count of args.connections) {
+            results.push(await measureSockets(child, url, count));
+        }
+    } finally {
+        child.kill('SIGKILL');
+    }
+
+    console.log('Server heap per idle connection (real Socket.io connections, post-GC delta)');
+    console.log('socket.data.country is 0 (Unknown) for every connection: the server does not geolocate');
+    console.table(results);
+
+    if (args.synthetic) {
+        console.log('\nSYNTHETIC - per-connection state layouts on stand-in objects, not real sockets');
+        console.table(SYNTHETIC_SIZES.map(count => ({
+            objects: count,
+            legacyStateBytes: measureLayout(legacyState, count),
+            compactStateBytes: measureLayout(compactState, count)
+        })));
+    }
+    process.exit(0);
+}
+
+main().catch((error) => {
+    console.error(error);
+    process.exit(1);
+});
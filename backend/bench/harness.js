@@ -0,0 +1,116 @@
+// Minimal microbenchmark harness
+// A benchmark is a function run in timed rounds after a warm-up. The iteration count is
+// calibrated once so a round takes about ROUND_MS; each round yields ns/op and the
+// report keeps the median and spread across rounds. Fixtures use a seeded PRNG so every
+// run, on every commit, measures the same inputs.
+
+const WARMUP_MS = 200;
+const ROUND_MS = 50;
+const ROUNDS = 15;
+
+/**
+ * Seeded PRNG (mulberry32) returning floats in [0, 1)
+ */
+function random(seed) {
+    let state = seed >>> 0;
+    return () => {
+        state = (state + 0x6D2B79F5) >>> 0;
+        let t = state;
+        t = Math.imul(t ^ (t >>> 15), t | 1);
+        t ^= t + Math.imul(t ^ (t >>> 7), t | 61);
+        return ((t ^ (t >>> 14)) >>> 0) / 4294967296;
+    };
+}
+
+function now() {
+    return Number(process.hrtime.bigint());
+}
+
+async function timeLoop(fn, iterations, isAsync) {
+    const started = now();
+    if (isAsync) {
+        for (let i = 0; i < iterations; i++) {
+            await fn(i);
+        }
+    } else {
+        for (let i = 0; i < iterations; i++) {
+            fn(i);
+        }
+    }
+    return now() - started;
+}
+
+class Suite {
+    constructor(name) {
+        this.name = name;
+        this.benchmarks = [];
+        this.notes = {};
+    }
+
+    /**
+     * Record a non-timing figure (payload size, fixture size) alongside the results
+     */
+    note(name, value) {
+        this.notes[`${this.name}/${name}`] = value;
+        return this;
+    }
+
+    /**
+     * @param {string} name
+     * @param {Function} fn - called with the iteration index; may return a promise
+     */
+    add(name, fn) {
+        this.benchmarks.push({ name: `${this.name}/${name}`, fn });
+        return this;
+    }
+}
+
+/**
+ * Run one benchmark; console output from the code under test is muted while timing
+ */
+async function measure(fn) {
+    const log = console.log;
+    const warn = console.warn;
+    console.log = console.warn = () => {};
+
+    try {
+        const isAsync = typeof (fn(0) || {}).then === 'function';
+
+        // Warm up and calibrate the iteration count for one round
+        let iterations = 1;
+        let elapsed = 0;
+        const warmupEnd = now() + WARMUP_MS * 1e6;
+        while (now() < warmupEnd) {
+            elapsed = await timeLoop(fn, iterations, isAsync);
+            if (elapsed < ROUND_MS * 1e6 / 2) {
+                iterations *= 2;
+            }
+        }
+        iterations = Math.max(1, Math.round(iterations * ROUND_MS * 1e6 / Math.max(elapsed, 1)));
+
+        const samples = [];
+        for (let round = 0; round < ROUNDS; round++) {
+            samples.push(await timeLoop(fn, iterations, isAsync) / iterations);
+        }
+        samples.sort((a, b) => a - b);
+
+        const median = samples[Math.floor(samples.length / 2)];
+        return {
+            nsPerOp: +median.toFixed(1),
+            minNs: +samples[0].toFixed(1),
+            maxNs: +samples[samples.length - 1].toFixed(1),
+            opsPerSec: Math.round(1e9 / median),
+            iterations,
+            rounds: ROUNDS
+        };
+    } finally {
+        console.log = log;
+        console.warn = warn;
+    }
+}
+
+module.exports = {
+    Suite,
+    measure,
+    random
+};
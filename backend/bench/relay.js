@@ -0,0 +1,132 @@
+// Relay benchmark: server-side cost of forwarding one signaling message to a partner
+// Run with: node bench/relay.js [messages]
+//
+// Two real clients connect over websocket to an in-process Socket.io server. Each path
+// relays the same ICE-candidate-sized payload from one to the other:
+//   map-lookup    io.sockets.sockets.get(partnerId).emit()   (previous server.js)
+//   room-emit     socket.to(partnerId).emit()                 (script_1.py style)
+//   adapter       io.to(partnerId).emit()                     (bare adapter message)
+//   relay         Relay.forward() to a local partner          (server.js: WeakRef + send queue)
+//   relay-remote  Relay.forward() without a local pointer     (server.js cross-process fallback)
+// Messages go out in bursts of BURST, twice the send queue's default high-water mark, so
+// the relay paths also pay for queueing and the drain flush as a busy server would. Only the
+// server-side loops are timed; each burst is received before the next so queued frames do
+// not leak into the next measurement.
+const http = require('http');
+const { Server } = require('socket.io');
+const { io: connect } = require('socket.io-client');
+const config = require('../config/environment');
+const Relay = require('../utils/relay');
+
+const MESSAGES = parseInt(process.argv[2]) || 100000;
+const ROUNDS = 5;
+const BURST = 64;
+
+const payload = {
+    candidate: {
+        candidate: 'candidate:842163049 1 udp 1677729535 203.0.113.7 46154 typ srflx raddr 0.0.0.0 rport 0 generation 0',
+        sdpMid: '0',
+        sdpMLineIndex: 0
+    },
+    from: 'bench'
+};
+
+const paths = {
+    'map-lookup': ({ io, sender }) => {
+        io.sockets.sockets.get(sender.partnerId).emit('ice-candidate', payload);
+    },
+    'room-emit': ({ sender }) => {
+        sender.to(sender.partnerId).emit('ice-candidate', payload);
+    },
+    'adapter': ({ io, sender }) => {
+        io.to(sender.partnerId).emit('ice-candidate', payload);
+    },
+    'relay': ({ relay, sender }) => {
+        relay.forward(sender, 'ice-candidate', payload);
+    },
+    'relay-remote': ({ relay, remoteSender }) => {
+        relay.forward(remoteSender, 'ice-candidate', payload);
+    }
+};
+
+function waitFor(emitter, event) {
+    return new Promise((resolve) => emitter.once(event, resolve));
+}
+
+// Resolve once the receiving client has seen `count` more messages
+function received(client, count) {
+    return new Promise((resolve) => {
+        let seen = 0;
+        const onMessage = () => {
+            if (++seen === count) {
+                client.off('ice-candidate', onMessage);
+                resolve();
+            }
+        };
+        client.on('ice-candidate', onMessage);
+    });
+}
+
+async function main() {
+    const httpServer = http.createServer();
+    const io = new Server(httpServer, { transports: ['websocket'] });
+    await new Promise((resolve) => httpServer.listen(0, resolve));
+    const url = `http://localhost:${httpServer.address().port}`;
+
+    const connected = [];
+    io.on('connection', (socket) => connected.push(socket));
+
+    const sender = connect(url, { transports: ['websocket'] });
+    const receiver = connect(url, { transports: ['websocket'] });
+    await Promise.all([waitFor(sender, 'connect'), waitFor(receiver, 'connect')]);
+
+    const senderSocket = connected.find((socket) => socket.id === sender.id);
+    const receiverSocket = connected.find((socket) => socket.id === receiver.id);
+    // The same Relay server.js uses, with its send-queue settings
+    const relay = new Relay({
+        io,
+        highWater: config.OUTBOUND_HIGH_WATER,
+        limit: config.OUTBOUND_QUEUE_LIMIT,
+        metrics: { queued: 0, peakDepth: 0, coalesced: 0, dropped: 0, slowDisconnects: 0 }
+    });
+    relay.pair(senderSocket, receiverSocket);
+
+    // A sender whose partner is on another node: only the partner id is known
+    const remoteSender = { id: senderSocket.id, partnerId: receiverSocket.id };
+    const context = { io, relay, sender: senderSocket, remoteSender };
+
+    console.log(`Relaying ${MESSAGES} messages per round, best of ${ROUNDS}\n`);
+    const results = {};
+
+    for (const [name, path] of Object.entries(paths)) {
+        let best = Infinity;
+        for (let round = 0; round < ROUNDS; round++) {
+            let elapsed = 0;
+            for (let sent = 0; sent < MESSAGES; sent += BURST) {
+                const count = Math.min(BURST, MESSAGES - sent);
+                const done = received(receiver, count);
+                const started = process.hrtime.bigint();
+                for (let i = 0; i < count; i++) {
+                    path(context);
+                }
+                elapsed += Number(process.hrtime.bigint() - started);
+                await done;
+            }
+            best = Math.min(best, elapsed / MESSAGES);
+        }
+        results[name] = best;
+        console.log(`${name.padEnd(13)} ${best.toFixed(0).padStart(6)} ns/message`);
+    }
+
+    console.log(`\nrelay vs map-lookup: ${(results['map-lookup'] / results.relay).toFixed(2)}x`);
+    console.log(`relay vs room-emit:  ${(results['room-emit'] / results.relay).toFixed(2)}x`);
+
+    sender.close();
+    receiver.close();
+    io.close();
+}
+
+main().catch((error) => {
+    console.error(error);
+    process.exit(1);
+});
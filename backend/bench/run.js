@@ -0,0 +1,90 @@
+// Microbenchmark runner: backend hot paths, JSON output for comparing commits
+// Run with: node bench/run.js [--filter regex] [--out file] [--compare baseline.json]
+//
+// Loads every suite in bench/suites, runs the benchmarks whose name matches --filter
+// and writes { commit, node, timestamp, results, notes } as JSON (stdout by default).
+// With --compare, a table of ns/op deltas against an earlier run goes to stderr.
+const fs = require('fs');
+const path = require('path');
+const { execSync } = require('child_process');
+const { Suite, measure } = require('./harness');
+
+function parseArgs(argv) {
+    const args = {};
+    for (let i = 0; i < argv.length; i += 2) {
+        args[argv[i].replace(/^--/, '')] = argv[i + 1];
+    }
+    return args;
+}
+
+function gitCommit() {
+    try {
+        return execSync('git rev-parse --short HEAD', { stdio: ['ignore', 'pipe', 'ignore'] }).toString().trim();
+    } catch (error) {
+        return null;
+    }
+}
+
+async function main() {
+    const args = parseArgs(process.argv.slice(2));
+    const filter = args.filter ? new RegExp(args.filter) : null;
+
+    const suitesDir = path.join(__dirname, 'suites');
+    const suites = fs.readdirSync(suitesDir)
+        .filter(name => name.endsWith('.js'))
+        .sort()
+        .map(name => {
+            const suite = new Suite(path.basename(name, '.js'));
+            require(path.join(suitesDir, name))(suite);
+            return suite;
+        });
+
+    const results = {};
+    const notes = {};
+    for (const suite of suites) {
+        Object.assign(notes, suite.notes);
+        for (const { name, fn } of suite.benchmarks) {
+            if (filter && !filter.test(name)) {
+                continue;
+            }
+            results[name] = await measure(fn);
+            console.error(`${name.padEnd(60)} ${String(results[name].nsPerOp).padStart(12)} ns/op`);
+        }
+    }
+
+    const report = {
+        commit: gitCommit(),
+        node: process.version,
+        timestamp: new Date().toISOString(),
+        results,
+        notes
+    };
+
+    if (args.compare) {
+        const baseline = JSON.parse(fs.readFileSync(args.compare, 'utf8'));
+        console.error(`\nCompared with ${baseline.commit || args.compare}:`);
+        console.table(Object.entries(results)
+            .filter(([name]) => baseline.results[name])
+            .map(([name, result]) => ({
+                benchmark: name,
+                baselineNs: baseline.results[name].nsPerOp,
+                currentNs: result.nsPerOp,
+                change: `${((result.nsPerOp / baseline.results[name].nsPerOp - 1) * 100).toFixed(1)}%`
+            })));
+    }
+
+    const output = JSON.stringify(report, null, 2);
+    if (args.out) {
+        fs.writeFileSync(args.out, output);
+    } else {
+        process.stdout.write(output + '\n');
+    }
+
+    // Modules under test keep timers (cache sweeps, rate-limit windows) alive
+    process.exit(0);
+}
+
+main().catch((error) => {
+    console.error(error);
+    process.exit(1);
+});
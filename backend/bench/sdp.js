@@ -0,0 +1,146 @@
+// SDP compaction benchmark: bytes per session and modeled signaling time on slow links
+// Run with: node bench/sdp.js
+//
+// Uses a Chrome-shaped audio+video offer. Reports the raw, compacted and deflated sizes,
+// the compaction CPU cost, and the one-way delivery time of the offer plus the answer
+// on a few link profiles - the part of time-to-first-frame that SDP size controls.
+// Live time-to-first-frame is reported by clients in /api/chat/stats.
+const zlib = require('zlib');
+const { compactSdp } = require('../utils/sdp');
+
+const ITERATIONS = 20000;
+
+const LINKS = [
+    { name: 'wifi', kbps: 20000, rttMs: 20 },
+    { name: '4g', kbps: 5000, rttMs: 60 },
+    { name: '3g (poor)', kbps: 400, rttMs: 300 },
+    { name: 'edge', kbps: 100, rttMs: 500 }
+];
+
+function mediaSection(kind, codecs, extensions) {
+    const payloadTypes = codecs.map(([payloadType]) => payloadType);
+    const lines = [
+        `m=${kind} 9 UDP/TLS/RTP/SAVPF ${payloadTypes.join(' ')}`,
+        'c=IN IP4 0.0.0.0',
+        'a=rtcp:9 IN IP4 0.0.0.0',
+        'a=ice-ufrag:Zx7q',
+        'a=ice-pwd:3bqjW0p9Yv8Z2l0vEo1Z6v2N',
+        'a=ice-options:trickle',
+        'a=fingerprint:sha-256 7B:8B:F0:65:5F:78:E2:51:3B:AC:6F:F3:3F:46:1B:35:DC:B8:5F:64:1A:24:C2:43:F0:A1:58:D0:A1:2C:19:08',
+        'a=setup:actpass',
+        `a=mid:${kind === 'audio' ? 0 : 1}`
+    ];
+    extensions.forEach((uri, i) => lines.push(`a=extmap:${i + 1} ${uri}`));
+    lines.push('a=sendrecv', 'a=msid:stream track-' + kind, 'a=rtcp-mux');
+    if (kind === 'video') {
+        lines.push('a=rtcp-rsize');
+    }
+    for (const [payloadType, rtpmap, fmtp, feedback] of codecs) {
+        lines.push(`a=rtpmap:${payloadType} ${rtpmap}`);
+        for (const fb of feedback || []) {
+            lines.push(`a=rtcp-fb:${payloadType} ${fb}`);
+        }
+        if (fmtp) {
+            lines.push(`a=fmtp:${payloadType} ${fmtp}`);
+        }
+    }
+    lines.push(`a=ssrc:1001 cname:bench${kind}`, `a=ssrc:1001 msid:stream track-${kind}`);
+    return lines;
+}
+
+function chromeOffer() {
+    const videoFeedback = ['goog-remb', 'transport-cc', 'ccm fir', 'nack', 'nack pli'];
+    const h264 = (payloadType, profile, mode) => [
+        payloadType, 'H264/90000', `level-asymmetry-allowed=1;packetization-mode=${mode};profile-level-id=${profile}`, videoFeedback
+    ];
+    const rtx = (payloadType, apt) => [payloadType, 'rtx/90000', `apt=${apt}`];
+
+    const audio = mediaSection('audio', [
+        [111, 'opus/48000/2', 'minptime=10;useinbandfec=1', ['transport-cc']],
+        [63, 'red/48000/2', '111/111'],
+        [9, 'G722/8000'], [0, 'PCMU/8000'], [8, 'PCMA/8000'], [13, 'CN/8000'],
+        [110, 'telephone-event/48000'], [126, 'telephone-event/8000']
+    ], [
+        'urn:ietf:params:rtp-hdrext:ssrc-audio-level',
+        'http://www.webrtc.org/experiments/rtp-hdrext/abs-send-time',
+        'http://www.ietf.org/id/draft-holmer-rmcat-transport-wide-cc-extensions-01',
+        'urn:ietf:params:rtp-hdrext:sdes:mid'
+    ]);
+
+    const video = mediaSection('video', [
+        [96, 'VP8/90000', null, videoFeedback], rtx(97, 96),
+        [98, 'VP9/90000', 'profile-id=0', videoFeedback], rtx(99, 98),
+        [100, 'VP9/90000', 'profile-id=2', videoFeedback], rtx(101, 100),
+        h264(102, '42001f', 1), rtx(103, 102),
+        h264(104, '42001f', 0), rtx(105, 104),
+        h264(106, '42e01f', 1), rtx(107, 106),
+        h264(108, '42e01f', 0), rtx(109, 108),
+        h264(127, '4d001f', 1), rtx(125, 127),
+        h264(39, '4d001f', 0), rtx(40, 39),
+        [45, 'AV1/90000', 'level-idx=5;profile=0;tier=0', videoFeedback], rtx(46, 45),
+        h264(112, '64001f', 1), rtx(113, 112),
+        [114, 'red/90000'], rtx(115, 114),
+        [116, 'ulpfec/90000']
+    ], [
+        'urn:ietf:params:rtp-hdrext:toffset',
+        'http://www.webrtc.org/experiments/rtp-hdrext/abs-send-time',
+        'urn:3gpp:video-orientation',
+        'http://www.ietf.org/id/draft-holmer-rmcat-transport-wide-cc-extensions-01',
+        'http://www.webrtc.org/experiments/rtp-hdrext/playout-delay',
+        'http://www.webrtc.org/experiments/rtp-hdrext/video-content-type',
+        'http://www.webrtc.org/experiments/rtp-hdrext/video-timing',
+        'http://www.webrtc.org/experiments/rtp-hdrext/color-space',
+        'urn:ietf:params:rtp-hdrext:sdes:mid',
+        'urn:ietf:params:rtp-hdrext:sdes:rtp-stream-id',
+        'urn:ietf:params:rtp-hdrext:sdes:repaired-rtp-stream-id'
+    ]);
+
+    return [
+        'v=0', 'o=- 4611731400430051336 2 IN IP4 127.0.0.1', 's=-', 't=0 0',
+        'a=group:BUNDLE 0 1', 'a=extmap-allow-mixed', 'a=msid-semantic: WMS stream',
+        ...audio, ...video, ''
+    ].join('\r\n');
+}
+
+function sizes(sdp) {
+    const frame = JSON.stringify({ offer: { type: 'offer', sdp } });
+    return {
+        sdp: Buffer.byteLength(sdp),
+        deflated: zlib.deflateRawSync(frame, { level: 1 }).length
+    };
+}
+
+// One-way delivery of offer and answer: half an RTT plus serialization each
+function signalingMs(link, offerBytes, answerBytes) {
+    const transfer = (bytes) => link.rttMs / 2 + bytes * 8 / link.kbps;
+    return transfer(offerBytes) + transfer(answerBytes);
+}
+
+const offer = chromeOffer();
+const compacted = compactSdp(offer);
+
+for (let i = 0; i < 1000; i++) {
+    compactSdp(offer);
+}
+const started = process.hrtime.bigint();
+for (let i = 0; i < ITERATIONS; i++) {
+    compactSdp(offer);
+}
+const compactUs = Number(process.hrtime.bigint() - started) / ITERATIONS / 1000;
+
+const raw = sizes(offer);
+const compact = sizes(compacted);
+
+// An answer carries roughly the codecs both sides kept; approximate it with the compact offer
+console.log(`Compaction: ${compactUs.toFixed(1)} µs per offer\n`);
+console.table([
+    { variant: 'raw', sdpBytes: raw.sdp, deflatedBytes: raw.deflated, lines: offer.split('\r\n').length },
+    { variant: 'compacted', sdpBytes: compact.sdp, deflatedBytes: compact.deflated, lines: compacted.split('\r\n').length }
+]);
+
+console.table(LINKS.map(link => ({
+    link: link.name,
+    rawMs: +signalingMs(link, raw.deflated, compact.deflated).toFixed(1),
+    compactedMs: +signalingMs(link, compact.deflated, compact.deflated).toFixed(1),
+    savedMs: +(signalingMs(link, raw.deflated, compact.deflated) - signalingMs(link, compact.deflated, compact.deflated)).toFixed(1)
+})));
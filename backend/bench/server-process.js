@@ -0,0 +1,91 @@
+// Helpers for benchmarks that fork the real server and drive it with socket.io clients
+// The server is started with --expose-gc and SOAK_TEST=true, so it answers
+// 'soak-snapshot' (structure sizes and post-GC heap) and 'heap-snapshot' over IPC.
+const net = require('net');
+const http = require('http');
+const path = require('path');
+const { fork } = require('child_process');
+
+function sleep(ms) {
+    return new Promise((resolve) => setTimeout(resolve, ms));
+}
+
+function freePort() {
+    return new Promise((resolve) => {
+        const probe = net.createServer().listen(0, () => {
+            const { port } = probe.address();
+            probe.close(() => resolve(port));
+        });
+    });
+}
+
+async function waitForHealth(port) {
+    for (let attempt = 0; attempt < 100; attempt++) {
+        const ok = await new Promise((resolve) => {
+            http.get(`http://localhost:${port}/health`, (res) => {
+                res.resume();
+                resolve(res.statusCode === 200);
+            }).on('error', () => resolve(false));
+        });
+        if (ok) {
+            return;
+        }
+        await sleep(100);
+    }
+    throw new Error('server did not become healthy');
+}
+
+/**
+ * Fork server.js on a free port and resolve once /health answers
+ * @param {Object} env - extra environment for the server
+ * @returns {Promise<{child: ChildProcess, url: string}>}
+ */
+async function startServer(env = {}) {
+    const port = await freePort();
+    const child = fork(path.join(__dirname, '..', 'server.js'), [], {
+        execArgv: ['--expose-gc'],
+        env: {
+            ...process.env,
+            PORT: String(port),
+            NODE_ENV: 'development',
+            SOAK_TEST: 'true',
+            ...env
+        },
+        stdio: ['ignore', 'ignore', 'inherit', 'ipc']
+    });
+
+    await waitForHealth(port);
+    return { child, url: `http://localhost:${port}` };
+}
+
+// Send an IPC request and resolve with the first reply of the same type
+function request(child, type, extra = {}) {
+    return new Promise((resolve) => {
+        const onMessage = (message) => {
+            if (message && message.type === type) {
+                child.off('message', onMessage);
+                resolve(message);
+            }
+        };
+        child.on('message', onMessage);
+        child.send({ type, ...extra });
+    });
+}
+
+// Resolve with the event's data, or null after timeoutMs
+function once(emitter, event, timeoutMs) {
+    return new Promise((resolve) => {
+        const timer = setTimeout(() => resolve(null), timeoutMs);
+        emitter.once(event, (data) => {
+            clearTimeout(timer);
+            resolve(data);
+        });
+    });
+}
+
+module.exports = {
+    sleep,
+    startServer,
+    request,
+    once
+};
@@ -0,0 +1,181 @@
+// Soak test and leak detector
+// Run with: node bench/soak.js [--cycles 500 | --hours 2] [--clients 200] [--max-bytes-per-cycle 2048]
+//
+// Forks server.js (with --expose-gc) on a free port and drives churn cycles against it:
+// connect, set hobby, find-match, signal, next-stranger for some, then disconnect - most
+// cleanly, some with a dropped transport so their sessions are held and then released.
+// After each cycle, once the resume window has passed, the server reports the size of
+// every per-connection structure and its post-GC heap over IPC.
+//
+// Fails (exit code 1) when a structure does not return to its baseline after the
+// warm-up cycles, or when the heap grows by more than --max-bytes-per-cycle (least-squares
+// slope over the measured cycles). --heap-every N writes a .heapsnapshot into --heap-dir
+// every N cycles for comparison in Chrome DevTools.
+const fs = require('fs');
+const os = require('os');
+const path = require('path');
+const { io: connect } = require('socket.io-client');
+const { sleep, startServer, request, once } = require('./server-process');
+
+const HOBBIES = ['singing', 'dancing', 'music', 'coding', 'gaming', 'art', 'books', 'travel'];
+const RESUME_WINDOW_MS = 500;
+
+// Structures bounded by their own TTLs rather than by connected users
+const TTL_STRUCTURES = new Set(['bannedUsers', 'violations', 'reporters', 'reportPairs']);
+
+function parseArgs(argv) {
+    const args = {
+        cycles: 200,
+        hours: 0,
+        clients: 200,
+        warmup: 5,
+        'max-bytes-per-cycle': 2048,
+        'heap-every': 0,
+        'heap-dir': os.tmpdir(),
+        out: null
+    };
+    for (let i = 0; i < argv.length; i += 2) {
+        const key = argv[i].replace(/^--/, '');
+        args[key] = typeof args[key] === 'number' ? Number(argv[i + 1]) : argv[i + 1];
+    }
+    return args;
+}
+
+// One churn cycle: every client connects, matches, signals and leaves
+async function cycle(url, clients, cycleIndex) {
+    const sockets = await Promise.all(Array.from({ length: clients }, async (_, i) => {
+        const client = connect(url, { transports: ['websocket'], forceNew: true, reconnection: false });
+        await once(client, 'session', 5000);
+        client.emit('set-hobby-preference', HOBBIES[(i + cycleIndex) % HOBBIES.length]);
+        return client;
+    }));
+
+    const matched = sockets.map(client => once(client, 'match-found', 3000));
+    sockets.forEach(client => client.emit('find-match'));
+    const matches = await Promise.all(matched);
+
+    sockets.forEach((client, i) => {
+        if (matches[i]) {
+            client.emit('offer', { offer: { type: 'offer', sdp: 'v=0\r\ns=-\r\nt=0 0\r\n' } });
+            client.emit('ice-candidate', { candidate: { candidate: `candidate:${i} 1 udp 1 10.0.0.1 ${40000 + i} typ host`, sdpMid: '0', sdpMLineIndex: 0 } });
+            client.emit('emoji-reactions', { reactions: { '🔥': 2 } });
+        }
+    });
+
+    // A third move on to the next stranger before leaving
+    const rematched = sockets.map((client, i) => (i % 3 === 0 ? once(client, 'match-found', 1000) : null));
+    sockets.forEach((client, i) => {
+        if (i % 3 === 0) {
+            client.emit('next-stranger');
+        }
+    });
+    await Promise.all(rematched);
+
+    // Most leave cleanly; every fifth drops its transport and is held for a resume
+    sockets.forEach((client, i) => {
+        if (i % 5 === 0) {
+            client.io.engine.close();
+        } else {
+            client.disconnect();
+        }
+    });
+
+    return matches.filter(Boolean).length;
+}
+
+// Least-squares slope of y over x
+function slope(xs, ys) {
+    const n = xs.length;
+    const meanX = xs.reduce((a, b) => a + b, 0) / n;
+    const meanY = ys.reduce((a, b) => a + b, 0) / n;
+    let numerator = 0;
+    let denominator = 0;
+    for (let i = 0; i < n; i++) {
+        numerator += (xs[i] - meanX) * (ys[i] - meanY);
+        denominator += (xs[i] - meanX) ** 2;
+    }
+    return denominator ? numerator / denominator : 0;
+}
+
+async function main() {
+    const args = parseArgs(process.argv.slice(2));
+    const reportDir = fs.mkdtempSync(path.join(os.tmpdir(), 'soak-reports-'));
+
+    const { child, url } = await startServer({
+        PROFILE_DIR: args['heap-dir'],
+        RESUME_WINDOW_MS: String(RESUME_WINDOW_MS),
+        REPORT_LOG_DIR: reportDir
+    });
+    const deadline = args.hours ? Date.now() + args.hours * 3600000 : Infinity;
+    const totalCycles = args.hours ? Infinity : args.cycles;
+
+    const samples = [];
+    const heapSnapshots = [];
+    let baseline = null;
+
+    for (let index = 0; index < totalCycles && Date.now() < deadline; index++) {
+        const matches = await cycle(url, args.clients, index);
+
+        // Held sessions expire after the resume window; give the timer wheel a tick more
+        await sleep(RESUME_WINDOW_MS + 500);
+        const snapshot = await request(child, 'soak-snapshot');
+        samples.push({ cycle: index, matches, heapUsed: snapshot.heapUsed, sizes: snapshot.sizes });
+
+        if (index + 1 === args.warmup) {
+            baseline = snapshot;
+        }
+        if (args['heap-every'] && (index + 1) % args['heap-every'] === 0) {
+            heapSnapshots.push((await request(child, 'heap-snapshot', { cycle: index + 1 })).file);
+        }
+
+        console.error(`cycle ${index + 1}: ${matches} matched, heap ${(snapshot.heapUsed / 1048576).toFixed(1)} MB, `
+            + `sockets ${snapshot.sizes.sockets}, rooms ${snapshot.sizes.activeRooms}, waiting ${snapshot.sizes.waitingUsers}`);
+    }
+
+    child.kill('SIGKILL');
+    fs.rmSync(reportDir, { recursive: true, force: true });
+
+    if (!baseline) {
+        throw new Error(`need more than ${args.warmup} warm-up cycles`);
+    }
+
+    const measured = samples.slice(args.warmup - 1);
+    const final = samples[samples.length - 1];
+    const bytesPerCycle = slope(measured.map(s => s.cycle), measured.map(s => s.heapUsed));
+
+    const structures = {};
+    const leaks = [];
+    for (const [name, size] of Object.entries(final.sizes)) {
+        const peak = Math.max(...measured.map(s => s.sizes[name]));
+        structures[name] = { baseline: baseline.sizes[name], final: size, peak, ttlBound: TTL_STRUCTURES.has(name) };
+        if (!TTL_STRUCTURES.has(name) && size > baseline.sizes[name]) {
+            leaks.push(name);
+        }
+    }
+
+    const passed = leaks.length === 0 && bytesPerCycle <= args['max-bytes-per-cycle'];
+    const report = {
+        passed,
+        cycles: samples.length,
+        clientsPerCycle: args.clients,
+        retainedBytesPerCycle: Math.round(bytesPerCycle),
+        maxBytesPerCycle: args['max-bytes-per-cycle'],
+        heapUsed: { baseline: baseline.heapUsed, final: final.heapUsed },
+        leakedStructures: leaks,
+        structures,
+        heapSnapshots
+    };
+
+    const output = JSON.stringify(report, null, 2);
+    if (args.out) {
+        fs.writeFileSync(args.out, output);
+    } else {
+        console.log(output);
+    }
+    process.exit(passed ? 0 : 1);
+}
+
+main().catch((error) => {
+    console.error(error);
+    process.exit(1);
+});
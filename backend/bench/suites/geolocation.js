@@ -0,0 +1,25 @@
+// Geolocation cache: getCachedLocationFromIP hit and miss paths
+// The HTTP call is replaced by an immediately resolved response so the miss path
+// measures our own work (lookup, country table hit, cache insert), not the network.
+const axios = require('axios');
+const { getCachedLocationFromIP } = require('../../utils/geolocation');
+
+const response = {
+    data: { status: 'success', country: 'Germany', countryCode: 'DE', region: 'BE', city: 'Berlin' }
+};
+
+module.exports = (suite) => {
+    axios.get = () => Promise.resolve(response);
+
+    const cachedIP = '203.0.113.10';
+    suite.add('getCachedLocationFromIP/hit', async () => {
+        await getCachedLocationFromIP(cachedIP);
+    });
+
+    // A fresh IP every call, counted across rounds so none of them is ever cached
+    let next = 0;
+    suite.add('getCachedLocationFromIP/miss', async () => {
+        const n = next++;
+        await getCachedLocationFromIP(`${10 + (n >>> 24)}.${(n >>> 16) & 255}.${(n >>> 8) & 255}.${n & 255}`);
+    });
+};
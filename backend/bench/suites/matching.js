@@ -0,0 +1,84 @@
+// Matching: SocketManager.findCompatibleMatch and the Matcher that server.js uses
+const SocketManager = require('../../utils/socketManager');
+const Matcher = require('../../utils/matcher');
+const MatchQueue = require('../../utils/matchQueue');
+const PartnerHistory = require('../../utils/partnerHistory');
+const dictionary = require('../../utils/dictionary');
+const { random } = require('../harness');
+
+const QUEUE_SIZES = [100, 1000, 10000];
+const HOBBIES = ['singing', 'dancing', 'music', 'coding', 'gaming', 'art', 'books', 'travel'];
+
+function fakeSocket(index, hobby) {
+    return {
+        id: `socket-${index}`,
+        userInfo: {
+            ip: `10.0.${index >> 8 & 255}.${index & 255}`,
+            countryCode: 'US',
+            preferences: { hobby }
+        },
+        data: { uid: index + 1, hobby: dictionary.getHobbyCode(hobby) }
+    };
+}
+
+// SocketManager scans one global waiting map with isCompatible
+function socketManagerCase(size, seed) {
+    const next = random(seed);
+    const manager = new SocketManager({ on() {} });
+    for (let i = 0; i < size; i++) {
+        const socket = fakeSocket(i, HOBBIES[Math.floor(next() * HOBBIES.length)]);
+        manager.waitingUsers.set(socket.id, socket);
+    }
+    return manager;
+}
+
+// server.js: per-hobby MatchQueue of uids, a socket lookup and a partner-history check
+function matcherCase(size, seed) {
+    const next = random(seed);
+    const queue = new MatchQueue();
+    const sockets = new Map();
+    const history = new PartnerHistory({ size: 8 });
+    for (let i = 0; i < size; i++) {
+        const socket = fakeSocket(i, HOBBIES[Math.floor(next() * HOBBIES.length)]);
+        sockets.set(socket.id, socket);
+        queue.set(socket.data.hobby, socket.data.uid, socket.id);
+    }
+    const matcher = new Matcher({
+        queue,
+        sockets,
+        history,
+        rematchWindowMs: 300000,
+        metrics: { repeatPairs: 0, repeatPairsAvoided: 0 }
+    });
+    return { matcher, queue, history };
+}
+
+module.exports = (suite) => {
+    for (const size of QUEUE_SIZES) {
+        // Same hobby mix as the queue: a match is usually near the head
+        const manager = socketManagerCase(size, 1);
+        const searcher = fakeSocket(size + 1, 'music');
+        suite.add(`socketManager.findCompatibleMatch/typical/${size}`, () => manager.findCompatibleMatch(searcher));
+
+        // Nobody shares the hobby: the whole map is scanned
+        const lonely = fakeSocket(size + 2, 'rare-hobby');
+        lonely.userInfo.preferences.hobby = 'rare-hobby';
+        suite.add(`socketManager.findCompatibleMatch/no-match/${size}`, () => manager.findCompatibleMatch(lonely));
+
+        const { matcher } = matcherCase(size, 1);
+        const matcherSearcher = fakeSocket(size + 1, 'music');
+        suite.add(`matcher.findPartner/typical/${size}`, () => matcher.findPartner(matcherSearcher));
+
+        // The head of the hobby queue holds eight recent partners that must be skipped
+        const recent = matcherCase(size, 1);
+        const returning = fakeSocket(size + 3, 'music');
+        let skipped = 0;
+        for (const [uid] of recent.queue.queue(returning.data.hobby)) {
+            recent.history.record(returning.data.uid, uid);
+            if (++skipped === 8) {
+                break;
+            }
+        }
+        suite.add(`matcher.findPartner/skip-recent/${size}`, () => recent.matcher.findPartner(returning));
+    }
+};
@@ -0,0 +1,41 @@
+// Rate limiter checks: the express-rate-limit middleware on its allow and reject paths
+const rateLimiter = require('../../middleware/rateLimiter');
+
+function fakeRequest(ip) {
+    return { ip, method: 'POST', url: '/api/report', headers: {}, app: { get: () => false } };
+}
+
+function fakeResponse() {
+    return {
+        headersSent: false,
+        statusCode: 200,
+        setHeader() {},
+        getHeader() {},
+        append() {},
+        status(code) {
+            this.statusCode = code;
+            return this;
+        },
+        send() {},
+        json() {},
+        end() {}
+    };
+}
+
+module.exports = (suite) => {
+    const res = fakeResponse();
+    const next = () => {};
+
+    // Distinct clients: every request is under the limit
+    let counter = 0;
+    suite.add('report/allowed', async () => {
+        const n = counter++;
+        await rateLimiter.report(fakeRequest(`10.${(n >>> 16) & 255}.${(n >>> 8) & 255}.${n & 255}`), res, next);
+    });
+
+    // One client far over the limit: every request is rejected
+    const flooder = fakeRequest('203.0.113.99');
+    suite.add('report/limited', async () => {
+        await rateLimiter.report(flooder, res, next);
+    });
+};
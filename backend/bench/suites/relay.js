@@ -0,0 +1,61 @@
+// Relay handlers: per-message validation, SDP compaction and Relay.forward through the send queue
+const EventEmitter = require('events');
+const Relay = require('../../utils/relay');
+const { messages } = require('../../utils/validators');
+const { compactSdp } = require('../../utils/sdp');
+
+const candidate = {
+    candidate: {
+        candidate: 'candidate:842163049 1 udp 1677729535 203.0.113.7 46154 typ srflx raddr 0.0.0.0 rport 0 generation 0',
+        sdpMid: '0',
+        sdpMLineIndex: 0
+    }
+};
+
+const sdp = ['v=0', 'o=- 4611731400430051336 2 IN IP4 127.0.0.1', 's=-', 't=0 0',
+    'm=video 9 UDP/TLS/RTP/SAVPF 96 97 98 99 45 46',
+    'a=extmap:1 urn:ietf:params:rtp-hdrext:toffset', 'a=extmap:4 urn:ietf:params:rtp-hdrext:sdes:mid',
+    'a=rtpmap:96 VP8/90000', 'a=rtcp-fb:96 nack', 'a=rtpmap:97 rtx/90000', 'a=fmtp:97 apt=96',
+    'a=rtpmap:98 VP9/90000', 'a=rtpmap:99 rtx/90000', 'a=fmtp:99 apt=98',
+    'a=rtpmap:45 AV1/90000', 'a=rtpmap:46 rtx/90000', 'a=fmtp:46 apt=45', ''].join('\r\n');
+
+const offer = { offer: { type: 'offer', sdp } };
+
+// Socket stand-in with an always-drained engine.io connection
+function fakeSocket(id) {
+    const socket = new EventEmitter();
+    socket.id = id;
+    socket.connected = true;
+    socket.conn = new EventEmitter();
+    socket.conn.writeBuffer = [];
+    socket.emit = () => true;
+    return socket;
+}
+
+module.exports = (suite) => {
+    const relay = new Relay({
+        io: null,
+        highWater: 32,
+        limit: 256,
+        metrics: { queued: 0, peakDepth: 0, coalesced: 0, dropped: 0, slowDisconnects: 0 }
+    });
+    const sender = fakeSocket('sender');
+    const partner = fakeSocket('partner');
+    relay.pair(sender, partner);
+
+    suite.add('validate/ice-candidate', () => messages['ice-candidate'](candidate));
+    suite.add('validate/offer', () => messages.offer(offer));
+    suite.add('compactSdp/offer', () => compactSdp(sdp));
+    suite.add('relay/ice-candidate', () => {
+        const message = messages['ice-candidate'](candidate);
+        if (message) {
+            relay.forward(sender, 'ice-candidate', message);
+        }
+    });
+    suite.add('relay/offer', () => {
+        const message = messages.offer(offer);
+        if (message) {
+            relay.forward(sender, 'offer', message);
+        }
+    });
+};
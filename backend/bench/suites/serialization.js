@@ -0,0 +1,43 @@
+// match-found payload: encoded the way socket.io-parser encodes an event packet
+const dictionary = require('../../utils/dictionary');
+const { getCountryByCode } = require('../../utils/countries');
+
+const roomId = 'room_1760000000000_k3j9x0a1b';
+
+// Current payload: dictionary codes only
+function compactPayload() {
+    return {
+        roomId,
+        dictionaryVersion: dictionary.version,
+        partner: {
+            country: dictionary.getCountryCode('DE'),
+            hobby: dictionary.getHobbyCode('music')
+        }
+    };
+}
+
+// Previous payload, as the original server.js sent it: country name, code, flag and hobby as strings
+function legacyPayload() {
+    const country = getCountryByCode('DE');
+    return {
+        roomId,
+        partner: {
+            country: country.country,
+            countryCode: country.countryCode,
+            flag: country.flag,
+            hobby: 'music'
+        }
+    };
+}
+
+// socket.io-parser: packet type 2 (EVENT) followed by the JSON array [event, data]
+function encode(payload) {
+    return '2' + JSON.stringify(['match-found', payload]);
+}
+
+module.exports = (suite) => {
+    suite.add('match-found/codes', () => encode(compactPayload()));
+    suite.add('match-found/legacy-strings', () => encode(legacyPayload()));
+    suite.note('match-found/codes bytes', Buffer.byteLength(encode(compactPayload())));
+    suite.note('match-found/legacy-strings bytes', Buffer.byteLength(encode(legacyPayload())));
+};
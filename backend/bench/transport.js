@@ -0,0 +1,175 @@
+// Transport benchmark: connection setup time and server CPU per transport/compression setting
+// Run with: node bench/transport.js [clients]
+//
+// Each setting runs a fresh server in a child process, configured through the same
+// environment variables and transportOptions() as server.js, so its CPU time is measured
+// apart from the clients. Every client connects, then relays one call's worth of
+// signaling through the server: an SDP offer and answer, 20 ICE candidates and 10 emoji.
+const http = require('http');
+const path = require('path');
+const { fork } = require('child_process');
+
+const CLIENTS = parseInt(process.argv[2]) || 200;
+const ICE_CANDIDATES = 20;
+const EMOJI = 10;
+
+const SETTINGS = [
+    { name: 'polling-first, no deflate', client: ['polling', 'websocket'], env: { SOCKET_TRANSPORTS: 'polling,websocket', WS_DEFLATE_ENABLED: 'false' } },
+    { name: 'websocket-first, no deflate', client: ['websocket', 'polling'], env: { SOCKET_TRANSPORTS: 'websocket,polling', WS_DEFLATE_ENABLED: 'false' } },
+    { name: 'websocket-first, deflate all', client: ['websocket', 'polling'], env: { SOCKET_TRANSPORTS: 'websocket,polling', WS_DEFLATE_THRESHOLD: '1' } },
+    { name: 'websocket-first, deflate >1KB', client: ['websocket', 'polling'], env: { SOCKET_TRANSPORTS: 'websocket,polling', WS_DEFLATE_THRESHOLD: '1024' } }
+];
+
+// Realistic-looking SDP (about 4 KB) and ICE candidate payloads
+function fakeSdp() {
+    const lines = ['v=0', 'o=- 4611731400430051336 2 IN IP4 127.0.0.1', 's=-', 't=0 0', 'a=group:BUNDLE 0 1'];
+    for (const kind of ['audio', 'video']) {
+        lines.push(`m=${kind} 9 UDP/TLS/RTP/SAVPF 111 63 103 104 9 0 8 106 105 13 110 112 113 126`);
+        lines.push('c=IN IP4 0.0.0.0', 'a=rtcp:9 IN IP4 0.0.0.0', 'a=ice-ufrag:Zx7q', 'a=ice-pwd:3bqjW0p9Yv8Z2l0vEo1Z6v2N');
+        lines.push('a=fingerprint:sha-256 7B:8B:F0:65:5F:78:E2:51:3B:AC:6F:F3:3F:46:1B:35:DC:B8:5F:64:1A:24:C2:43:F0:A1:58:D0:A1:2C:19:08');
+        for (let pt = 96; pt < 124; pt++) {
+            lines.push(`a=rtpmap:${pt} VP8/90000`, `a=rtcp-fb:${pt} goog-remb`, `a=rtcp-fb:${pt} transport-cc`, `a=fmtp:${pt} apt=${pt - 1}`);
+        }
+    }
+    return lines.join('\r\n');
+}
+
+const sdp = fakeSdp();
+const candidate = {
+    candidate: 'candidate:842163049 1 udp 1677729535 203.0.113.7 46154 typ srflx raddr 0.0.0.0 rport 0 generation 0',
+    sdpMid: '0',
+    sdpMLineIndex: 0
+};
+
+// Child process: a bare Socket.io server that echoes signaling back to the sender
+function runServer() {
+    const { Server } = require('socket.io');
+    const { transportOptions } = require('../utils/transport');
+
+    const httpServer = http.createServer();
+    const io = new Server(httpServer, transportOptions());
+
+    io.on('connection', (socket) => {
+        for (const event of ['offer', 'answer', 'ice-candidate', 'emoji-reaction']) {
+            socket.on(event, (data) => socket.emit(event, data));
+        }
+    });
+
+    let cpuStart = process.cpuUsage();
+    process.on('message', (message) => {
+        if (message === 'cpu') {
+            const cpu = process.cpuUsage(cpuStart);
+            process.send({ cpuMs: (cpu.user + cpu.system) / 1000 });
+            cpuStart = process.cpuUsage();
+        } else if (message === 'exit') {
+            io.close();
+            process.exit(0);
+        }
+    });
+
+    httpServer.listen(0, () => process.send({ port: httpServer.address().port }));
+}
+
+function request(child, message) {
+    return new Promise((resolve) => {
+        child.once('message', resolve);
+        child.send(message);
+    });
+}
+
+function percentile(sorted, p) {
+    return sorted[Math.min(sorted.length - 1, Math.floor(p / 100 * sorted.length))];
+}
+
+// Resolve after the client has had every relayed message echoed back
+function signal(client) {
+    const expected = 2 + ICE_CANDIDATES + EMOJI;
+    return new Promise((resolve) => {
+        let seen = 0;
+        const onEcho = () => {
+            if (++seen === expected) {
+                resolve();
+            }
+        };
+        for (const event of ['offer', 'answer', 'ice-candidate', 'emoji-reaction']) {
+            client.on(event, onEcho);
+        }
+
+        client.emit('offer', { offer: { type: 'offer', sdp } });
+        for (let i = 0; i < ICE_CANDIDATES; i++) {
+            client.emit('ice-candidate', { candidate });
+        }
+        client.emit('answer', { answer: { type: 'answer', sdp } });
+        for (let i = 0; i < EMOJI; i++) {
+            client.emit('emoji-reaction', { emoji: '🔥' });
+        }
+    });
+}
+
+async function runSetting(setting) {
+    const { io: connect } = require('socket.io-client');
+
+    const child = fork(__filename, ['server'], {
+        env: { ...process.env, ...setting.env },
+        stdio: ['ignore', 'ignore', 'inherit', 'ipc']
+    });
+    const { port } = await new Promise((resolve) => child.once('message', resolve));
+    const url = `http://localhost:${port}`;
+    await request(child, 'cpu');
+
+    // Connection setup: time until connected on a websocket, including any upgrade
+    const setupTimes = [];
+    const clients = await Promise.all(Array.from({ length: CLIENTS }, () => new Promise((resolve) => {
+        const started = process.hrtime.bigint();
+        const client = connect(url, { transports: setting.client, forceNew: true });
+        const onReady = () => {
+            setupTimes.push(Number(process.hrtime.bigint() - started) / 1e6);
+            resolve(client);
+        };
+        client.once('connect', () => {
+            if (client.io.engine.transport.name === 'websocket') {
+                onReady();
+            } else {
+                client.io.engine.once('upgrade', onReady);
+            }
+        });
+    })));
+    const setupCpu = await request(child, 'cpu');
+
+    const started = process.hrtime.bigint();
+    await Promise.all(clients.map(signal));
+    const signalingMs = Number(process.hrtime.bigint() - started) / 1e6;
+    const signalingCpu = await request(child, 'cpu');
+
+    clients.forEach(client => client.close());
+    child.send('exit');
+
+    setupTimes.sort((a, b) => a - b);
+    return {
+        setting: setting.name,
+        setupP50Ms: +percentile(setupTimes, 50).toFixed(1),
+        setupP99Ms: +percentile(setupTimes, 99).toFixed(1),
+        setupCpuMsPerClient: +(setupCpu.cpuMs / CLIENTS).toFixed(3),
+        signalingMs: +signalingMs.toFixed(1),
+        signalingCpuMsPerClient: +(signalingCpu.cpuMs / CLIENTS).toFixed(3)
+    };
+}
+
+async function main() {
+    console.log(`${CLIENTS} clients per setting, SDP ${sdp.length} bytes, ${ICE_CANDIDATES} ICE candidates, ${EMOJI} emoji\n`);
+    const results = [];
+    for (const setting of SETTINGS) {
+        results.push(await runSetting(setting));
+    }
+    console.table(results);
+}
+
+if (process.argv[2] === 'server') {
+    runServer();
+} else {
+    process.chdir(path.join(__dirname, '..'));
+    main().catch((error) => {
+        console.error(error);
+        process.exit(1);
+    });
+}
@@ -0,0 +1,105 @@
+// Validation benchmark: cost of checking and rebuilding signaling payloads
+// Run with: node bench/validation.js [iterations]
+//
+// Compares, per message type:
+//   spread     { ...data, from }            (script_1.py style, no validation)
+//   joi        Joi schema, validate() with stripUnknown
+//   compiled   utils/validators.js
+const Joi = require('joi');
+const { messages } = require('../utils/validators');
+const config = require('../config/environment');
+
+const ITERATIONS = parseInt(process.argv[2]) || 1000000;
+
+const sdp = 'v=0\r\n' + 'a=rtpmap:96 VP8/90000\r\na=rtcp-fb:96 goog-remb\r\n'.repeat(80);
+
+const payloads = {
+    offer: { offer: { type: 'offer', sdp }, extra: 'ignored' },
+    'ice-candidate': {
+        candidate: {
+            candidate: 'candidate:842163049 1 udp 1677729535 203.0.113.7 46154 typ srflx raddr 0.0.0.0 rport 0 generation 0',
+            sdpMid: '0',
+            sdpMLineIndex: 0,
+            usernameFragment: 'Zx7q'
+        }
+    },
+    'emoji-reactions': { reactions: { '🔥': 3, '😂': 1 } }
+};
+
+const joiSchemas = {
+    offer: Joi.object({
+        offer: Joi.object({
+            type: Joi.string().valid('offer').required(),
+            sdp: Joi.string().max(config.SDP_MAX_BYTES).required()
+        }).required()
+    }),
+    'ice-candidate': Joi.object({
+        candidate: Joi.object({
+            candidate: Joi.string().allow('').max(512).required(),
+            sdpMid: Joi.string().max(32).allow(null),
+            sdpMLineIndex: Joi.number().integer().min(0).max(63).allow(null),
+            usernameFragment: Joi.string().max(64).allow(null)
+        }).required()
+    }),
+    'emoji-reactions': Joi.object({
+        reactions: Joi.object().pattern(Joi.string().min(1).max(16), Joi.number().integer().min(1).max(99)).max(8).required()
+    })
+};
+
+const strategies = {
+    spread: (event, data) => ({ ...data, from: 'bench' }),
+    joi: (event, data) => {
+        const { error, value } = joiSchemas[event].validate(data, { stripUnknown: true });
+        if (error) {
+            return null;
+        }
+        value.from = 'bench';
+        return value;
+    },
+    compiled: (event, data) => {
+        const message = messages[event](data);
+        if (message) {
+            message.from = 'bench';
+        }
+        return message;
+    }
+};
+
+function bench(strategy, event, data) {
+    // Warm up so the JIT has settled before timing
+    for (let i = 0; i < 10000; i++) {
+        strategy(event, data);
+    }
+
+    let sink = 0;
+    const started = process.hrtime.bigint();
+    for (let i = 0; i < ITERATIONS; i++) {
+        if (strategy(event, data)) {
+            sink++;
+        }
+    }
+    const elapsed = Number(process.hrtime.bigint() - started);
+
+    if (sink !== ITERATIONS) {
+        throw new Error(`${event} failed validation`);
+    }
+    return elapsed / ITERATIONS;
+}
+
+const results = [];
+for (const [event, data] of Object.entries(payloads)) {
+    const row = { event };
+    for (const [name, strategy] of Object.entries(strategies)) {
+        row[`${name} ns/op`] = +bench(strategy, event, data).toFixed(1);
+    }
+    results.push(row);
+}
+
+// Oversized SDP is refused on the length check, before anything is copied
+const oversized = { offer: { type: 'offer', sdp: 'x'.repeat(config.SDP_MAX_BYTES + 1) } };
+if (messages.offer(oversized) !== null) {
+    throw new Error('oversized SDP accepted');
+}
+
+console.log(`${ITERATIONS} iterations per cell\n`);
+console.table(results);
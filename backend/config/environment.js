@@ -1,6 +1,12 @@
 // Environment configuration
 require('dotenv').config();
 
+// For settings where 0 is a valid value (`parseInt(...) || default` would replace it)
+function intOrDefault(name, fallback) {
+    const value = parseInt(process.env[name]);
+    return Number.isNaN(value) ? fallback : value;
+}
+
 const config = {
     // Server configuration
     PORT: process.env.PORT || 5000,
@@ -15,9 +21,44 @@ const config = {
     RATE_LIMIT_WINDOW_MS: parseInt(process.env.RATE_LIMIT_WINDOW_MS) || 900000, // 15 minutes
     RATE_LIMIT_MAX: parseInt(process.env.RATE_LIMIT_MAX) || 100,
 
+    // Reverse proxies in front of the server (1 behind nginx); client IPs are read from
+    // X-Forwarded-For through this many hops
+    TRUST_PROXY: parseInt(process.env.TRUST_PROXY) || 0,
+
     // Session configuration
     SESSION_SECRET: process.env.SESSION_SECRET || 'stranger-face-secret-key-change-in-production',
     SESSION_TIMEOUT: parseInt(process.env.SESSION_TIMEOUT) || 1800000, // 30 minutes
+    RESUME_WINDOW_MS: intOrDefault('RESUME_WINDOW_MS', 5000), // 5 seconds
+
+    // Matching
+    PARTNER_HISTORY_SIZE: parseInt(process.env.PARTNER_HISTORY_SIZE) || 8,
+    REMATCH_WINDOW_MS: intOrDefault('REMATCH_WINDOW_MS', 300000), // 5 minutes
+
+    // Graceful drain on SIGTERM
+    DRAIN_TIMEOUT_MS: parseInt(process.env.DRAIN_TIMEOUT_MS) || 60000, // 1 minute
+    DRAIN_RECONNECT_BASE_MS: intOrDefault('DRAIN_RECONNECT_BASE_MS', 1000),
+    DRAIN_RECONNECT_JITTER_MS: intOrDefault('DRAIN_RECONNECT_JITTER_MS', 4000),
+
+    // Socket.io transport - listed in the order clients should try them
+    SOCKET_TRANSPORTS: process.env.SOCKET_TRANSPORTS
+        ? process.env.SOCKET_TRANSPORTS.split(',')
+        : ['websocket', 'polling'],
+    WS_DEFLATE_ENABLED: process.env.WS_DEFLATE_ENABLED !== 'false',
+    WS_DEFLATE_THRESHOLD: intOrDefault('WS_DEFLATE_THRESHOLD', 1024), // bytes, 0 deflates every frame
+    SOCKET_MAX_PAYLOAD_BYTES: parseInt(process.env.SOCKET_MAX_PAYLOAD_BYTES) || 65536, // 64 KB
+    SDP_MAX_BYTES: parseInt(process.env.SDP_MAX_BYTES) || 32768, // 32 KB
+
+    // SDP compaction of relayed offers
+    SDP_COMPACTION_ENABLED: process.env.SDP_COMPACTION_ENABLED === 'true',
+    SDP_CODECS: process.env.SDP_CODECS
+        ? process.env.SDP_CODECS.split(',')
+        : ['opus', 'VP8', 'VP9', 'H264'],
+    SDP_MAX_PER_CODEC: parseInt(process.env.SDP_MAX_PER_CODEC) || 2,
+
+    // Per-socket outbound queue
+    OUTBOUND_HIGH_WATER: parseInt(process.env.OUTBOUND_HIGH_WATER) || 32, // buffered packets
+    OUTBOUND_QUEUE_LIMIT: parseInt(process.env.OUTBOUND_QUEUE_LIMIT) || 256, // messages
+    EMOJI_WINDOW_MS: intOrDefault('EMOJI_WINDOW_MS', 250),
 
     // WebRTC configuration
     TURN_SERVER: process.env.TURN_SERVER || null,
@@ -40,6 +81,33 @@ const config = {
     REPORTS_ENABLED: process.env.REPORTS_ENABLED !== 'false',
     ANALYTICS_ENABLED: process.env.ANALYTICS_ENABLED === 'true',
 
+    // Report log
+    REPORT_LOG_DIR: process.env.REPORT_LOG_DIR || 'logs/reports',
+    REPORT_LOG_FLUSH_MS: intOrDefault('REPORT_LOG_FLUSH_MS', 100),
+    REPORT_LOG_SEGMENT_BYTES: parseInt(process.env.REPORT_LOG_SEGMENT_BYTES) || 16777216, // 16 MB
+
+    // Automatic violation bans
+    VIOLATION_HALF_LIFE_MS: parseInt(process.env.VIOLATION_HALF_LIFE_MS) || 3600000, // 1 hour
+    VIOLATION_BAN_THRESHOLD: parseInt(process.env.VIOLATION_BAN_THRESHOLD) || 3,
+    VIOLATION_BAN_MS: parseInt(process.env.VIOLATION_BAN_MS) || 3600000, // 1 hour
+    REPORTER_LIMIT: parseInt(process.env.REPORTER_LIMIT) || 10,
+    REPORT_PAIR_WINDOW_MS: parseInt(process.env.REPORT_PAIR_WINDOW_MS) || 600000, // 10 minutes
+
+    // On-demand profiling (admin API disabled unless ADMIN_TOKEN is set)
+    ADMIN_TOKEN: process.env.ADMIN_TOKEN || null,
+    PROFILE_DIR: process.env.PROFILE_DIR || 'logs/profiles',
+    PROFILE_MAX_FILES: parseInt(process.env.PROFILE_MAX_FILES) || 10,
+    PROFILE_MAX_SECONDS: parseInt(process.env.PROFILE_MAX_SECONDS) || 60,
+    PROFILE_DEFAULT_SECONDS: parseInt(process.env.PROFILE_DEFAULT_SECONDS) || 10,
+    PROFILE_SIGNAL: process.env.PROFILE_SIGNAL || null,
+    SOAK_TEST: process.env.SOAK_TEST === 'true', // IPC hooks for bench/soak.js only
+
+    // Match lifecycle tracing
+    TRACE_ENABLED: process.env.TRACE_ENABLED !== 'false',
+    TRACE_SAMPLE_EVERY: intOrDefault('TRACE_SAMPLE_EVERY', 20), // connections per traced one, 0 disables
+    TRACE_BUFFER_SIZE: parseInt(process.env.TRACE_BUFFER_SIZE) || 4096, // spans
+    TRACE_EXPORT_FILE: process.env.TRACE_EXPORT_FILE || null,
+
     // Database (for future use)
     DATABASE_URL: process.env.DATABASE_URL || null,
     REDIS_URL: process.env.REDIS_URL || null
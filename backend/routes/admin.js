@@ -0,0 +1,65 @@
+// Admin routes: on-demand profiling of the live process
+// Every route requires "Authorization: Bearer <ADMIN_TOKEN>". Without ADMIN_TOKEN set,
+// the admin API does not exist (404).
+const crypto = require('crypto');
+const express = require('express');
+const router = express.Router();
+const config = require('../config/environment');
+
+function digest(value) {
+    return crypto.createHash('sha256').update(value).digest();
+}
+
+// Constant-time token check; hashing first makes the lengths equal
+function requireAdmin(req, res, next) {
+    if (!config.ADMIN_TOKEN) {
+        return res.status(404).json({ error: 'Route not found' });
+    }
+
+    const header = req.get('authorization') || '';
+    const token = header.startsWith('Bearer ') ? header.slice(7) : '';
+    if (!crypto.timingSafeEqual(digest(token), digest(config.ADMIN_TOKEN))) {
+        return res.status(401).json({ error: 'Unauthorized' });
+    }
+
+    next();
+}
+
+router.use(requireAdmin);
+
+function sendCapture(promise, res) {
+    promise
+        .then(capture => res.status(201).json(capture))
+        .catch(error => {
+            if (error.code === 'PROFILER_BUSY') {
+                return res.status(409).json({ error: error.message });
+            }
+            console.error('Profiling failed:', error);
+            res.status(500).json({ error: 'Profiling failed' });
+        });
+}
+
+// Capture a CPU profile: POST /api/admin/profile/cpu?seconds=10
+router.post('/profile/cpu', (req, res) => {
+    const seconds = parseInt(req.query.seconds) || config.PROFILE_DEFAULT_SECONDS;
+    console.log(`🔬 CPU profile requested for ${seconds}s`);
+    sendCapture(req.app.locals.profiler.cpuProfile(seconds), res);
+});
+
+// Write a heap snapshot (pauses the process while it is taken)
+router.post('/profile/heap', (req, res) => {
+    console.log('🔬 Heap snapshot requested');
+    sendCapture(req.app.locals.profiler.heapSnapshot(), res);
+});
+
+// List captures on disk, newest first
+router.get('/profiles', async (req, res) => {
+    try {
+        res.json({ profiles: await req.app.locals.profiler.list() });
+    } catch (error) {
+        console.error('Error listing profiles:', error);
+        res.status(500).json({ error: 'Failed to list profiles' });
+    }
+});
+
+module.exports = router;
@@ -1,24 +1,18 @@
 // Authentication routes (minimal - no login required)
 const express = require('express');
 const router = express.Router();
-const { v4: uuidv4 } = require('uuid');
+const { createSessionToken, verifySessionToken } = require('../utils/sessionToken');
 
-// Generate anonymous session ID
+// Generate anonymous session - a signed token, nothing is stored server-side
 router.post('/anonymous-session', (req, res) => {
     try {
-        const sessionId = uuidv4();
         const userIP = req.ip || req.connection.remoteAddress;
-
-        // In production, you might want to store session info
-        const session = {
-            id: sessionId,
-            ip: userIP,
-            createdAt: new Date().toISOString(),
-            isAnonymous: true
-        };
+        const session = createSessionToken(userIP);
 
         res.json({
-            sessionId: session.id,
+            sessionId: session.sessionId,
+            token: session.token,
+            expiresAt: session.expiresAt,
             message: 'Anonymous session created'
         });
     } catch (error) {
@@ -29,20 +23,20 @@ router.post('/anonymous-session', (req, res) => {
     }
 });
 
-// Validate session (if needed)
-router.get('/validate/:sessionId', (req, res) => {
-    const { sessionId } = req.params;
+// Validate session token - signature and age are checked locally
+router.get('/validate/:token', (req, res) => {
+    const session = verifySessionToken(req.params.token);
 
-    // In production, validate against database
-    if (sessionId && sessionId.length === 36) {
+    if (session) {
         res.json({
             valid: true,
-            sessionId
+            sessionId: session.sessionId,
+            expiresAt: session.expiresAt
         });
     } else {
         res.status(400).json({
             valid: false,
-            error: 'Invalid session ID'
+            error: 'Invalid or expired session'
         });
     }
 });
@@ -12,9 +12,7 @@ router.get('/location', async (req, res) => {
         res.json({
             country: location.country,
             countryCode: location.countryCode,
-            flag: location.flag,
-            city: location.city,
-            region: location.region
+            flag: location.flag
         });
     } catch (error) {
         console.error('Error getting location:', error);
@@ -2,6 +2,7 @@
 const express = require('express');
 const router = express.Router();
 const Joi = require('joi');
+const { verifySessionToken } = require('../utils/sessionToken');
 
 // Validation schema for reports
 const reportSchema = Joi.object({
@@ -20,6 +21,9 @@ const reportSchema = Joi.object({
 });
 
 // Submit a report
+// Every report is logged for moderators. It only counts toward an automatic ban when the
+// reporter proves their session ("Authorization: Bearer <session token>") and was matched
+// with reportedUserId (the partner's socket id) within the report window.
 router.post('/', async (req, res) => {
     try {
         // Validate request body
@@ -33,11 +37,18 @@ router.post('/', async (req, res) => {
 
         const { reportedUserId, reason, description } = value;
         const reporterIP = req.ip || req.connection.remoteAddress;
+        const { violations } = req.app.locals;
+
+        // A verified report names the partner's session, like reports over the socket, so the
+        // log's per-user counts and the violation scores share one key across reconnects
+        const header = req.get('authorization') || '';
+        const session = verifySessionToken(header.startsWith('Bearer ') ? header.slice(7) : undefined);
+        const reportedSessionId = session && violations.pairedUser(session.sessionId, reportedUserId);
 
         // In production, save to database
         const report = {
             id: Date.now().toString(),
-            reportedUserId,
+            reportedUserId: reportedSessionId || reportedUserId,
             reporterIP,
             reason,
             description: description || '',
@@ -45,15 +56,16 @@ router.post('/', async (req, res) => {
             status: 'pending'
         };
 
-        // Log the report (in production, save to database)
-        console.log('Report submitted:', report);
+        // Append to the durable report log (group-committed, indexed immediately)
+        req.app.locals.reportLog.append(report);
+
+        // Count the violation against the partner's session; crossing the threshold bans them
+        if (reportedSessionId) {
+            violations.recordReport(reportedSessionId, reporterIP);
+        }
 
         // In production, you might want to:
-        // 1. Save report to database
-        // 2. Increment violation count for reported user
-        // 3. Temporarily ban user if violations exceed threshold
-        // 4. Send notification to moderators
-        // 5. Log for analytics
+        // 1. Send notification to moderators
 
         res.status(201).json({
             message: 'Report submitted successfully',
@@ -71,23 +83,8 @@ router.post('/', async (req, res) => {
 // Get report statistics (admin endpoint - would need authentication in production)
 router.get('/stats', async (req, res) => {
     try {
-        // In production, fetch from database
-        const stats = {
-            totalReports: 0,
-            pendingReports: 0,
-            resolvedReports: 0,
-            topReasons: {
-                inappropriate_behavior: 0,
-                harassment: 0,
-                nudity: 0,
-                spam: 0,
-                underage: 0,
-                violence: 0,
-                other: 0
-            }
-        };
-
-        res.json(stats);
+        // Served from the report log's in-memory index
+        res.json(req.app.locals.reportLog.getStats());
     } catch (error) {
         console.error('Error fetching report stats:', error);
         res.status(500).json({
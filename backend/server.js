@@ -1,10 +1,36 @@
 // Stranger Face Backend Server - Complete WebRTC Signaling and Matching
 const express = require('express');
+const fs = require('fs');
 const http = require('http');
+const path = require('path');
+const v8 = require('v8');
 const socketIo = require('socket.io');
 const cors = require('cors');
 const helmet = require('helmet');
 const compression = require('compression');
+const config = require('./config/environment');
+const rateLimiter = require('./middleware/rateLimiter');
+const authRoutes = require('./routes/auth');
+const reportRoutes = require('./routes/report');
+const adminRoutes = require('./routes/admin');
+const ReportLog = require('./utils/reportLog');
+const ViolationStore = require('./utils/violationStore');
+const Blocklist = require('./utils/blocklist');
+const MatchQueue = require('./utils/matchQueue');
+const PartnerHistory = require('./utils/partnerHistory');
+const Histogram = require('./utils/histogram');
+const TimerWheel = require('./utils/timerWheel');
+const Matcher = require('./utils/matcher');
+const Relay = require('./utils/relay');
+const Profiler = require('./utils/profiler');
+const Tracer = require('./utils/tracer');
+const { createSessionToken, verifySessionToken } = require('./utils/sessionToken');
+const { handshakeIP } = require('./utils/clientIP');
+const { transportOptions } = require('./utils/transport');
+const dictionary = require('./utils/dictionary');
+const { messages } = require('./utils/validators');
+const { DEFAULT_POLICY, compactSdp } = require('./utils/sdp');
+const { getHobbyCode, getHobby } = dictionary;
 
 const app = express();
 const server = http.createServer(app);
@@ -15,13 +41,17 @@ const io = socketIo(server, {
             : ["http://localhost:3000", "http://localhost:3001"],
         methods: ["GET", "POST"],
         credentials: true
-    }
+    },
+    ...transportOptions()
 });
 
 // Environment configuration
 const PORT = process.env.PORT || 5000;
 const NODE_ENV = process.env.NODE_ENV || 'development';
 
+// req.ip is the client behind our reverse proxies, not the proxy itself
+app.set('trust proxy', config.TRUST_PROXY);
+
 // Security middleware
 app.use(helmet({
     contentSecurityPolicy: false // Allow WebRTC
@@ -38,10 +68,48 @@ app.use(cors({
 app.use(express.json({ limit: '10mb' }));
 app.use(express.urlencoded({ extended: true }));
 
+// Durable report log, shared with the report routes
+const reportLog = new ReportLog({
+    dir: config.REPORT_LOG_DIR,
+    flushMs: config.REPORT_LOG_FLUSH_MS,
+    segmentBytes: config.REPORT_LOG_SEGMENT_BYTES
+});
+app.locals.reportLog = reportLog;
+
+reportLog.open().catch(error => {
+    console.error('Failed to open report log:', error);
+});
+
+// Decaying violation counters - bans are pushed to the matcher as they happen
+const violations = new ViolationStore({
+    halfLifeMs: config.VIOLATION_HALF_LIFE_MS,
+    banThreshold: config.VIOLATION_BAN_THRESHOLD,
+    banMs: config.VIOLATION_BAN_MS,
+    reporterLimit: config.REPORTER_LIMIT,
+    pairWindowMs: config.REPORT_PAIR_WINDOW_MS
+});
+app.locals.violations = violations;
+
+// On-demand CPU profiles and heap snapshots, served by the admin routes
+const profiler = new Profiler({
+    dir: config.PROFILE_DIR,
+    maxFiles: config.PROFILE_MAX_FILES,
+    maxSeconds: config.PROFILE_MAX_SECONDS
+});
+app.locals.profiler = profiler;
+
+// Sampled per-stage latency spans across the match lifecycle
+const tracer = new Tracer({
+    sampleEvery: config.TRACE_ENABLED ? config.TRACE_SAMPLE_EVERY : 0,
+    capacity: config.TRACE_BUFFER_SIZE,
+    exportFile: config.TRACE_EXPORT_FILE
+});
+
 // Health check endpoint - MUST come before 404 handler
+// Returns 503 while draining so the load balancer stops routing new users here
 app.get('/health', (req, res) => {
-    res.status(200).json({ 
-        status: 'OK', 
+    res.status(isDraining ? 503 : 200).json({ 
+        status: isDraining ? 'DRAINING' : 'OK', 
         timestamp: new Date().toISOString(),
         uptime: process.uptime(),
         environment: NODE_ENV,
@@ -55,10 +123,33 @@ app.get('/api/chat/stats', (req, res) => {
     res.json({
         activeUsers: waitingUsers.size,
         activeRooms: activeRooms.size,
-        totalConnections: io.sockets.sockets.size
+        totalConnections: io.sockets.sockets.size,
+        matching: {
+            ...matchMetrics,
+            timeToNextPartner: timeToNextPartner.snapshot(),
+            timeToFirstFrame: timeToFirstFrame.snapshot()
+        },
+        sdp: sdpMetrics,
+        outbound: outboundMetrics,
+        rejectedMessages,
+        tracing: tracer.summary()
     });
 });
 
+// Hobby and country dictionary - match payloads only carry codes into these tables.
+// ?v=<current version> names one immutable body and may be cached forever; the bare URL
+// (or a version this node does not have) is revalidated against the ETag on every use
+app.get('/api/dictionary', (req, res) => {
+    res.set('Cache-Control', req.query.v === dictionary.version
+        ? 'public, max-age=31536000, immutable'
+        : 'no-cache');
+    res.set('ETag', `"${dictionary.version}"`);
+    if (req.fresh) {
+        return res.status(304).end();
+    }
+    res.type('json').send(dictionary.payload);
+});
+
 app.get('/api/chat/location', (req, res) => {
     res.json({
         country: 'Demo Country',
@@ -68,163 +159,227 @@ app.get('/api/chat/location', (req, res) => {
     });
 });
 
+app.use('/api/auth', authRoutes);
+app.use('/api/report', rateLimiter.report, reportRoutes);
+app.use('/api/admin', rateLimiter.general, adminRoutes);
+
 // 404 handler MUST come last
 app.use('*', (req, res) => {
     res.status(404).json({ error: 'Route not found' });
 });
 
 // In-memory storage for users and rooms
-const waitingUsers = new Map();
+// Sockets themselves are indexed by io.sockets.sockets; these only hold ids and codes
+const waitingUsers = new MatchQueue(); // per-hobby queues of uid -> socket id
 const activeRooms = new Map();
-const userSockets = new Map();
+
+// Recent partners per user, so "next" does not pair the same two people again
+const partnerHistory = new PartnerHistory({ size: config.PARTNER_HISTORY_SIZE });
+
+// Matching counters; repeat pairs are matches between users who already met
+const matchMetrics = {
+    matches: 0,
+    repeatPairs: 0,
+    repeatPairsAvoided: 0
+};
+
+// Temporarily banned session ids and client IPs, kept out of matching: checked for the
+// searcher and for every candidate, so a ban also covers users already in the queue
+const bannedUsers = new Blocklist();
+
+const matcher = new Matcher({
+    queue: waitingUsers,
+    sockets: io.sockets.sockets,
+    history: partnerHistory,
+    rematchWindowMs: config.REMATCH_WINDOW_MS,
+    metrics: matchMetrics,
+    blocklist: bannedUsers
+});
+
+// Milliseconds from leaving a room (next or partner left) to the next match-found
+const timeToNextPartner = new Histogram();
+
+// Milliseconds from match-found to the first remote video frame, reported by clients
+const timeToFirstFrame = new Histogram();
+
+// SDP bytes relayed; offers shrink when compaction is enabled
+const sdpPolicy = {
+    ...DEFAULT_POLICY,
+    codecs: config.SDP_CODECS,
+    maxPerCodec: config.SDP_MAX_PER_CODEC
+};
+const sdpMetrics = {
+    compaction: config.SDP_COMPACTION_ENABLED,
+    offers: 0,
+    answers: 0,
+    bytesIn: 0,
+    bytesOut: 0
+};
+
+// Outbound backpressure - queued is the total depth across all sockets' send queues
+const outboundMetrics = {
+    queued: 0,
+    peakDepth: 0,
+    coalesced: 0,
+    dropped: 0,
+    slowDisconnects: 0
+};
+
+// Partner pointers and per-socket send queues. Every emit to a local socket goes through
+// relay.send except volatile ones
+const relay = new Relay({
+    io,
+    highWater: config.OUTBOUND_HIGH_WATER,
+    limit: config.OUTBOUND_QUEUE_LIMIT,
+    metrics: outboundMetrics
+});
+
+// Emoji reactions waiting for the next window flush, per sending socket
+const MAX_REACTION_EMOJI = 8;
+const MAX_REACTION_COUNT = 99;
+const pendingReactions = new Map(); // socket -> { emoji: count }
+let reactionTimer = null;
+
+// Client payloads that failed validation
+let rejectedMessages = 0;
+
+// Sessions held open after an unexpected disconnect, keyed by session id
+const heldSessions = new TimerWheel({
+    tickMs: 250,
+    onExpire: (sessionId, held) => releaseSession(held)
+});
+
+// Connected socket per session id, so a client that reconnects before its old socket has
+// timed out takes the session over directly
+const liveSessions = new Map();
+
+// Disconnect reasons that look like a network blip rather than the user leaving
+const RESUMABLE_REASONS = new Set(['transport close', 'transport error', 'ping timeout']);
+
+// Small integer user ids, cheaper to store and compare than socket id strings
+let nextUserId = 1;
+
+// Drain state - set on SIGTERM during rolling deploys
+let isDraining = false;
+let drainTimer = null;
+
+// Session tokens: keep the session id from a valid token, otherwise start a new session
+io.use((socket, next) => {
+    socket.data.ip = handshakeIP(socket.handshake);
+
+    const session = verifySessionToken(socket.handshake.auth && socket.handshake.auth.token);
+    const issued = createSessionToken(socket.data.ip, Date.now(), session ? session.sessionId : undefined);
+
+    socket.data.sessionId = issued.sessionId;
+    socket.data.token = issued.token;
+    socket.data.trace = tracer.begin();
+    next();
+});
 
 // Socket.io connection handling WITH complete WebRTC signaling
 io.on('connection', (socket) => {
     console.log(`✅ User connected: ${socket.id}`);
+
+    // A session held for this client is resumed below, or released if we are draining
+    let held = heldSessions.get(socket.data.sessionId);
+    if (held) {
+        heldSessions.delete(socket.data.sessionId);
+    }
+
+    // Draining nodes send new users straight to another node
+    if (isDraining) {
+        if (held) {
+            releaseSession(held);
+        }
+        redirectSocket(socket);
+        return;
+    }
     
-    // Store user socket
-    userSockets.set(socket.id, socket);
-    
-    // User info
-    socket.userInfo = {
-        id: socket.id,
-        hobby: null,
-        country: 'Unknown',
-        countryCode: 'XX',
-        flag: '🌍',
-        connectedAt: new Date()
-    };
+    // Compact per-connection state on the socket's own data object:
+    // integer id, interned hobby and country codes, numeric timestamp
+    socket.data.uid = nextUserId++;
+    socket.data.hobby = -1;
+    socket.data.country = 0;
+    socket.data.queued = -1; // hobby queue the user is waiting in
+    socket.data.requeuedAt = 0; // when the user was put back in the queue after a room ended
+    socket.data.connectedAt = Date.now();
+
+    // The client came back before its old socket noticed the blip (ping timeout): take the
+    // session over from the old socket instead of waiting for it to be held
+    const previous = liveSessions.get(socket.data.sessionId);
+    if (previous && previous.connected) {
+        if (held) {
+            releaseSession(held);
+        }
+        held = takeOverSession(previous);
+    }
+    liveSessions.set(socket.data.sessionId, socket);
+
+    // Rebind a session held after a network blip, or tell the client it starts fresh
+    if (held) {
+        resumeSession(socket, held);
+    }
+    relay.send(socket, 'session', { token: socket.data.token, resumed: Boolean(held) });
+    delete socket.data.token;
+    traceSpan(socket, Tracer.HANDSHAKE);
 
     // Handle hobby preference setting
     socket.on('set-hobby-preference', (hobbyPreference) => {
+        const start = tracer.now();
         console.log(`🎯 User ${socket.id} set hobby preference: ${hobbyPreference}`);
-        socket.userInfo.hobby = hobbyPreference;
+        socket.data.hobby = getHobbyCode(hobbyPreference);
+        traceSpan(socket, Tracer.SET_HOBBY, start);
     });
 
     // Handle match finding - COMPLETE IMPLEMENTATION
     socket.on('find-match', () => {
-        console.log(`[FIND-MATCH] Event received from user ${socket.id} with hobby: ${socket.userInfo.hobby}`);
-
-        if (!socket.userInfo.hobby) {
-            console.log(`[WARNING] User ${socket.id} has not set hobby yet`);
-            socket.emit('error', { message: 'Set hobby preference first!' });
-            return;
-        }
-
-        // Remove from waiting list if present
-        if (waitingUsers.has(socket.id)) {
-            waitingUsers.delete(socket.id);
-            console.log(`[INFO] Removed user ${socket.id} from waiting list for restart`);
-        }
-
-        console.log(`[CURRENT WAITING] ${waitingUsers.size} users waiting`);
-
-        // Try to find a match
-        let matchFound = false;
-
-        for (const [waitingId, waitingSocket] of waitingUsers) {
-            console.log(`[CHECK] Checking waiting user ${waitingId} with hobby: ${waitingSocket.userInfo.hobby}`);
-
-            if (waitingSocket.userInfo.hobby === socket.userInfo.hobby) {
-                console.log(`[MATCH FOUND] ${socket.id} <-> ${waitingId}`);
-
-                // Remove matched user from waiting list
-                waitingUsers.delete(waitingId);
-
-                // Create room
-                const roomId = `room_${Date.now()}_${Math.random().toString(36).substr(2, 9)}`;
-
-                // Join both users to room
-                socket.join(roomId);
-                waitingSocket.join(roomId);
-
-                // Store room info
-                activeRooms.set(roomId, {
-                    user1: socket.id,
-                    user2: waitingId,
-                    hobby: socket.userInfo.hobby,
-                    startTime: new Date()
-                });
-
-                // Set room info on sockets
-                socket.roomId = roomId;
-                socket.partnerId = waitingId;
-                waitingSocket.roomId = roomId;
-                waitingSocket.partnerId = socket.id;
-
-                console.log(`[EMIT] Emitting match-found to ${socket.id} and ${waitingId}`);
-
-                // Notify both users
-                socket.emit('match-found', {
-                    roomId: roomId,
-                    partner: {
-                        country: waitingSocket.userInfo.country,
-                        countryCode: waitingSocket.userInfo.countryCode,
-                        flag: waitingSocket.userInfo.flag,
-                        hobby: waitingSocket.userInfo.hobby
-                    }
-                });
-
-                waitingSocket.emit('match-found', {
-                    roomId: roomId,
-                    partner: {
-                        country: socket.userInfo.country,
-                        countryCode: socket.userInfo.countryCode,
-                        flag: socket.userInfo.flag,
-                        hobby: socket.userInfo.hobby
-                    }
-                });
-
-                matchFound = true;
-                break;
-            }
-        }
-
-        if (!matchFound) {
-            // Add to waiting list
-            waitingUsers.set(socket.id, socket);
-            console.log(`[WAIT] Added user ${socket.id} to waiting list. Total waiting: ${waitingUsers.size}`);
-            socket.emit('waiting-for-match');
-        }
+        findMatch(socket);
     });
 
-    // WebRTC Signaling Handlers
+    // WebRTC Signaling Handlers - payloads are rebuilt from their allowed fields only
     socket.on('offer', (data) => {
         console.log(`📞 Offer from ${socket.id} to partner`);
-        if (socket.partnerId) {
-            const partnerSocket = userSockets.get(socket.partnerId);
-            if (partnerSocket) {
-                partnerSocket.emit('offer', {
-                    offer: data.offer,
-                    from: socket.id
-                });
+        const message = validate(socket, 'offer', data);
+        if (message) {
+            sdpMetrics.offers++;
+            sdpMetrics.bytesIn += Buffer.byteLength(message.offer.sdp);
+            if (config.SDP_COMPACTION_ENABLED) {
+                message.offer.sdp = compactSdp(message.offer.sdp, sdpPolicy);
             }
+            sdpMetrics.bytesOut += Buffer.byteLength(message.offer.sdp);
+            relay.forward(socket, 'offer', message);
+            traceSpan(socket, Tracer.OFFER_RELAY);
         }
     });
 
     socket.on('answer', (data) => {
         console.log(`✅ Answer from ${socket.id} to partner`);
-        if (socket.partnerId) {
-            const partnerSocket = userSockets.get(socket.partnerId);
-            if (partnerSocket) {
-                partnerSocket.emit('answer', {
-                    answer: data.answer,
-                    from: socket.id
-                });
-            }
+        const message = validate(socket, 'answer', data);
+        if (message) {
+            sdpMetrics.answers++;
+            // Answers are relayed as they are
+            const answerBytes = Buffer.byteLength(message.answer.sdp);
+            sdpMetrics.bytesIn += answerBytes;
+            sdpMetrics.bytesOut += answerBytes;
+            relay.forward(socket, 'answer', message);
+            traceSpan(socket, Tracer.ANSWER_RELAY);
         }
     });
 
     socket.on('ice-candidate', (data) => {
         console.log(`🧊 ICE candidate from ${socket.id} to partner`);
-        if (socket.partnerId) {
-            const partnerSocket = userSockets.get(socket.partnerId);
-            if (partnerSocket) {
-                partnerSocket.emit('ice-candidate', {
-                    candidate: data.candidate,
-                    from: socket.id
-                });
-            }
+        const message = validate(socket, 'ice-candidate', data);
+        if (message) {
+            relay.forward(socket, 'ice-candidate', message);
+            traceSpan(socket, Tracer.FIRST_ICE);
+        }
+    });
+
+    // Client-side call setup timing
+    socket.on('call-metrics', (data) => {
+        const message = validate(socket, 'call-metrics', data);
+        if (message) {
+            timeToFirstFrame.record(message.firstFrameMs);
         }
     });
 
@@ -233,69 +388,459 @@ io.on('connection', (socket) => {
         console.log(`➡️ ${socket.id} wants next stranger`);
         handleDisconnection(socket, false);
         
-        // Start new search
-        setTimeout(() => {
-            socket.emit('find-match');
-        }, 1000);
+        // Start new search right away - no client round trip
+        requeue(socket);
     });
 
     // Handle report
     socket.on('report-user', (data) => {
         console.log(`⚠️ User ${socket.id} reported partner`);
-        // In production, save to database
+        const partnerSocket = relay.localPartner(socket);
+        if (partnerSocket) {
+            // Country and hobby of the reported user feed the offline analytics rollups
+            reportLog.append({
+                id: Date.now().toString(),
+                reportedUserId: partnerSocket.data.sessionId,
+                reporterIP: socket.data.ip,
+                reason: ReportLog.REASONS.includes(data && data.reason) ? data.reason : 'other',
+                country: dictionary.getCountry(partnerSocket.data.country).countryCode,
+                hobby: getHobby(partnerSocket.data.hobby),
+                timestamp: new Date().toISOString(),
+                status: 'pending'
+            });
+            violations.recordReport(partnerSocket.data.sessionId, socket.data.ip);
+        }
         handleDisconnection(socket, false);
     });
 
-    // Handle emoji reactions
-    socket.on('emoji-reaction', (data) => {
-        if (socket.partnerId) {
-            const partnerSocket = userSockets.get(socket.partnerId);
-            if (partnerSocket) {
-                partnerSocket.emit('emoji-reaction', {
-                    emoji: data.emoji,
-                    from: socket.id
-                });
+    // Handle emoji reactions - batched per window and relayed as one count-per-emoji frame
+    socket.on('emoji-reactions', (data) => {
+        const message = validate(socket, 'emoji-reactions', data);
+        if (message) {
+            for (const emoji in message.reactions) {
+                addReaction(socket, emoji, message.reactions[emoji]);
             }
         }
     });
 
-    // Handle disconnection
-    socket.on('disconnect', () => {
-        console.log(`❌ User disconnected: ${socket.id}`);
-        handleDisconnection(socket, true);
+    // Single reactions from clients that predate batching
+    socket.on('emoji-reaction', (data) => {
+        const message = validate(socket, 'emoji-reaction', data);
+        if (message) {
+            addReaction(socket, message.emoji, 1);
+        }
+    });
+
+    // Handle disconnection - network blips hold the session open for a resume
+    socket.on('disconnect', (reason) => {
+        console.log(`❌ User disconnected: ${socket.id} (${reason})`);
+        if (liveSessions.get(socket.data.sessionId) === socket) {
+            liveSessions.delete(socket.data.sessionId);
+        }
+
+        // Its room and queue place already belong to the session's new socket
+        if (socket.data.takenOver) {
+            return;
+        }
+
+        if (RESUMABLE_REASONS.has(reason) && !isDraining) {
+            holdSession(socket);
+        } else {
+            handleDisconnection(socket, true);
+        }
     });
 });
 
+// Apply an automatic ban to a session: its id comes back in the client's token on every
+// reconnect, so the ban holds whether or not the user is connected right now. Sockets of
+// the session that are connected also get their client IP banned and leave the queue.
+// Bans are rare, so a scan of this node's sockets is fine here.
+violations.on('ban', (sessionId, banMs) => {
+    console.log(`🚫 Banning session ${sessionId} for ${banMs}ms`);
+    bannedUsers.add(sessionId, banMs);
+
+    for (const userSocket of io.sockets.sockets.values()) {
+        if (userSocket.data.sessionId === sessionId) {
+            bannedUsers.add(userSocket.data.ip, banMs);
+            dequeue(userSocket);
+        }
+    }
+});
+
+// Match a user with the first compatible waiting user, or queue them.
+// requeued: the user is put back in the queue because their room ended
+function findMatch(socket, requeued = false) {
+    const start = tracer.now();
+    console.log(`[FIND-MATCH] Event received from user ${socket.id} with hobby: ${getHobby(socket.data.hobby)}`);
+
+    if (socket.data.hobby < 0) {
+        console.log(`[WARNING] User ${socket.id} has not set hobby yet`);
+        relay.send(socket, 'error', { message: 'Set hobby preference first!' });
+        return;
+    }
+
+    // No new matches while draining
+    if (isDraining) {
+        redirectSocket(socket);
+        return;
+    }
+
+    if (matcher.isBlocked(socket)) {
+        relay.send(socket, 'error', { message: 'You are temporarily banned from matching' });
+        return;
+    }
+
+    // Remove from waiting list if present
+    if (socket.data.queued >= 0) {
+        dequeue(socket);
+        console.log(`[INFO] Removed user ${socket.id} from waiting list for restart`);
+    }
+
+    console.log(`[CURRENT WAITING] ${waitingUsers.size} users waiting`);
+
+    // A new matching round: only requeues count toward time to next partner,
+    // and every stage from here on is traced again
+    socket.data.requeuedAt = requeued ? Date.now() : 0;
+    if (socket.data.trace) {
+        tracer.reset(socket.data.trace);
+        tracer.span(socket.data.trace, Tracer.ENQUEUE, start);
+    }
+
+    // Try to find a match - only users with the same hobby are in this queue
+    const waitingSocket = matcher.findPartner(socket);
+    if (waitingSocket) {
+        // Remove matched user from waiting list
+        dequeue(waitingSocket);
+        partnerHistory.record(socket.data.uid, waitingSocket.data.uid);
+        violations.recordPair(socket.data.sessionId, waitingSocket.id, waitingSocket.data.sessionId);
+        violations.recordPair(waitingSocket.data.sessionId, socket.id, socket.data.sessionId);
+        matchMetrics.matches++;
+        recordRequeueLatency(socket);
+        recordRequeueLatency(waitingSocket);
+
+        console.log(`[MATCH FOUND] ${socket.id} <-> ${waitingSocket.id}`);
+
+        // Create room
+        const roomId = `room_${Date.now()}_${Math.random().toString(36).substr(2, 9)}`;
+
+        // Join both users to room
+        socket.join(roomId);
+        waitingSocket.join(roomId);
+
+        // Store room info
+        activeRooms.set(roomId, {
+            user1: socket.id,
+            user2: waitingSocket.id,
+            hobby: socket.data.hobby,
+            startTime: Date.now()
+        });
+
+        // Set room info on sockets
+        socket.roomId = roomId;
+        waitingSocket.roomId = roomId;
+        relay.pair(socket, waitingSocket);
+        relay.pair(waitingSocket, socket);
+
+        traceSpan(socket, Tracer.MATCH);
+        traceSpan(waitingSocket, Tracer.MATCH);
+
+        console.log(`[EMIT] Emitting match-found to ${socket.id} and ${waitingSocket.id}`);
+
+        // Notify both users - partner country and hobby are dictionary codes
+        relay.send(socket, 'match-found', {
+            roomId: roomId,
+            dictionaryVersion: dictionary.version,
+            partner: {
+                country: waitingSocket.data.country,
+                hobby: waitingSocket.data.hobby
+            }
+        });
+
+        relay.send(waitingSocket, 'match-found', {
+            roomId: roomId,
+            dictionaryVersion: dictionary.version,
+            partner: {
+                country: socket.data.country,
+                hobby: socket.data.hobby
+            }
+        });
+
+        traceSpan(socket, Tracer.MATCH_FOUND);
+        traceSpan(waitingSocket, Tracer.MATCH_FOUND);
+    } else {
+        // Add to waiting list
+        waitingUsers.set(socket.data.hobby, socket.data.uid, socket.id);
+        socket.data.queued = socket.data.hobby;
+        console.log(`[WAIT] Added user ${socket.id} to waiting list. Total waiting: ${waitingUsers.size}`);
+        relay.send(socket, 'waiting-for-match');
+    }
+}
+
+// Close a lifecycle span for a sampled connection; a no-op for everyone else
+function traceSpan(socket, stage, start) {
+    if (socket.data.trace) {
+        tracer.span(socket.data.trace, stage, start);
+    }
+}
+
+// Rebuild a client payload from its allowed fields; invalid payloads are dropped
+function validate(socket, event, data) {
+    const message = messages[event](data);
+    if (!message) {
+        rejectedMessages++;
+        console.log(`[INVALID] Dropped ${event} from ${socket.id}`);
+    }
+    return message;
+}
+
+// Count a reaction toward the sender's next batch
+function addReaction(socket, emoji, count) {
+    if (!socket.partnerId) {
+        return;
+    }
+
+    let batch = pendingReactions.get(socket);
+    if (!batch) {
+        batch = {};
+        pendingReactions.set(socket, batch);
+    }
+    if (batch[emoji] === undefined && Object.keys(batch).length >= MAX_REACTION_EMOJI) {
+        return;
+    }
+    batch[emoji] = Math.min((batch[emoji] || 0) + count, MAX_REACTION_COUNT);
+
+    if (!reactionTimer) {
+        reactionTimer = setTimeout(flushReactions, config.EMOJI_WINDOW_MS);
+    }
+}
+
+// One frame per sender per window, however many clicks it covers
+function flushReactions() {
+    reactionTimer = null;
+    for (const [socket, reactions] of pendingReactions) {
+        if (socket.connected) {
+            relay.forwardVolatile(socket, 'emoji-reactions', { reactions });
+        }
+    }
+    pendingReactions.clear();
+}
+
+// Put a user whose room just ended straight back into matching
+function requeue(socket) {
+    findMatch(socket, true);
+}
+
+function recordRequeueLatency(socket) {
+    if (socket.data.requeuedAt) {
+        timeToNextPartner.record(Date.now() - socket.data.requeuedAt);
+        socket.data.requeuedAt = 0;
+    }
+}
+
+// Remove a user from their hobby queue
+function dequeue(socket) {
+    if (socket.data.queued >= 0) {
+        waitingUsers.delete(socket.data.queued, socket.data.uid);
+        socket.data.queued = -1;
+    }
+}
+
 // Handle user disconnection
 function handleDisconnection(socket, isDisconnecting = false) {
     // Remove from waiting list
-    waitingUsers.delete(socket.id);
+    dequeue(socket);
     
     // Handle active room
     if (socket.roomId && socket.partnerId) {
-        const partnerSocket = userSockets.get(socket.partnerId);
-        
-        if (partnerSocket) {
-            // Notify partner
-            partnerSocket.emit('partner-disconnected');
-            
-            // Clean up partner
-            partnerSocket.leave(socket.roomId);
-            delete partnerSocket.roomId;
-            delete partnerSocket.partnerId;
-        }
-        
-        // Clean up room
-        activeRooms.delete(socket.roomId);
+        closeRoom(socket.roomId, socket.partnerId);
         socket.leave(socket.roomId);
         delete socket.roomId;
-        delete socket.partnerId;
+        relay.unpair(socket);
     }
-    
-    // Remove from user sockets if disconnecting
+
     if (isDisconnecting) {
-        userSockets.delete(socket.id);
+        partnerHistory.forget(socket.data.uid);
+    }
+}
+
+// End a room and notify the partner who is still in it
+function closeRoom(roomId, partnerId) {
+    const partnerSocket = io.sockets.sockets.get(partnerId);
+
+    if (partnerSocket) {
+        // Notify partner - they are already back in the queue
+        relay.send(partnerSocket, 'partner-disconnected', { requeued: true });
+
+        // Clean up partner
+        partnerSocket.leave(roomId);
+        delete partnerSocket.roomId;
+        relay.unpair(partnerSocket);
+
+        requeue(partnerSocket);
+    }
+
+    // Clean up room
+    activeRooms.delete(roomId);
+
+    if (isDraining) {
+        checkDrainComplete();
+    }
+}
+
+// Keep a disconnected user's room and queue position for the resume window
+// The part of a user's state a resumed socket takes over
+function snapshotSession(socket) {
+    return {
+        socketId: socket.id,
+        uid: socket.data.uid,
+        hobby: socket.data.hobby,
+        country: socket.data.country,
+        queued: socket.data.queued,
+        roomId: socket.roomId || null
+    };
+}
+
+function holdSession(socket) {
+    const held = snapshotSession(socket);
+
+    // Same uid, null socket: the queue entry keeps its place but is skipped by matching
+    if (held.queued >= 0) {
+        waitingUsers.set(held.queued, held.uid, null);
+    }
+
+    // Another socket of this session dropped earlier; only the latest one can be resumed
+    const existing = heldSessions.get(socket.data.sessionId);
+    if (existing) {
+        heldSessions.delete(socket.data.sessionId);
+        releaseSession(existing);
+    }
+
+    heldSessions.add(socket.data.sessionId, config.RESUME_WINDOW_MS, held);
+}
+
+// Drop a session's stale socket and hand its state to resumeSession
+function takeOverSession(previous) {
+    const held = snapshotSession(previous);
+    previous.data.takenOver = true;
+    previous.disconnect(true);
+    return held;
+}
+
+// Rebind a reconnected socket to its held room and queue position
+function resumeSession(socket, held) {
+    console.log(`🔁 Session resumed: ${held.socketId} -> ${socket.id}`);
+
+    socket.data.uid = held.uid;
+    socket.data.hobby = held.hobby;
+    socket.data.country = held.country;
+    socket.data.queued = held.queued;
+
+    if (held.queued >= 0) {
+        waitingUsers.set(held.queued, held.uid, socket.id);
+    }
+
+    const room = held.roomId && activeRooms.get(held.roomId);
+    if (room) {
+        // The room entry has the partner's current socket id, even if they resumed too
+        const partnerId = room.user1 === held.socketId ? room.user2 : room.user1;
+        if (room.user1 === held.socketId) {
+            room.user1 = socket.id;
+        } else {
+            room.user2 = socket.id;
+        }
+
+        socket.join(held.roomId);
+        socket.roomId = held.roomId;
+        socket.partnerId = partnerId;
+
+        const partnerSocket = io.sockets.sockets.get(partnerId);
+        if (partnerSocket) {
+            relay.pair(socket, partnerSocket);
+            relay.pair(partnerSocket, socket);
+        }
+    } else if (held.roomId) {
+        // The partner left while we were away
+        relay.send(socket, 'partner-disconnected');
+    }
+}
+
+// Resume window passed: finish the disconnect that was put on hold
+function releaseSession(held) {
+    partnerHistory.forget(held.uid);
+
+    if (held.queued >= 0) {
+        waitingUsers.delete(held.queued, held.uid);
+    }
+
+    const room = held.roomId && activeRooms.get(held.roomId);
+    if (room) {
+        closeRoom(held.roomId, room.user1 === held.socketId ? room.user2 : room.user1);
+    }
+}
+
+// Send a user to another node with a jittered reconnect hint so that
+// everyone leaving a draining node does not reconnect at the same moment
+function redirectSocket(socket) {
+    const reconnectAfter = config.DRAIN_RECONNECT_BASE_MS +
+        Math.floor(Math.random() * config.DRAIN_RECONNECT_JITTER_MS);
+
+    dequeue(socket);
+    relay.send(socket, 'server-draining', { reconnectAfter });
+    socket.outbound.end();
+}
+
+// Exit once the last active room has ended
+function checkDrainComplete() {
+    if (!drainTimer || activeRooms.size > 0) {
+        return;
     }
+
+    console.log('All rooms closed, drain complete');
+    clearTimeout(drainTimer);
+    drainTimer = null;
+    exitProcess();
+}
+
+// Flush buffered reports and exported spans before exiting
+function exitProcess() {
+    tracer.close();
+    reportLog.close()
+        .catch(error => console.error('Failed to close report log:', error))
+        .finally(() => process.exit(0));
+}
+
+// Graceful drain: stop matching, report not-ready, move waiting users to
+// other nodes and let active rooms end naturally within a grace period
+function startDrain() {
+    if (isDraining) {
+        return;
+    }
+
+    isDraining = true;
+    console.log(`Draining: ${waitingUsers.size} waiting users, ${activeRooms.size} active rooms`);
+
+    // Stop accepting new HTTP and websocket connections
+    server.close(() => {
+        console.log('HTTP server closed');
+    });
+
+    for (const waitingId of Array.from(waitingUsers.socketIds())) {
+        const waitingSocket = io.sockets.sockets.get(waitingId);
+        if (waitingSocket) {
+            redirectSocket(waitingSocket);
+        }
+    }
+
+    drainTimer = setTimeout(() => {
+        console.log(`Drain deadline reached with ${activeRooms.size} active rooms`);
+        drainTimer = null;
+        for (const userSocket of io.sockets.sockets.values()) {
+            redirectSocket(userSocket);
+        }
+        exitProcess();
+    }, config.DRAIN_TIMEOUT_MS);
+
+    checkDrainComplete();
 }
 
 // Error handling middleware
@@ -308,13 +853,68 @@ app.use((error, req, res, next) => {
     });
 });
 
+// Sizes of every per-connection structure; all but the TTL-bound ones return to zero
+// once their users are gone
+function structureSizes() {
+    const adapter = io.of('/').adapter;
+    return {
+        sockets: io.sockets.sockets.size,
+        waitingUsers: waitingUsers.size,
+        activeRooms: activeRooms.size,
+        heldSessions: heldSessions.size,
+        liveSessions: liveSessions.size,
+        partnerHistories: partnerHistory.histories.size,
+        pendingReactions: pendingReactions.size,
+        outboundQueued: outboundMetrics.queued,
+        adapterRooms: adapter.rooms.size,
+        adapterSids: adapter.sids.size,
+        // Expire on their own TTLs
+        bannedUsers: bannedUsers.size,
+        violations: violations.violations.size,
+        reporters: violations.reporters.size,
+        reportPairs: violations.pairs.size
+    };
+}
+
+// Soak tests fork the server with SOAK_TEST=true and poll it over IPC (bench/soak.js).
+// Heap snapshots are only written to PROFILE_DIR, under a name built from the cycle number.
+if (process.send && config.SOAK_TEST) {
+    process.on('message', (message) => {
+        if (!message || typeof message !== 'object') {
+            return;
+        }
+        if (message.type === 'soak-snapshot') {
+            if (global.gc) {
+                global.gc();
+            }
+            process.send({
+                type: 'soak-snapshot',
+                sizes: structureSizes(),
+                heapUsed: process.memoryUsage().heapUsed
+            });
+        } else if (message.type === 'heap-snapshot') {
+            const cycle = parseInt(message.cycle) || 0;
+            fs.mkdirSync(config.PROFILE_DIR, { recursive: true });
+            const file = path.join(config.PROFILE_DIR, `soak-${process.pid}-${cycle}.heapsnapshot`);
+            process.send({ type: 'heap-snapshot', file: v8.writeHeapSnapshot(file) });
+        }
+    });
+}
+
+// Profile a live node without the admin API: kill -USR2 <pid> with PROFILE_SIGNAL=SIGUSR2
+if (config.PROFILE_SIGNAL) {
+    process.on(config.PROFILE_SIGNAL, () => {
+        console.log(`🔬 ${config.PROFILE_SIGNAL} received: CPU profile for ${config.PROFILE_DEFAULT_SECONDS}s`);
+        profiler.cpuProfile(config.PROFILE_DEFAULT_SECONDS)
+            .then(capture => console.log(`🔬 CPU profile written to ${capture.file}`))
+            .catch(error => console.error('Profiling failed:', error.message));
+    });
+}
+
 // Graceful shutdown
 process.on('SIGTERM', () => {
-    console.log('SIGTERM signal received: closing HTTP server');
-    server.close(() => {
-        console.log('HTTP server closed');
-        process.exit(0);
-    });
+    console.log('SIGTERM signal received: draining');
+    startDrain();
 });
 
 server.listen(PORT, () => {
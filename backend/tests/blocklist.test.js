@@ -0,0 +1,64 @@
+const Blocklist = require('../utils/blocklist');
+
+function ips(count, offset = 0) {
+    return Array.from({ length: count }, (_, i) => `10.${(i + offset) >> 16 & 255}.${(i + offset) >> 8 & 255}.${(i + offset) & 255}`);
+}
+
+describe('Blocklist', () => {
+    afterEach(() => {
+        jest.useRealTimers();
+    });
+
+    test('blocks added keys and nothing else', () => {
+        const blocklist = new Blocklist({ capacity: 1000 });
+        const blocked = ips(500);
+        blocked.forEach(ip => blocklist.add(ip, 60000));
+
+        expect(blocked.every(ip => blocklist.has(ip))).toBe(true);
+        expect(ips(500, 500).some(ip => blocklist.has(ip))).toBe(false);
+        expect(blocklist.has('')).toBe(false);
+        expect(blocklist.has(undefined)).toBe(false);
+        blocklist.entries.clear();
+    });
+
+    test('removing keys leaves no false negatives for the keys still blocked', () => {
+        // A small filter so removed and remaining keys share many counters
+        const blocklist = new Blocklist({ capacity: 200, errorRate: 0.1 });
+        const keys = ips(400);
+        keys.forEach(ip => blocklist.add(ip, 60000));
+
+        const removed = keys.filter((_, i) => i % 2 === 0);
+        const remaining = keys.filter((_, i) => i % 2 === 1);
+        removed.forEach(ip => expect(blocklist.delete(ip)).toBe(true));
+
+        expect(remaining.every(ip => blocklist.has(ip))).toBe(true);
+        expect(removed.some(ip => blocklist.has(ip))).toBe(false);
+        expect(blocklist.size).toBe(remaining.length);
+        blocklist.entries.clear();
+    });
+
+    test('re-adding a blocked key does not count it twice in the filter', () => {
+        const blocklist = new Blocklist({ capacity: 100 });
+        blocklist.add('203.0.113.7', 60000);
+        blocklist.add('203.0.113.7', 60000);
+        blocklist.delete('203.0.113.7');
+
+        expect(blocklist.has('203.0.113.7')).toBe(false);
+        expect(blocklist.counters.every(count => count === 0)).toBe(true);
+    });
+
+    test('expired keys leave the filter while others stay blocked', () => {
+        jest.useFakeTimers();
+        const blocklist = new Blocklist({ capacity: 100, tickMs: 100 });
+        blocklist.add('short', 200);
+        blocklist.add('long', 1000);
+
+        jest.advanceTimersByTime(200);
+        expect(blocklist.has('short')).toBe(false);
+        expect(blocklist.has('long')).toBe(true);
+
+        jest.advanceTimersByTime(800);
+        expect(blocklist.has('long')).toBe(false);
+        expect(blocklist.counters.every(count => count === 0)).toBe(true);
+    });
+});
@@ -0,0 +1,24 @@
+const { clientIP, handshakeIP } = require('../utils/clientIP');
+
+describe('clientIP', () => {
+    test('uses the direct peer when no proxy is trusted', () => {
+        expect(clientIP('172.18.0.5', '203.0.113.7', 0)).toBe('172.18.0.5');
+    });
+
+    test('takes the address the trusted proxy saw, not what the client claims', () => {
+        // The client sent "X-Forwarded-For: 6.6.6.6"; nginx appended the real address
+        expect(clientIP('172.18.0.5', '6.6.6.6, 203.0.113.7', 1)).toBe('203.0.113.7');
+        expect(clientIP('172.18.0.5', '6.6.6.6, 203.0.113.7, 10.0.0.2', 2)).toBe('203.0.113.7');
+    });
+
+    test('falls back to the furthest address when the chain is shorter than the hops', () => {
+        expect(clientIP('172.18.0.5', '203.0.113.7', 3)).toBe('203.0.113.7');
+        expect(clientIP('172.18.0.5', undefined, 1)).toBe('172.18.0.5');
+        expect(clientIP('172.18.0.5', ' , ', 1)).toBe('172.18.0.5');
+    });
+
+    test('reads Socket.io handshakes', () => {
+        const handshake = { address: '172.18.0.5', headers: { 'x-forwarded-for': '203.0.113.7' } };
+        expect(handshakeIP(handshake)).toBe(clientIP('172.18.0.5', '203.0.113.7'));
+    });
+});
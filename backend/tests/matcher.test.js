@@ -0,0 +1,78 @@
+const Matcher = require('../utils/matcher');
+const MatchQueue = require('../utils/matchQueue');
+const PartnerHistory = require('../utils/partnerHistory');
+const Blocklist = require('../utils/blocklist');
+
+function user(uid, hobby = 1) {
+    return { id: `socket-${uid}`, data: { uid, hobby, sessionId: `session-${uid}`, ip: `203.0.113.${uid}` } };
+}
+
+describe('Matcher', () => {
+    let queue;
+    let sockets;
+    let history;
+    let metrics;
+    let blocklist;
+    let matcher;
+
+    function wait(socket) {
+        sockets.set(socket.id, socket);
+        queue.set(socket.data.hobby, socket.data.uid, socket.id);
+    }
+
+    beforeEach(() => {
+        queue = new MatchQueue();
+        sockets = new Map();
+        history = new PartnerHistory({ size: 4 });
+        metrics = { repeatPairs: 0, repeatPairsAvoided: 0 };
+        blocklist = new Blocklist({ capacity: 100 });
+        matcher = new Matcher({ queue, sockets, history, rematchWindowMs: 1000, metrics, blocklist });
+    });
+
+    afterEach(() => {
+        blocklist.entries.clear();
+    });
+
+    test('picks the longest-waiting user with the same hobby', () => {
+        wait(user(1, 2));
+        wait(user(2));
+        wait(user(3));
+
+        expect(matcher.findPartner(user(4)).id).toBe('socket-2');
+        expect(matcher.findPartner(user(5, 3))).toBeNull();
+    });
+
+    test('skips held entries and removes users who are gone', () => {
+        queue.set(1, 1, null);
+        wait(user(2));
+        wait(user(3));
+        sockets.delete('socket-2');
+
+        expect(matcher.findPartner(user(4)).id).toBe('socket-3');
+        expect(Array.from(queue.queue(1).keys())).toEqual([1, 3]);
+    });
+
+    test('skips recent partners until the rematch window has passed', () => {
+        wait(user(1));
+        wait(user(2));
+        history.record(3, 1, 10000);
+
+        expect(matcher.findPartner(user(3), 10500).id).toBe('socket-2');
+        expect(metrics.repeatPairsAvoided).toBe(1);
+
+        expect(matcher.findPartner(user(3), 11000).id).toBe('socket-1');
+        expect(metrics.repeatPairs).toBe(1);
+    });
+
+    test('skips candidates whose session or IP was banned after they queued', () => {
+        wait(user(1));
+        wait(user(2));
+        wait(user(3));
+        blocklist.add('session-1', 60000);
+        blocklist.add('203.0.113.2', 60000);
+
+        expect(matcher.findPartner(user(4)).id).toBe('socket-3');
+        expect(matcher.isBlocked(user(1))).toBe(true);
+        expect(matcher.isBlocked(user(4))).toBe(false);
+    });
+});
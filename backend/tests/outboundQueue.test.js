@@ -0,0 +1,73 @@
+const EventEmitter = require('events');
+const OutboundQueue = require('../utils/outboundQueue');
+
+function fakeSocket() {
+    const socket = new EventEmitter();
+    socket.id = 'socket-1';
+    socket.conn = new EventEmitter();
+    socket.conn.writeBuffer = [];
+    socket.sent = [];
+    socket.emit = (event, payload) => socket.sent.push([event, payload]);
+    socket.disconnect = jest.fn();
+    return socket;
+}
+
+function nextTick() {
+    return new Promise(resolve => setImmediate(resolve));
+}
+
+describe('OutboundQueue', () => {
+    let socket;
+    let metrics;
+    let queue;
+
+    beforeEach(() => {
+        socket = fakeSocket();
+        metrics = { queued: 0, peakDepth: 0, coalesced: 0, dropped: 0, slowDisconnects: 0 };
+        queue = new OutboundQueue(socket, { highWater: 1, limit: 3, metrics });
+    });
+
+    test('queues while congested and flushes signaling before control', () => {
+        socket.conn.writeBuffer.length = 1;
+        expect(queue.send('session', { token: 't' })).toBe(true);
+        expect(queue.send('offer', { sdp: 'o' })).toBe(true);
+        expect(socket.sent).toEqual([]);
+
+        socket.conn.writeBuffer.length = 0;
+        socket.conn.emit('drain');
+        expect(socket.sent.map(([event]) => event)).toEqual(['offer', 'session']);
+        expect(metrics.queued).toBe(0);
+    });
+
+    test('an overflowing slow consumer is dropped and disconnected on the next tick', async () => {
+        socket.conn.writeBuffer.length = 1;
+        queue.send('offer', {});
+        queue.send('answer', {});
+        queue.send('ice-candidate', {});
+
+        expect(queue.send('ice-candidate', {})).toBe(false);
+        expect(socket.disconnect).not.toHaveBeenCalled();
+        expect(queue.depth).toBe(0);
+        expect(metrics.slowDisconnects).toBe(1);
+
+        // Nothing more is accepted while the disconnect is pending
+        expect(queue.send('partner-disconnected')).toBe(false);
+
+        await nextTick();
+        expect(socket.disconnect).toHaveBeenCalledTimes(1);
+    });
+
+    test('end disconnects after the queued messages are sent', async () => {
+        socket.conn.writeBuffer.length = 1;
+        queue.send('server-draining', { reconnectAfter: 1000 });
+        queue.end();
+
+        await nextTick();
+        expect(socket.disconnect).not.toHaveBeenCalled();
+
+        socket.conn.writeBuffer.length = 0;
+        socket.conn.emit('drain');
+        expect(socket.sent).toEqual([['server-draining', { reconnectAfter: 1000 }]]);
+        expect(socket.disconnect).toHaveBeenCalledWith(true);
+    });
+});
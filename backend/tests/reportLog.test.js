@@ -0,0 +1,75 @@
+const fs = require('fs');
+const os = require('os');
+const path = require('path');
+const ReportLog = require('../utils/reportLog');
+
+function report(id, reportedUserId = `user-${id}`) {
+    return { id: String(id), reportedUserId, reason: 'spam', status: 'pending' };
+}
+
+function committed(log) {
+    const file = path.join(log.dir, 'reports-000001.log');
+    return fs.readFileSync(file, 'utf8').split('\n').filter(Boolean).map(line => JSON.parse(line).id);
+}
+
+describe('ReportLog', () => {
+    let dir;
+    let log;
+
+    beforeEach(async () => {
+        dir = fs.mkdtempSync(path.join(os.tmpdir(), 'report-log-'));
+        log = new ReportLog({ dir, flushMs: 60000, maxTrackedUsers: 3 });
+        await log.open();
+    });
+
+    afterEach(async () => {
+        await log.close().catch(() => {});
+        fs.rmSync(dir, { recursive: true, force: true });
+    });
+
+    test('a failed commit keeps its batch, ahead of later reports', async () => {
+        log.append(report(1));
+        log.append(report(2));
+
+        const write = log.handle.write.bind(log.handle);
+        log.handle.write = async (data) => {
+            // A torn write: half the batch reaches the file before the error
+            await write(data.slice(0, data.length >> 1));
+            throw new Error('EIO');
+        };
+        await expect(log.flush()).rejects.toThrow();
+        expect(log.pending).toHaveLength(2);
+
+        log.handle.write = write;
+        log.append(report(3));
+        await log.flush();
+
+        expect(committed(log)).toEqual(['1', '2', '3']);
+        expect(log.pending).toHaveLength(0);
+    });
+
+    test('a failed datasync is retried rather than lost', async () => {
+        log.append(report(1));
+
+        const datasync = log.handle.datasync.bind(log.handle);
+        log.handle.datasync = async () => {
+            throw new Error('EIO');
+        };
+        await expect(log.flush()).rejects.toThrow();
+
+        log.handle.datasync = datasync;
+        await log.flush();
+
+        expect(committed(log)).toEqual(['1']);
+    });
+
+    test('the per-user index keeps only the most recently reported users', () => {
+        ['a', 'b', 'c', 'a', 'd'].forEach((user, i) => log.append(report(i, user)));
+
+        expect(log.violations.size).toBe(3);
+        expect(log.getViolationCount('a')).toBe(2);
+        expect(log.getViolationCount('b')).toBe(0);
+        expect(log.getViolationCount('d')).toBe(1);
+        expect(log.getStats().totalReports).toBe(5);
+    });
+});
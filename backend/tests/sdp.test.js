@@ -0,0 +1,95 @@
+const { DEFAULT_POLICY, compactSdp } = require('../utils/sdp');
+
+const offer = [
+    'v=0',
+    'o=- 4611731400430051336 2 IN IP4 127.0.0.1',
+    's=-',
+    't=0 0',
+    'a=group:BUNDLE 0 1',
+    'm=audio 9 UDP/TLS/RTP/SAVPF 111 63 9',
+    'a=mid:0',
+    'a=extmap:1 urn:ietf:params:rtp-hdrext:ssrc-audio-level',
+    'a=extmap:4 urn:ietf:params:rtp-hdrext:sdes:mid',
+    'a=rtpmap:111 opus/48000/2',
+    'a=rtcp-fb:111 transport-cc',
+    'a=fmtp:111 minptime=10;useinbandfec=1',
+    'a=rtpmap:63 red/48000/2',
+    'a=fmtp:63 111/111',
+    'a=rtpmap:9 G722/8000',
+    'm=video 9 UDP/TLS/RTP/SAVPF 96 97 98 99 100 101 45 46',
+    'a=mid:1',
+    'a=extmap:14 urn:ietf:params:rtp-hdrext:toffset',
+    'a=extmap:4 urn:ietf:params:rtp-hdrext:sdes:mid',
+    'a=rtpmap:96 VP8/90000',
+    'a=rtcp-fb:96 nack',
+    'a=rtpmap:97 rtx/90000',
+    'a=fmtp:97 apt=96',
+    'a=rtpmap:98 VP9/90000',
+    'a=fmtp:98 profile-id=0',
+    'a=rtpmap:99 rtx/90000',
+    'a=fmtp:99 apt=98',
+    'a=rtpmap:100 VP9/90000',
+    'a=fmtp:100 profile-id=2',
+    'a=rtpmap:101 rtx/90000',
+    'a=fmtp:101 apt=100',
+    'a=rtpmap:45 AV1/90000',
+    'a=rtpmap:46 rtx/90000',
+    'a=fmtp:46 apt=45',
+    ''
+].join('\r\n');
+
+function section(sdp, kind) {
+    const lines = sdp.split('\r\n');
+    const start = lines.findIndex(line => line.startsWith(`m=${kind}`));
+    const end = lines.findIndex((line, i) => i > start && line.startsWith('m='));
+    return lines.slice(start, end === -1 ? undefined : end);
+}
+
+describe('compactSdp', () => {
+    test('keeps only allowed codecs and their RTX, and rewrites the m= line', () => {
+        const video = section(compactSdp(offer, { ...DEFAULT_POLICY, codecs: ['opus', 'VP8'] }), 'video');
+
+        expect(video[0]).toBe('m=video 9 UDP/TLS/RTP/SAVPF 96 97');
+        expect(video).toContain('a=rtpmap:96 VP8/90000');
+        expect(video).toContain('a=rtcp-fb:96 nack');
+        expect(video).toContain('a=fmtp:97 apt=96');
+        expect(video.some(line => /VP9|AV1|apt=98|apt=45/.test(line))).toBe(false);
+        expect(video).toContain('a=mid:1');
+    });
+
+    test('caps payload types per codec', () => {
+        const onePerCodec = section(compactSdp(offer, { ...DEFAULT_POLICY, codecs: ['VP9'], maxPerCodec: 1 }), 'video');
+        expect(onePerCodec[0]).toBe('m=video 9 UDP/TLS/RTP/SAVPF 98 99');
+
+        const twoPerCodec = section(compactSdp(offer, { ...DEFAULT_POLICY, codecs: ['VP9'], maxPerCodec: 2 }), 'video');
+        expect(twoPerCodec[0]).toBe('m=video 9 UDP/TLS/RTP/SAVPF 98 99 100 101');
+    });
+
+    test('drops header extensions outside the policy', () => {
+        const compacted = compactSdp(offer);
+
+        expect(compacted).not.toContain('toffset');
+        expect(compacted).toContain('a=extmap:4 urn:ietf:params:rtp-hdrext:sdes:mid');
+        expect(compacted).toContain('a=extmap:1 urn:ietf:params:rtp-hdrext:ssrc-audio-level');
+    });
+
+    test('leaves a section alone when no allowed codec is offered', () => {
+        const audio = section(compactSdp(offer, { ...DEFAULT_POLICY, codecs: ['VP8'] }), 'audio');
+
+        expect(audio).toEqual(section(offer, 'audio'));
+    });
+
+    test('keeps session-level lines and CRLF line endings', () => {
+        const compacted = compactSdp(offer);
+
+        expect(compacted.startsWith('v=0\r\no=- 4611731400430051336 2 IN IP4 127.0.0.1\r\ns=-\r\nt=0 0\r\n')).toBe(true);
+        expect(compacted).toContain('a=group:BUNDLE 0 1');
+        expect(compacted.length).toBeLessThan(offer.length);
+    });
+
+    test('does not touch non-RTP sections', () => {
+        const withData = `${offer}m=application 9 UDP/DTLS/SCTP webrtc-datachannel\r\na=mid:2\r\na=sctp-port:5000\r\n`;
+
+        expect(section(compactSdp(withData), 'application')).toEqual(section(withData, 'application'));
+    });
+});
@@ -0,0 +1,53 @@
+const config = require('../config/environment');
+const { createSessionToken, verifySessionToken, hashIP } = require('../utils/sessionToken');
+
+describe('session tokens', () => {
+    const now = Date.UTC(2025, 0, 1);
+
+    test('a fresh token verifies and carries its session id, age and IP hash', () => {
+        const issued = createSessionToken('203.0.113.7', now);
+        const session = verifySessionToken(issued.token, now + 1000);
+
+        expect(session).toEqual({
+            sessionId: issued.sessionId,
+            issuedAt: now,
+            expiresAt: now + config.SESSION_TIMEOUT,
+            ipHash: hashIP('203.0.113.7').toString('hex')
+        });
+    });
+
+    test('re-signing keeps the session id', () => {
+        const first = createSessionToken('203.0.113.7', now);
+        const renewed = createSessionToken('198.51.100.2', now + 60000, first.sessionId);
+
+        expect(renewed.token).not.toBe(first.token);
+        expect(verifySessionToken(renewed.token, now + 60000).sessionId).toBe(first.sessionId);
+    });
+
+    test('rejects a token with any byte changed', () => {
+        const bytes = Buffer.from(createSessionToken('203.0.113.7', now).token, 'base64url');
+
+        for (let i = 0; i < bytes.length; i++) {
+            const tampered = Buffer.from(bytes);
+            tampered[i] ^= 0x01;
+            expect(verifySessionToken(tampered.toString('base64url'), now)).toBeNull();
+        }
+    });
+
+    test('rejects tokens of the wrong length or type', () => {
+        const { token } = createSessionToken('203.0.113.7', now);
+
+        expect(verifySessionToken(token.slice(0, -2), now)).toBeNull();
+        expect(verifySessionToken(`${token}AA`, now)).toBeNull();
+        expect(verifySessionToken('', now)).toBeNull();
+        expect(verifySessionToken(undefined, now)).toBeNull();
+        expect(verifySessionToken({ token }, now)).toBeNull();
+    });
+
+    test('expires SESSION_TIMEOUT after it was issued', () => {
+        const { token } = createSessionToken('203.0.113.7', now);
+
+        expect(verifySessionToken(token, now + config.SESSION_TIMEOUT)).not.toBeNull();
+        expect(verifySessionToken(token, now + config.SESSION_TIMEOUT + 1)).toBeNull();
+    });
+});
@@ -0,0 +1,94 @@
+const TimerWheel = require('../utils/timerWheel');
+
+describe('TimerWheel', () => {
+    beforeEach(() => {
+        jest.useFakeTimers();
+    });
+
+    afterEach(() => {
+        jest.useRealTimers();
+    });
+
+    test('expires an entry after its ttl, not before', () => {
+        const expired = [];
+        const wheel = new TimerWheel({ tickMs: 10, slots: 8, onExpire: (key, value) => expired.push([key, value]) });
+
+        wheel.add('a', 30, 'value-a');
+        jest.advanceTimersByTime(20);
+        expect(wheel.has('a')).toBe(true);
+
+        jest.advanceTimersByTime(10);
+        expect(wheel.has('a')).toBe(false);
+        expect(expired).toEqual([['a', 'value-a']]);
+    });
+
+    test('waits the right number of rounds for ttls longer than one revolution', () => {
+        const expired = [];
+        const wheel = new TimerWheel({ tickMs: 10, slots: 4, onExpire: key => expired.push(key) });
+
+        // 10 ticks on a 4-slot wheel: lands in slot 2 and waits two full rounds there
+        wheel.add('long', 100);
+        wheel.add('short', 20);
+
+        jest.advanceTimersByTime(20);
+        expect(expired).toEqual(['short']);
+
+        // Slot 2 comes round at 60ms as well; the long entry must not expire then
+        jest.advanceTimersByTime(70);
+        expect(wheel.has('long')).toBe(true);
+
+        jest.advanceTimersByTime(10);
+        expect(expired).toEqual(['short', 'long']);
+        expect(wheel.size).toBe(0);
+    });
+
+    test('re-adding a key resets its expiry', () => {
+        const wheel = new TimerWheel({ tickMs: 10, slots: 8 });
+
+        wheel.add('a', 30);
+        jest.advanceTimersByTime(20);
+        wheel.add('a', 30);
+        jest.advanceTimersByTime(20);
+        expect(wheel.has('a')).toBe(true);
+
+        jest.advanceTimersByTime(10);
+        expect(wheel.has('a')).toBe(false);
+    });
+
+    test('deleted entries never expire and the timer stops when empty', () => {
+        const onExpire = jest.fn();
+        const wheel = new TimerWheel({ tickMs: 10, slots: 8, onExpire });
+
+        wheel.add('a', 30);
+        expect(wheel.delete('a')).toBe(true);
+        expect(wheel.delete('a')).toBe(false);
+        expect(wheel.timer).toBeNull();
+
+        jest.advanceTimersByTime(100);
+        expect(onExpire).not.toHaveBeenCalled();
+    });
+
+    test('a key re-added from onExpire waits for its new ttl', () => {
+        let renewals = 0;
+        const wheel = new TimerWheel({
+            tickMs: 10,
+            slots: 4,
+            onExpire: (key) => {
+                if (renewals++ === 0) {
+                    wheel.add(key, 40);
+                }
+            }
+        });
+
+        wheel.add('a', 40);
+        jest.advanceTimersByTime(40);
+        expect(wheel.has('a')).toBe(true);
+
+        jest.advanceTimersByTime(30);
+        expect(wheel.has('a')).toBe(true);
+
+        jest.advanceTimersByTime(10);
+        expect(wheel.has('a')).toBe(false);
+        expect(renewals).toBe(2);
+    });
+});
@@ -0,0 +1,49 @@
+const ViolationStore = require('../utils/violationStore');
+
+describe('ViolationStore', () => {
+    let store;
+
+    beforeEach(() => {
+        jest.useFakeTimers();
+        store = new ViolationStore({ halfLifeMs: 3600000, banThreshold: 3, banMs: 60000, reporterLimit: 2, pairWindowMs: 1000 });
+    });
+
+    afterEach(() => {
+        store.violations.clear();
+        store.reporters.clear();
+        store.pairs.clear();
+        jest.useRealTimers();
+    });
+
+    test('bans a user once reports from different reporters cross the threshold', () => {
+        const ban = jest.fn();
+        store.on('ban', ban);
+
+        store.recordReport('session-a', '203.0.113.1');
+        store.recordReport('session-a', '203.0.113.2');
+        expect(ban).not.toHaveBeenCalled();
+
+        store.recordReport('session-a', '203.0.113.3');
+        expect(ban).toHaveBeenCalledWith('session-a', 60000);
+    });
+
+    test('ignores reports from a reporter over its limit', () => {
+        expect(store.recordReport('session-a', '203.0.113.1')).toBe(true);
+        expect(store.recordReport('session-b', '203.0.113.1')).toBe(true);
+        expect(store.recordReport('session-c', '203.0.113.1')).toBe(false);
+        expect(store.getViolationScore('session-c')).toBe(0);
+    });
+
+    test('knows recent partners, in both directions, only within the window', () => {
+        store.recordPair('session-a', 'socket-b', 'session-b');
+        store.recordPair('session-b', 'socket-a', 'session-a');
+
+        expect(store.pairedUser('session-a', 'socket-b')).toBe('session-b');
+        expect(store.pairedUser('session-b', 'socket-a')).toBe('session-a');
+        expect(store.pairedUser('session-c', 'socket-b')).toBeNull();
+        expect(store.pairedUser('session-a', 'socket-c')).toBeNull();
+
+        jest.advanceTimersByTime(1000);
+        expect(store.pairedUser('session-a', 'socket-b')).toBeNull();
+    });
+});
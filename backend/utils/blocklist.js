@@ -0,0 +1,103 @@
+// Blocklist of client IPs / session ids with TTL expiry
+// A counting Bloom filter answers most lookups (the key is not blocked) without touching
+// the exact store; only probable hits are confirmed against the TTL-backed hash store.
+const TimerWheel = require('./timerWheel');
+
+// 32-bit FNV-1a
+function fnv1a(key) {
+    let hash = 0x811c9dc5;
+    for (let i = 0; i < key.length; i++) {
+        hash ^= key.charCodeAt(i);
+        hash = Math.imul(hash, 0x01000193);
+    }
+    return hash >>> 0;
+}
+
+// Final avalanche step from MurmurHash3, used to derive the second hash
+function mix(hash) {
+    hash ^= hash >>> 16;
+    hash = Math.imul(hash, 0x85ebca6b);
+    hash ^= hash >>> 13;
+    hash = Math.imul(hash, 0xc2b2ae35);
+    hash ^= hash >>> 16;
+    return hash >>> 0;
+}
+
+class Blocklist {
+    /**
+     * @param {Object} options
+     * @param {number} options.capacity - expected number of blocked keys at once
+     * @param {number} options.errorRate - target false positive rate of the prefilter
+     * @param {number} options.tickMs - expiry resolution in milliseconds
+     */
+    constructor({ capacity = 100000, errorRate = 0.01, tickMs = 1000 } = {}) {
+        const bits = Math.ceil(-capacity * Math.log(errorRate) / (Math.LN2 * Math.LN2));
+
+        this.filterSize = bits;
+        this.hashCount = Math.max(1, Math.round(bits / capacity * Math.LN2));
+        // Counters rather than bits so expired keys can be removed from the filter
+        this.counters = new Uint8Array(bits);
+        this.entries = new TimerWheel({
+            tickMs,
+            onExpire: (key) => this.removeFromFilter(key)
+        });
+    }
+
+    get size() {
+        return this.entries.size;
+    }
+
+    /**
+     * Block a key for ttlMs; re-adding a blocked key extends its block
+     */
+    add(key, ttlMs) {
+        if (!this.entries.has(key)) {
+            this.updateFilter(key, 1);
+        }
+        this.entries.add(key, ttlMs);
+    }
+
+    has(key) {
+        if (!key) {
+            return false;
+        }
+
+        // Double hashing: probe i is h1 + i * h2
+        const h1 = fnv1a(key);
+        const h2 = mix(h1) | 1;
+        for (let i = 0; i < this.hashCount; i++) {
+            if (this.counters[(h1 + Math.imul(i, h2) >>> 0) % this.filterSize] === 0) {
+                return false;
+            }
+        }
+
+        return this.entries.has(key);
+    }
+
+    delete(key) {
+        if (this.entries.delete(key)) {
+            this.removeFromFilter(key);
+            return true;
+        }
+        return false;
+    }
+
+    removeFromFilter(key) {
+        this.updateFilter(key, -1);
+    }
+
+    updateFilter(key, delta) {
+        const h1 = fnv1a(key);
+        const h2 = mix(h1) | 1;
+        for (let i = 0; i < this.hashCount; i++) {
+            const index = (h1 + Math.imul(i, h2) >>> 0) % this.filterSize;
+            const count = this.counters[index];
+            // Saturated counters stay put; they can only cost a false positive
+            if (count !== 255) {
+                this.counters[index] = count + delta;
+            }
+        }
+    }
+}
+
+module.exports = Blocklist;
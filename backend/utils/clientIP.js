@@ -0,0 +1,33 @@
+// Client address behind trusted reverse proxies
+// Each proxy appends the address it received the request from to X-Forwarded-For. With
+// `hops` trusted proxies in front of the server, the client is the hops-th address from
+// the right - entries further left were written by the client and cannot be trusted.
+// This is the same rule Express applies for a numeric 'trust proxy' setting, so sockets
+// and REST routes agree on who the client is.
+const config = require('../config/environment');
+
+/**
+ * @param {string} remoteAddress - address of the direct peer
+ * @param {string} [forwardedFor] - X-Forwarded-For header
+ * @param {number} [hops] - trusted proxies in front of the server
+ */
+function clientIP(remoteAddress, forwardedFor, hops = config.TRUST_PROXY) {
+    if (!hops || !forwardedFor) {
+        return remoteAddress;
+    }
+
+    const chain = forwardedFor.split(',').map(address => address.trim()).filter(Boolean);
+    return chain[Math.max(0, chain.length - hops)] || remoteAddress;
+}
+
+/**
+ * Client address of a Socket.io handshake
+ */
+function handshakeIP(handshake) {
+    return clientIP(handshake.address, handshake.headers['x-forwarded-for']);
+}
+
+module.exports = {
+    clientIP,
+    handshakeIP
+};
@@ -0,0 +1,51 @@
+// Shared hobby and country dictionary
+// Per-connection state and match payloads carry small integer codes into these tables.
+// The client downloads the dictionary once from /api/dictionary and caches it by version.
+const crypto = require('crypto');
+const { countryList, unknownCountry } = require('./countries');
+
+// Hobby ids - must match the hobby cards in frontend/app.js
+const hobbies = ['singing', 'dancing', 'music', 'coding', 'gaming', 'art', 'books', 'travel'];
+
+// Country table; code 0 is the unknown country
+const countries = [unknownCountry, ...countryList];
+
+const hobbyCodes = new Map(hobbies.map((id, code) => [id, code]));
+const countryCodes = new Map(countries.map((entry, code) => [entry.countryCode, code]));
+
+// Serialized once; the version changes whenever either table changes
+const dictionaryJSON = JSON.stringify({ hobbies, countries });
+const version = crypto.createHash('sha1').update(dictionaryJSON).digest('hex').slice(0, 8);
+const payload = `{"version":"${version}",${dictionaryJSON.slice(1)}`;
+
+/**
+ * Get the integer code for a hobby id, or -1 if the hobby is unknown
+ */
+function getHobbyCode(hobbyId) {
+    const code = hobbyCodes.get(hobbyId);
+    return code === undefined ? -1 : code;
+}
+
+function getHobby(code) {
+    return hobbies[code] || null;
+}
+
+/**
+ * Get the integer code for an ISO country code, or 0 if the country is unknown
+ */
+function getCountryCode(isoCode) {
+    return countryCodes.get(isoCode) || 0;
+}
+
+function getCountry(code) {
+    return countries[code] || countries[0];
+}
+
+module.exports = {
+    version,
+    payload,
+    getHobbyCode,
+    getHobby,
+    getCountryCode,
+    getCountry
+};
@@ -1,13 +1,46 @@
 // Geolocation utility for IP-based location detection
 const axios = require('axios');
+const { getCountryByCode, unknownCountry } = require('./countries');
 
-// Country flag mapping
-const countryFlags = {
-    'US': '🇺🇸', 'GB': '🇬🇧', 'DE': '🇩🇪', 'FR': '🇫🇷', 'JP': '🇯🇵',
-    'KR': '🇰🇷', 'IN': '🇮🇳', 'BR': '🇧🇷', 'CA': '🇨🇦', 'AU': '🇦🇺',
-    'CN': '🇨🇳', 'RU': '🇷🇺', 'IT': '🇮🇹', 'ES': '🇪🇸', 'MX': '🇲🇽',
-    'AR': '🇦🇷', 'EG': '🇪🇬', 'ZA': '🇿🇦', 'NG': '🇳🇬', 'TR': '🇹🇷'
-};
+// A location is the shared frozen country entry ({ country, countryCode, flag }), one
+// per country built at startup, so lookups return existing objects and allocate nothing.
+// Matching and match payloads only use the country, so city and region are not kept.
+
+// Location returned for localhost/development
+const developmentLocation = getCountryByCode('US');
+
+// Location returned when every API fails
+const defaultLocation = unknownCountry;
+
+/**
+ * The shared location for an ISO code, or null if the API returned no known country
+ */
+function locationFor(countryCode) {
+    const entry = getCountryByCode(countryCode);
+    return entry === unknownCountry ? null : entry;
+}
+
+// Geolocation APIs in fallback order - built once, not per lookup
+const apis = [
+    // Primary: ip-api.com (free, no API key required)
+    {
+        name: 'ip-api',
+        url: (ip) => `http://ip-api.com/json/${ip}?fields=country,countryCode,region,city,status`,
+        parser: (data) => locationFor(data.countryCode)
+    },
+    // Fallback 1: ipapi.co (free tier available)
+    {
+        name: 'ipapi',
+        url: (ip) => `https://ipapi.co/${ip}/json/`,
+        parser: (data) => locationFor(data.country_code)
+    },
+    // Fallback 2: freeipapi.com
+    {
+        name: 'freeipapi',
+        url: (ip) => `https://free.freeipapi.com/api/json/${ip}`,
+        parser: (data) => locationFor(data.countryCode)
+    }
+];
 
 /**
  * Get location information from IP address
@@ -16,59 +49,14 @@ const countryFlags = {
 async function getLocationFromIP(ip) {
     // For localhost/development, return mock data
     if (ip === '::1' || ip === '127.0.0.1' || ip === '::ffff:127.0.0.1' || !ip) {
-        return {
-            country: 'United States',
-            countryCode: 'US',
-            flag: '🇺🇸',
-            city: 'New York',
-            region: 'NY'
-        };
+        return developmentLocation;
     }
 
-    const apis = [
-        // Primary: ip-api.com (free, no API key required)
-        {
-            name: 'ip-api',
-            url: `http://ip-api.com/json/${ip}?fields=country,countryCode,region,city,status`,
-            parser: (data) => ({
-                country: data.country,
-                countryCode: data.countryCode,
-                flag: countryFlags[data.countryCode] || '🌍',
-                city: data.city,
-                region: data.region
-            })
-        },
-        // Fallback 1: ipapi.co (free tier available)
-        {
-            name: 'ipapi',
-            url: `https://ipapi.co/${ip}/json/`,
-            parser: (data) => ({
-                country: data.country_name,
-                countryCode: data.country_code,
-                flag: countryFlags[data.country_code] || '🌍',
-                city: data.city,
-                region: data.region
-            })
-        },
-        // Fallback 2: freeipapi.com
-        {
-            name: 'freeipapi',
-            url: `https://free.freeipapi.com/api/json/${ip}`,
-            parser: (data) => ({
-                country: data.countryName,
-                countryCode: data.countryCode,
-                flag: countryFlags[data.countryCode] || '🌍',
-                city: data.cityName,
-                region: data.regionName
-            })
-        }
-    ];
-
     for (const api of apis) {
         try {
             console.log(`Trying ${api.name} for IP: ${ip}`);
 
-            const response = await axios.get(api.url, {
+            const response = await axios.get(api.url(ip), {
                 timeout: 5000,
                 headers: {
                     'User-Agent': 'Stranger-Face/1.0'
@@ -78,7 +66,7 @@ async function getLocationFromIP(ip) {
             const locationData = api.parser(response.data);
 
             // Validate required fields
-            if (locationData.country && locationData.countryCode) {
+            if (locationData) {
                 console.log(`Successfully got location from ${api.name}:`, locationData);
                 return locationData;
             }
@@ -90,13 +78,7 @@ async function getLocationFromIP(ip) {
 
     // Final fallback - return default location
     console.warn(`All geolocation APIs failed for IP: ${ip}, using default`);
-    return {
-        country: 'Unknown',
-        countryCode: 'XX',
-        flag: '🌍',
-        city: 'Unknown',
-        region: 'Unknown'
-    };
+    return defaultLocation;
 }
 
 /**
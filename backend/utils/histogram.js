@@ -0,0 +1,60 @@
+// Fixed-bucket latency histogram
+// Recording is a short bucket scan and two additions; no samples are kept, so memory is
+// constant. Percentiles are estimated from the bucket upper bounds.
+
+// Upper bounds in milliseconds; the last bucket catches everything above
+const DEFAULT_BOUNDS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000];
+
+class Histogram {
+    constructor(bounds = DEFAULT_BOUNDS) {
+        this.bounds = bounds;
+        this.counts = new Float64Array(bounds.length + 1);
+        this.count = 0;
+        this.sum = 0;
+    }
+
+    record(value) {
+        let i = 0;
+        while (i < this.bounds.length && value > this.bounds[i]) {
+            i++;
+        }
+        this.counts[i]++;
+        this.count++;
+        this.sum += value;
+    }
+
+    percentile(p) {
+        if (this.count === 0) {
+            return 0;
+        }
+
+        const rank = p / 100 * this.count;
+        let seen = 0;
+        for (let i = 0; i < this.counts.length; i++) {
+            seen += this.counts[i];
+            if (seen >= rank) {
+                return i < this.bounds.length ? this.bounds[i] : Infinity;
+            }
+        }
+        return Infinity;
+    }
+
+    snapshot() {
+        const buckets = {};
+        this.bounds.forEach((bound, i) => {
+            buckets[`le_${bound}`] = this.counts[i];
+        });
+        buckets.le_inf = this.counts[this.bounds.length];
+
+        return {
+            count: this.count,
+            mean: this.count ? Math.round(this.sum / this.count) : 0,
+            p50: this.percentile(50),
+            p90: this.percentile(90),
+            p99: this.percentile(99),
+            buckets
+        };
+    }
+}
+
+module.exports = Histogram;
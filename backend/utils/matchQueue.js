@@ -0,0 +1,55 @@
+// Per-hobby FIFO waiting queues
+// Entries are keyed by the user's integer uid and map to their current socket id, so a
+// user who reconnects can be rebound in place without losing their position. A null
+// socket id marks a user who is held while their session resumes.
+
+class MatchQueue {
+    constructor() {
+        this.queues = new Map(); // hobby code -> Map(uid -> socket id)
+        this.size = 0;
+    }
+
+    queue(hobby) {
+        let queue = this.queues.get(hobby);
+        if (!queue) {
+            queue = new Map();
+            this.queues.set(hobby, queue);
+        }
+        return queue;
+    }
+
+    /**
+     * Append a user, or rebind an already queued user in place
+     */
+    set(hobby, uid, socketId) {
+        const queue = this.queue(hobby);
+        if (!queue.has(uid)) {
+            this.size++;
+        }
+        queue.set(uid, socketId);
+    }
+
+    delete(hobby, uid) {
+        const queue = this.queues.get(hobby);
+        if (queue && queue.delete(uid)) {
+            this.size--;
+            return true;
+        }
+        return false;
+    }
+
+    /**
+     * Socket ids of every connected waiting user
+     */
+    *socketIds() {
+        for (const queue of this.queues.values()) {
+            for (const socketId of queue.values()) {
+                if (socketId !== null) {
+                    yield socketId;
+                }
+            }
+        }
+    }
+}
+
+module.exports = MatchQueue;
@@ -0,0 +1,73 @@
+// Partner selection for one matching round
+// Walks the searcher's hobby queue in arrival order and returns the first waiting user who
+// is still connected, not blocked, and was not met within the rematch window. Entries of
+// users who have gone are removed on the way; entries held for a session resume and users
+// blocked since they queued are skipped.
+
+class Matcher {
+    /**
+     * @param {Object} options
+     * @param {MatchQueue} options.queue - waiting users per hobby
+     * @param {Map} options.sockets - connected sockets by id
+     * @param {PartnerHistory} options.history - recent partners per user
+     * @param {number} options.rematchWindowMs - how long a recent partner is skipped
+     * @param {Object} options.metrics - repeatPairs / repeatPairsAvoided, updated in place
+     * @param {Blocklist} [options.blocklist] - banned session ids and client IPs
+     */
+    constructor({ queue, sockets, history, rematchWindowMs, metrics, blocklist = null }) {
+        this.queue = queue;
+        this.sockets = sockets;
+        this.history = history;
+        this.rematchWindowMs = rematchWindowMs;
+        this.metrics = metrics;
+        this.blocklist = blocklist;
+    }
+
+    /**
+     * Whether the user's session or client IP is banned from matching
+     */
+    isBlocked(socket) {
+        return this.blocklist !== null &&
+            (this.blocklist.has(socket.data.sessionId) || this.blocklist.has(socket.data.ip));
+    }
+
+    /**
+     * The waiting socket to pair with, or null if nobody fits
+     */
+    findPartner(socket, now = Date.now()) {
+        const { hobby, uid } = socket.data;
+
+        for (const [waitingUid, waitingId] of this.queue.queue(hobby)) {
+            // Held for a session resume
+            if (waitingId === null) {
+                continue;
+            }
+
+            const waitingSocket = this.sockets.get(waitingId);
+            if (!waitingSocket) {
+                this.queue.delete(hobby, waitingUid);
+                continue;
+            }
+
+            if (this.isBlocked(waitingSocket)) {
+                continue;
+            }
+
+            // Leave recent partners for someone else; older ones may match again
+            const metAt = this.history.lastMet(uid, waitingUid);
+            if (metAt) {
+                if (now - metAt < this.rematchWindowMs) {
+                    this.metrics.repeatPairsAvoided++;
+                    continue;
+                }
+                this.metrics.repeatPairs++;
+            }
+
+            return waitingSocket;
+        }
+
+        return null;
+    }
+}
+
+module.exports = Matcher;
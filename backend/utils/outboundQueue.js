@@ -0,0 +1,145 @@
+// Bounded, prioritized outbound queue for one socket
+// Emits go straight through while the client keeps up. Once engine.io's write buffer
+// for the connection backs up past the high-water mark (a stalled or slow client), new
+// messages wait here in priority lanes and are flushed on the connection's 'drain':
+//   signaling (room lifecycle, offer, answer, ICE) first, then control, then cosmetic (emoji).
+// Cosmetic messages are coalesced to the latest per event and dropped once the queue is
+// full; anything else past the limit means the client is not draining at all, and it is
+// disconnected rather than letting server memory grow. Disconnects are deferred to the next
+// tick so the caller, often partway through a room or queue update, finishes first.
+
+const SIGNALING = 0;
+const CONTROL = 1;
+const COSMETIC = 2;
+
+// Room lifecycle events share the signaling lane so they stay in order with the
+// offers and candidates of the room they start or end
+const SIGNALING_EVENTS = new Set([
+    'waiting-for-match', 'match-found', 'partner-disconnected', 'offer', 'answer', 'ice-candidate'
+]);
+const COSMETIC_EVENTS = new Set(['emoji-reaction', 'emoji-reactions']);
+
+function priorityOf(event) {
+    if (SIGNALING_EVENTS.has(event)) {
+        return SIGNALING;
+    }
+    return COSMETIC_EVENTS.has(event) ? COSMETIC : CONTROL;
+}
+
+class OutboundQueue {
+    /**
+     * @param {Object} socket - Socket.io socket
+     * @param {Object} options
+     * @param {number} options.highWater - engine.io packets buffered before queueing here
+     * @param {number} options.limit - messages queued before the client is disconnected
+     * @param {Object} options.metrics - shared counters, updated in place
+     */
+    constructor(socket, { highWater = 32, limit = 256, metrics }) {
+        this.socket = socket;
+        this.highWater = highWater;
+        this.limit = limit;
+        this.metrics = metrics;
+        this.lanes = [[], [], []];
+        this.depth = 0;
+        this.closing = false;
+
+        socket.conn.on('drain', () => this.flush());
+        socket.once('disconnect', () => this.clear());
+    }
+
+    congested() {
+        return this.socket.conn.writeBuffer.length >= this.highWater;
+    }
+
+    /**
+     * Emit now if the client is keeping up, otherwise queue by priority.
+     * Returns false if the message was dropped.
+     */
+    send(event, payload) {
+        if (this.closing) {
+            this.metrics.dropped++;
+            return false;
+        }
+
+        if (this.depth === 0 && !this.congested()) {
+            this.socket.emit(event, payload);
+            return true;
+        }
+
+        const priority = priorityOf(event);
+        const lane = this.lanes[priority];
+
+        if (priority === COSMETIC) {
+            if (this.depth >= this.limit) {
+                this.metrics.dropped++;
+                return false;
+            }
+            const pending = lane.find(message => message.event === event);
+            if (pending) {
+                pending.payload = payload;
+                this.metrics.coalesced++;
+                return true;
+            }
+        } else if (this.depth >= this.limit) {
+            console.log(`🐢 Disconnecting slow consumer ${this.socket.id} (${this.depth} queued)`);
+            this.metrics.slowDisconnects++;
+            this.metrics.dropped++;
+            this.clear();
+            this.closing = true;
+            setImmediate(() => this.socket.disconnect(true));
+            return false;
+        }
+
+        lane.push({ event, payload });
+        this.depth++;
+        this.metrics.queued++;
+        if (this.depth > this.metrics.peakDepth) {
+            this.metrics.peakDepth = this.depth;
+        }
+        return true;
+    }
+
+    flush() {
+        for (const lane of this.lanes) {
+            while (lane.length > 0) {
+                if (this.congested()) {
+                    return;
+                }
+                const { event, payload } = lane.shift();
+                this.depth--;
+                this.metrics.queued--;
+                this.socket.emit(event, payload);
+            }
+        }
+
+        if (this.closing) {
+            this.socket.disconnect(true);
+        }
+    }
+
+    /**
+     * Disconnect once everything queued so far has been sent; later sends are dropped
+     */
+    end() {
+        if (this.closing) {
+            return;
+        }
+        this.closing = true;
+        if (this.depth === 0) {
+            setImmediate(() => this.socket.disconnect(true));
+        }
+    }
+
+    clear() {
+        this.metrics.queued -= this.depth;
+        this.lanes = [[], [], []];
+        this.depth = 0;
+    }
+}
+
+OutboundQueue.SIGNALING = SIGNALING;
+OutboundQueue.CONTROL = CONTROL;
+OutboundQueue.COSMETIC = COSMETIC;
+OutboundQueue.priorityOf = priorityOf;
+
+module.exports = OutboundQueue;
@@ -0,0 +1,87 @@
+// Bounded recent-partner history for rematch avoidance
+// Each user keeps a fixed-size ring buffer of the integer uids they were last matched
+// with, plus a 32-bit mask acting as a tiny Bloom filter over the ring. Most candidates
+// are rejected by one mask test; only possible hits scan the ring.
+
+// Bit for a uid in the 32-bit mask (Fibonacci hashing, top 5 bits)
+function maskBit(uid) {
+    return 1 << (Math.imul(uid, 0x9E3779B1) >>> 27);
+}
+
+class PartnerHistory {
+    /**
+     * @param {Object} options
+     * @param {number} options.size - partners remembered per user
+     */
+    constructor({ size = 8 } = {}) {
+        this.size = size;
+        this.histories = new Map(); // uid -> { partners, metAt, next, mask }
+    }
+
+    history(uid) {
+        let history = this.histories.get(uid);
+        if (!history) {
+            history = {
+                partners: new Int32Array(this.size),
+                metAt: new Float64Array(this.size),
+                next: 0,
+                mask: 0
+            };
+            this.histories.set(uid, history);
+        }
+        return history;
+    }
+
+    push(uid, partnerUid, now) {
+        const history = this.history(uid);
+        const evicted = history.partners[history.next];
+
+        history.partners[history.next] = partnerUid;
+        history.metAt[history.next] = now;
+        history.next = (history.next + 1) % this.size;
+
+        if (evicted === 0) {
+            history.mask |= maskBit(partnerUid);
+        } else {
+            // Rebuild the mask without the evicted uid
+            history.mask = 0;
+            for (let i = 0; i < this.size; i++) {
+                if (history.partners[i] !== 0) {
+                    history.mask |= maskBit(history.partners[i]);
+                }
+            }
+        }
+    }
+
+    /**
+     * Record a match in both users' histories
+     */
+    record(uidA, uidB, now = Date.now()) {
+        this.push(uidA, uidB, now);
+        this.push(uidB, uidA, now);
+    }
+
+    /**
+     * When uid last met partnerUid, or 0 if not in the recent history
+     */
+    lastMet(uid, partnerUid) {
+        const history = this.histories.get(uid);
+        if (!history || (history.mask & maskBit(partnerUid)) === 0) {
+            return 0;
+        }
+
+        let metAt = 0;
+        for (let i = 0; i < this.size; i++) {
+            if (history.partners[i] === partnerUid && history.metAt[i] > metAt) {
+                metAt = history.metAt[i];
+            }
+        }
+        return metAt;
+    }
+
+    forget(uid) {
+        this.histories.delete(uid);
+    }
+}
+
+module.exports = PartnerHistory;
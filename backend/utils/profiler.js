@@ -0,0 +1,129 @@
+// On-demand CPU profiles and heap snapshots through the inspector
+// Captures run inside the live process - no restart, no --inspect port - and are written
+// to a directory that keeps only the newest maxFiles captures. One capture runs at a time.
+// CPU profiles open in Chrome DevTools (Performance) or speedscope; heap snapshots in
+// DevTools (Memory). Note that a heap snapshot pauses the event loop while it is taken.
+const fs = require('fs');
+const path = require('path');
+const inspector = require('inspector');
+
+const CAPTURE_PATTERN = /^(cpu|heap)-.+\.(cpuprofile|heapsnapshot)$/;
+
+class Profiler {
+    /**
+     * @param {Object} options
+     * @param {string} options.dir - capture directory
+     * @param {number} options.maxFiles - captures kept; older ones are deleted
+     * @param {number} options.maxSeconds - longest CPU profile allowed
+     */
+    constructor({ dir, maxFiles = 10, maxSeconds = 60 }) {
+        this.dir = dir;
+        this.maxFiles = maxFiles;
+        this.maxSeconds = maxSeconds;
+        this.busy = false;
+    }
+
+    fileName(kind, extension) {
+        const stamp = new Date().toISOString().replace(/[:.]/g, '-');
+        return path.join(this.dir, `${kind}-${stamp}-${process.pid}.${extension}`);
+    }
+
+    async capture(run) {
+        if (this.busy) {
+            const error = new Error('A capture is already running');
+            error.code = 'PROFILER_BUSY';
+            throw error;
+        }
+
+        this.busy = true;
+        const session = new inspector.Session();
+        session.connect();
+        const post = (method, params) => new Promise((resolve, reject) => {
+            session.post(method, params, (error, result) => (error ? reject(error) : resolve(result)));
+        });
+
+        try {
+            await fs.promises.mkdir(this.dir, { recursive: true });
+            const started = Date.now();
+            const file = await run(session, post);
+            const { size } = await fs.promises.stat(file);
+            await this.rotate();
+            return { file, bytes: size, durationMs: Date.now() - started };
+        } finally {
+            session.disconnect();
+            this.busy = false;
+        }
+    }
+
+    /**
+     * Sample the CPU for the given number of seconds
+     */
+    cpuProfile(seconds, samplingIntervalUs = 1000) {
+        const duration = Math.min(Math.max(seconds, 1), this.maxSeconds);
+
+        return this.capture(async (session, post) => {
+            await post('Profiler.enable');
+            await post('Profiler.setSamplingInterval', { interval: samplingIntervalUs });
+            await post('Profiler.start');
+            await new Promise(resolve => setTimeout(resolve, duration * 1000));
+            const { profile } = await post('Profiler.stop');
+            await post('Profiler.disable');
+
+            const file = this.fileName('cpu', 'cpuprofile');
+            await fs.promises.writeFile(file, JSON.stringify(profile));
+            return file;
+        });
+    }
+
+    /**
+     * Write a heap snapshot, streamed to disk chunk by chunk
+     */
+    heapSnapshot() {
+        return this.capture(async (session, post) => {
+            const file = this.fileName('heap', 'heapsnapshot');
+            const out = fs.createWriteStream(file);
+            const onChunk = ({ params }) => out.write(params.chunk);
+
+            session.on('HeapProfiler.addHeapSnapshotChunk', onChunk);
+            try {
+                await post('HeapProfiler.takeHeapSnapshot', { reportProgress: false });
+            } finally {
+                session.off('HeapProfiler.addHeapSnapshotChunk', onChunk);
+                await new Promise((resolve, reject) => out.end(error => (error ? reject(error) : resolve())));
+            }
+            return file;
+        });
+    }
+
+    /**
+     * Captures on disk, newest first
+     */
+    async list() {
+        let names;
+        try {
+            names = await fs.promises.readdir(this.dir);
+        } catch (error) {
+            if (error.code === 'ENOENT') {
+                return [];
+            }
+            throw error;
+        }
+
+        const captures = await Promise.all(names
+            .filter(name => CAPTURE_PATTERN.test(name))
+            .map(async (name) => {
+                const { size, mtimeMs } = await fs.promises.stat(path.join(this.dir, name));
+                return { name, bytes: size, createdAt: new Date(mtimeMs).toISOString() };
+            }));
+        return captures.sort((a, b) => b.createdAt.localeCompare(a.createdAt));
+    }
+
+    async rotate() {
+        const captures = await this.list();
+        for (const capture of captures.slice(this.maxFiles)) {
+            await fs.promises.unlink(path.join(this.dir, capture.name)).catch(() => {});
+        }
+    }
+}
+
+module.exports = Profiler;
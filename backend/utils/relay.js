@@ -0,0 +1,88 @@
+// Partner pointers and message delivery for matched users
+// Each socket points at its partner through a weak reference so a stale pointer never keeps
+// a disconnected socket alive; partnerId stays for the cross-process path. Messages to a
+// partner on this process go through their bounded send queue, messages to a partner on
+// another node are one targeted adapter message to their socket id room.
+const OutboundQueue = require('./outboundQueue');
+
+class Relay {
+    /**
+     * @param {Object} options
+     * @param {Object} options.io - Socket.io server, for partners on other nodes
+     * @param {number} options.highWater - see OutboundQueue
+     * @param {number} options.limit - see OutboundQueue
+     * @param {Object} options.metrics - shared OutboundQueue counters, updated in place
+     */
+    constructor({ io, highWater, limit, metrics }) {
+        this.io = io;
+        this.highWater = highWater;
+        this.limit = limit;
+        this.metrics = metrics;
+    }
+
+    pair(socket, partnerSocket) {
+        socket.partnerId = partnerSocket.id;
+        socket.partner = new WeakRef(partnerSocket);
+    }
+
+    unpair(socket) {
+        delete socket.partnerId;
+        delete socket.partner;
+    }
+
+    /**
+     * The partner's socket if they are connected to this process
+     */
+    localPartner(socket) {
+        const partnerSocket = socket.partner && socket.partner.deref();
+        return partnerSocket && partnerSocket.connected ? partnerSocket : null;
+    }
+
+    /**
+     * Emit through the socket's send queue, created on first use.
+     * Returns false if the message was dropped.
+     */
+    send(socket, event, payload) {
+        if (!socket.outbound) {
+            socket.outbound = new OutboundQueue(socket, {
+                highWater: this.highWater,
+                limit: this.limit,
+                metrics: this.metrics
+            });
+        }
+        return socket.outbound.send(event, payload);
+    }
+
+    /**
+     * Deliver a message from socket to its partner, stamped with the sender's id
+     */
+    forward(socket, event, message) {
+        message.from = socket.id;
+        const partnerSocket = this.localPartner(socket);
+        if (partnerSocket) {
+            this.send(partnerSocket, event, message);
+        } else if (socket.partnerId) {
+            this.io.to(socket.partnerId).emit(event, message);
+        }
+    }
+
+    /**
+     * Deliver a droppable message: skipped rather than queued behind signaling when the
+     * partner is not keeping up
+     */
+    forwardVolatile(socket, event, message) {
+        message.from = socket.id;
+        const partnerSocket = this.localPartner(socket);
+        if (partnerSocket) {
+            if (!partnerSocket.outbound || partnerSocket.outbound.depth === 0) {
+                partnerSocket.volatile.emit(event, message);
+            } else {
+                this.metrics.dropped++;
+            }
+        } else if (socket.partnerId) {
+            this.io.to(socket.partnerId).volatile.emit(event, message);
+        }
+    }
+}
+
+module.exports = Relay;
@@ -0,0 +1,239 @@
+// Durable append-only report log
+// Reports are appended as JSON lines to segment files on local disk. Writes are
+// group-committed on a short timer so many reports share one write + fdatasync, and
+// full segments are rolled over and gzipped. A batch stays queued until its fdatasync
+// succeeds; a failed commit is cut back off the segment and retried. An in-memory
+// aggregate index is rebuilt by streaming every segment at startup, so stats never need
+// to read the log.
+const fs = require('fs');
+const path = require('path');
+const readline = require('readline');
+const zlib = require('zlib');
+const { pipeline } = require('stream/promises');
+
+const SEGMENT_PATTERN = /^reports-(\d+)\.log(\.gz)?$/;
+
+const REASONS = [
+    'inappropriate_behavior',
+    'harassment',
+    'nudity',
+    'spam',
+    'underage',
+    'violence',
+    'other'
+];
+
+function segmentName(sequence) {
+    return `reports-${String(sequence).padStart(6, '0')}.log`;
+}
+
+class ReportLog {
+    /**
+     * @param {Object} options
+     * @param {string} options.dir - directory holding the log segments
+     * @param {number} options.flushMs - group commit interval in milliseconds
+     * @param {number} options.segmentBytes - roll over to a new segment past this size
+     * @param {number} options.maxTrackedUsers - reported users kept in the per-user index
+     */
+    constructor({ dir, flushMs = 100, segmentBytes = 16 * 1024 * 1024, maxTrackedUsers = 10000 }) {
+        this.dir = dir;
+        this.flushMs = flushMs;
+        this.segmentBytes = segmentBytes;
+        this.maxTrackedUsers = maxTrackedUsers;
+
+        this.handle = null;
+        this.sequence = 0;
+        this.segmentSize = 0;
+        this.pending = [];
+        this.flushTimer = null;
+        this.flushing = null;
+
+        // Aggregate index
+        this.totalReports = 0;
+        this.statusCounts = { pending: 0, resolved: 0 };
+        this.reasonCounts = Object.fromEntries(REASONS.map(reason => [reason, 0]));
+        this.violations = new Map(); // reportedUserId -> report count, least recently reported first
+    }
+
+    /**
+     * Rebuild the index from existing segments and start a fresh segment
+     */
+    async open() {
+        await fs.promises.mkdir(this.dir, { recursive: true });
+
+        const segments = (await fs.promises.readdir(this.dir))
+            .map(name => ({ name, match: SEGMENT_PATTERN.exec(name) }))
+            .filter(segment => segment.match)
+            .map(segment => ({
+                file: path.join(this.dir, segment.name),
+                sequence: parseInt(segment.match[1], 10),
+                compressed: Boolean(segment.match[2])
+            }))
+            .sort((a, b) => a.sequence - b.sequence)
+            // A .gz next to its .log is an interrupted compression; the .log is authoritative
+            .filter((segment, i, all) => !(segment.compressed &&
+                all.some(other => other.sequence === segment.sequence && !other.compressed)));
+
+        for (const segment of segments) {
+            await this.replay(segment);
+            this.sequence = Math.max(this.sequence, segment.sequence);
+        }
+
+        await this.openSegment(this.sequence + 1);
+
+        // Reports accepted while the index was rebuilding
+        await this.flush();
+
+        // Segments left uncompressed by an earlier crash
+        for (const segment of segments) {
+            if (!segment.compressed) {
+                this.compress(segment.file);
+            }
+        }
+
+        console.log(`Report log opened: ${this.totalReports} reports in ${segments.length} segments`);
+    }
+
+    async replay(segment) {
+        let input = fs.createReadStream(segment.file);
+        if (segment.compressed) {
+            input = input.pipe(zlib.createGunzip());
+        }
+
+        const lines = readline.createInterface({ input, crlfDelay: Infinity });
+        for await (const line of lines) {
+            if (!line) {
+                continue;
+            }
+            try {
+                this.index(JSON.parse(line));
+            } catch (error) {
+                // A torn final write after a crash; everything before it is intact
+                console.warn(`Skipping unreadable report record in ${segment.file}`);
+            }
+        }
+    }
+
+    index(report) {
+        this.totalReports++;
+        this.statusCounts[report.status] = (this.statusCounts[report.status] || 0) + 1;
+        this.reasonCounts[report.reason] = (this.reasonCounts[report.reason] || 0) + 1;
+
+        // Re-inserted so the least recently reported user is first to go past the cap
+        const count = (this.violations.get(report.reportedUserId) || 0) + 1;
+        this.violations.delete(report.reportedUserId);
+        this.violations.set(report.reportedUserId, count);
+        if (this.violations.size > this.maxTrackedUsers) {
+            this.violations.delete(this.violations.keys().next().value);
+        }
+    }
+
+    /**
+     * Queue a report for the next group commit; indexed immediately
+     */
+    append(report) {
+        this.pending.push(JSON.stringify(report) + '\n');
+        this.index(report);
+        this.scheduleFlush();
+    }
+
+    scheduleFlush() {
+        if (!this.flushTimer) {
+            this.flushTimer = setTimeout(() => {
+                this.flushTimer = null;
+                this.flush().catch(error => {
+                    console.error('Report log flush failed, retrying:', error);
+                    this.scheduleFlush();
+                });
+            }, this.flushMs);
+        }
+    }
+
+    /**
+     * Write and fdatasync everything queued; only one commit is in flight at a time
+     */
+    async flush() {
+        // A failed commit re-queues its batch, which this flush then writes
+        while (this.flushing) {
+            await this.flushing.catch(() => {});
+        }
+        if (!this.handle || this.pending.length === 0) {
+            return;
+        }
+
+        const batch = this.pending;
+        const data = batch.join('');
+        this.pending = [];
+
+        this.flushing = (async () => {
+            try {
+                await this.handle.write(data);
+                await this.handle.datasync();
+            } catch (error) {
+                // Not committed: cut any partial write and put the batch back ahead of
+                // reports queued since, so the next commit writes them in order
+                await this.handle.truncate(this.segmentSize).catch(() => {});
+                this.pending = batch.concat(this.pending);
+                throw error;
+            }
+            this.segmentSize += Buffer.byteLength(data);
+
+            if (this.segmentSize >= this.segmentBytes) {
+                await this.roll();
+            }
+        })();
+
+        try {
+            await this.flushing;
+        } finally {
+            this.flushing = null;
+        }
+    }
+
+    async openSegment(sequence) {
+        this.sequence = sequence;
+        this.segmentSize = 0;
+        this.handle = await fs.promises.open(path.join(this.dir, segmentName(sequence)), 'a');
+    }
+
+    async roll() {
+        const file = path.join(this.dir, segmentName(this.sequence));
+        await this.handle.close();
+        await this.openSegment(this.sequence + 1);
+        this.compress(file);
+    }
+
+    // Gzip a closed segment in the background, then remove the original
+    compress(file) {
+        pipeline(fs.createReadStream(file), zlib.createGzip(), fs.createWriteStream(`${file}.gz`))
+            .then(() => fs.promises.unlink(file))
+            .catch(error => console.error(`Failed to compress ${file}:`, error));
+    }
+
+    async close() {
+        clearTimeout(this.flushTimer);
+        this.flushTimer = null;
+        await this.flush();
+        if (this.handle) {
+            await this.handle.close();
+            this.handle = null;
+        }
+    }
+
+    getViolationCount(reportedUserId) {
+        return this.violations.get(reportedUserId) || 0;
+    }
+
+    getStats() {
+        return {
+            totalReports: this.totalReports,
+            pendingReports: this.statusCounts.pending || 0,
+            resolvedReports: this.statusCounts.resolved || 0,
+            topReasons: { ...this.reasonCounts }
+        };
+    }
+}
+
+ReportLog.REASONS = REASONS;
+
+module.exports = ReportLog;
@@ -0,0 +1,124 @@
+// SDP compaction for relayed offers
+// Browsers offer every codec and RTP header extension they support: Chrome's video
+// section alone lists a dozen H264 profiles, VP9 modes, AV1, RED, ULPFEC and RTX for
+// each. Most of it is never chosen, but it is sent on every call. Compaction keeps only
+// the policy's codecs (at most maxPerCodec payload types each, plus their RTX) and
+// header extensions, and rewrites the m= line to match.
+//
+// Only offers are compacted. An answer is already a subset of the offer, so it shrinks
+// with it - and trimming an answer would hide codecs the answerer may still send.
+
+const DEFAULT_POLICY = {
+    codecs: ['opus', 'VP8', 'VP9', 'H264'],
+    maxPerCodec: 2,
+    extensions: [
+        'urn:ietf:params:rtp-hdrext:sdes:mid', // required for BUNDLE
+        'urn:ietf:params:rtp-hdrext:ssrc-audio-level',
+        'http://www.webrtc.org/experiments/rtp-hdrext/abs-send-time',
+        'http://www.ietf.org/id/draft-holmer-rmcat-transport-wide-cc-extensions-01',
+        'urn:3gpp:video-orientation'
+    ]
+};
+
+const RTPMAP = /^a=rtpmap:(\d+) ([^/]+)/;
+const APT = /^a=fmtp:(\d+) .*\bapt=(\d+)/;
+const PAYLOAD_LINE = /^a=(?:rtpmap|fmtp|rtcp-fb):(\d+) /;
+
+/**
+ * Payload types of one media section to keep under the policy, or null to leave it as is
+ */
+function keptPayloads(lines, policy) {
+    const codecs = new Map(); // payload type -> lower-case codec name
+    const apt = new Map(); // rtx payload type -> payload type it repairs
+    for (const line of lines) {
+        let match = RTPMAP.exec(line);
+        if (match) {
+            codecs.set(match[1], match[2].toLowerCase());
+        } else if ((match = APT.exec(line))) {
+            apt.set(match[1], match[2]);
+        }
+    }
+
+    const allowed = new Set(policy.codecs.map(codec => codec.toLowerCase()));
+    const perCodec = new Map();
+    const kept = new Set();
+    for (const [payloadType, codec] of codecs) {
+        if (allowed.has(codec)) {
+            const count = perCodec.get(codec) || 0;
+            if (count < policy.maxPerCodec) {
+                perCodec.set(codec, count + 1);
+                kept.add(payloadType);
+            }
+        }
+    }
+    for (const [payloadType, repaired] of apt) {
+        if (codecs.get(payloadType) === 'rtx' && kept.has(repaired)) {
+            kept.add(payloadType);
+        }
+    }
+
+    // Nothing usable left (no rtpmap lines, or no allowed codec): leave the section alone
+    return kept.size > 0 && kept.size < codecs.size ? kept : null;
+}
+
+function compactSection(lines, policy, extensions) {
+    const mLine = lines[0].split(' ');
+    if (!/^m=(audio|video)$/.test(mLine[0]) || !mLine[2].includes('RTP/')) {
+        return lines;
+    }
+
+    const kept = keptPayloads(lines, policy);
+    const result = [];
+    for (const line of lines) {
+        if (line.startsWith('a=extmap:')) {
+            const uri = line.split(' ')[1];
+            if (!extensions.has(uri)) {
+                continue;
+            }
+        } else if (kept) {
+            const match = PAYLOAD_LINE.exec(line);
+            if (match && !kept.has(match[1])) {
+                continue;
+            }
+        }
+        result.push(line);
+    }
+
+    if (kept) {
+        result[0] = mLine.slice(0, 3).concat(mLine.slice(3).filter(payloadType => kept.has(payloadType))).join(' ');
+    }
+    return result;
+}
+
+/**
+ * Strip unused codecs and header extensions from an SDP offer
+ */
+function compactSdp(sdp, policy = DEFAULT_POLICY) {
+    const lines = sdp.split(/\r?\n/);
+    const extensions = new Set(policy.extensions);
+    const result = [];
+
+    let section = null;
+    for (const line of lines) {
+        if (line.startsWith('m=')) {
+            if (section) {
+                result.push(...compactSection(section, policy, extensions));
+            }
+            section = [line];
+        } else if (section) {
+            section.push(line);
+        } else {
+            result.push(line);
+        }
+    }
+    if (section) {
+        result.push(...compactSection(section, policy, extensions));
+    }
+
+    return result.join('\r\n');
+}
+
+module.exports = {
+    DEFAULT_POLICY,
+    compactSdp
+};
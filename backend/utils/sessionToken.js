@@ -0,0 +1,84 @@
+// Stateless anonymous session tokens
+// A token is base64url(sessionId | issuedAt | ipHash | signature), HMAC-signed with
+// SESSION_SECRET. Any worker can validate one with a local, constant-time check -
+// no session store and no database round trip.
+const crypto = require('crypto');
+const { v4: uuidv4 } = require('uuid');
+const config = require('../config/environment');
+
+const ID_BYTES = 16;
+const ISSUED_AT_BYTES = 4; // seconds since epoch
+const IP_HASH_BYTES = 8;
+const SIGNATURE_BYTES = 16;
+const PAYLOAD_BYTES = ID_BYTES + ISSUED_AT_BYTES + IP_HASH_BYTES;
+const TOKEN_BYTES = PAYLOAD_BYTES + SIGNATURE_BYTES;
+
+function hmac(data) {
+    return crypto.createHmac('sha256', config.SESSION_SECRET).update(data).digest();
+}
+
+/**
+ * Keyed hash of the client IP; the raw IP never leaves the server
+ */
+function hashIP(ip) {
+    return hmac(`ip:${ip || ''}`).subarray(0, IP_HASH_BYTES);
+}
+
+function formatUUID(hex) {
+    return `${hex.slice(0, 8)}-${hex.slice(8, 12)}-${hex.slice(12, 16)}-${hex.slice(16, 20)}-${hex.slice(20)}`;
+}
+
+/**
+ * Mint a signed token for a new anonymous session, or re-sign an existing session id
+ */
+function createSessionToken(ip, now = Date.now(), sessionId = uuidv4()) {
+    const token = Buffer.alloc(TOKEN_BYTES);
+
+    token.write(sessionId.replace(/-/g, ''), 0, ID_BYTES, 'hex');
+    token.writeUInt32BE(Math.floor(now / 1000), ID_BYTES);
+    hashIP(ip).copy(token, ID_BYTES + ISSUED_AT_BYTES);
+    hmac(token.subarray(0, PAYLOAD_BYTES)).copy(token, PAYLOAD_BYTES, 0, SIGNATURE_BYTES);
+
+    return {
+        sessionId,
+        token: token.toString('base64url'),
+        expiresAt: Math.floor(now / 1000) * 1000 + config.SESSION_TIMEOUT
+    };
+}
+
+/**
+ * Verify a token's signature and age; returns the session or null
+ */
+function verifySessionToken(token, now = Date.now()) {
+    if (typeof token !== 'string') {
+        return null;
+    }
+
+    const bytes = Buffer.from(token, 'base64url');
+    if (bytes.length !== TOKEN_BYTES) {
+        return null;
+    }
+
+    const expected = hmac(bytes.subarray(0, PAYLOAD_BYTES)).subarray(0, SIGNATURE_BYTES);
+    if (!crypto.timingSafeEqual(expected, bytes.subarray(PAYLOAD_BYTES))) {
+        return null;
+    }
+
+    const issuedAt = bytes.readUInt32BE(ID_BYTES) * 1000;
+    if (now - issuedAt > config.SESSION_TIMEOUT) {
+        return null;
+    }
+
+    return {
+        sessionId: formatUUID(bytes.toString('hex', 0, ID_BYTES)),
+        issuedAt,
+        expiresAt: issuedAt + config.SESSION_TIMEOUT,
+        ipHash: bytes.toString('hex', ID_BYTES + ISSUED_AT_BYTES, PAYLOAD_BYTES)
+    };
+}
+
+module.exports = {
+    hashIP,
+    createSessionToken,
+    verifySessionToken
+};
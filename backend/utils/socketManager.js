@@ -1,12 +1,77 @@
 // Socket Manager for handling WebRTC signaling and user matching
 const { v4: uuidv4 } = require('uuid');
+const dictionary = require('./dictionary');
+const Blocklist = require('./blocklist');
+
+// How long a reported user stays out of matching
+const REPORT_BLOCK_MS = 10 * 60 * 1000;
 
 class SocketManager {
-    constructor(io) {
+    /**
+     * @param {Object} io - Socket.io server
+     * @param {Object} options
+     * @param {boolean} options.shareBlocklist - relay blocks to other nodes through the adapter
+     *     (needs an adapter with serverSideEmit, e.g. Redis; the default in-memory one ignores it)
+     * @param {ViolationStore} options.violations - automatic bans are applied as they are issued
+     */
+    constructor(io, { shareBlocklist = false, violations = null } = {}) {
         this.io = io;
         this.waitingUsers = new Map(); // Users waiting for match
         this.connectedPairs = new Map(); // Connected user pairs
-        this.reportedUsers = new Set(); // Temporarily blocked users
+        this.reportedUsers = new Blocklist(); // Temporarily blocked client IPs
+        this.shareBlocklist = shareBlocklist;
+        this.violations = violations;
+
+        // Blocks made on other nodes (requires an adapter with serverSideEmit, e.g. Redis)
+        if (shareBlocklist) {
+            this.io.on('block-user', (key, ttlMs) => {
+                this.reportedUsers.add(key, ttlMs);
+            });
+        }
+
+        if (violations) {
+            violations.on('ban', (userId, banMs) => this.banUser(userId, banMs));
+        }
+    }
+
+    /**
+     * Ban the identity (client IP) violations were counted against; waiting users it now
+     * blocks leave the queue
+     */
+    banUser(identity, banMs) {
+        this.blockKey(identity, banMs);
+        for (const [id, waitingSocket] of this.waitingUsers) {
+            if (this.isBlocked(waitingSocket)) {
+                this.waitingUsers.delete(id);
+            }
+        }
+    }
+
+    /**
+     * Block a user by client IP so a new socket id does not evade it
+     */
+    blockUser(userInfo, ttlMs) {
+        if (userInfo.ip) {
+            this.blockKey(userInfo.ip, ttlMs);
+        }
+    }
+
+    blockKey(key, ttlMs) {
+        this.reportedUsers.add(key, ttlMs);
+        if (this.shareBlocklist) {
+            this.io.serverSideEmit('block-user', key, ttlMs);
+        }
+    }
+
+    /**
+     * Durable identity of a user: survives reconnects, unlike the socket id
+     */
+    identityOf(userInfo) {
+        return userInfo.ip;
+    }
+
+    isBlocked(socket) {
+        return this.reportedUsers.has(socket.userInfo.ip);
     }
 
     async findMatch(socket) {
@@ -45,7 +110,7 @@ class SocketManager {
 
     isCompatible(socket1, socket2) {
         // Don't match with reported users
-        if (this.reportedUsers.has(socket1.id) || this.reportedUsers.has(socket2.id)) {
+        if (this.isBlocked(socket1) || this.isBlocked(socket2)) {
             return false;
         }
 
@@ -90,26 +155,22 @@ class SocketManager {
             startTime: new Date()
         });
 
-        // Notify both users of match
+        // Notify both users of match - partner country and hobby are dictionary codes
         socket1.emit('match-found', {
             roomId,
+            dictionaryVersion: dictionary.version,
             partner: {
-                country: socket2.userInfo.country,
-                countryCode: socket2.userInfo.countryCode,
-                flag: socket2.userInfo.flag,
-                city: socket2.userInfo.city,
-                hobby: socket2.userInfo.preferences.hobby
+                country: dictionary.getCountryCode(socket2.userInfo.countryCode),
+                hobby: dictionary.getHobbyCode(socket2.userInfo.preferences.hobby)
             }
         });
 
         socket2.emit('match-found', {
             roomId,
+            dictionaryVersion: dictionary.version,
             partner: {
-                country: socket1.userInfo.country,
-                countryCode: socket1.userInfo.countryCode,
-                flag: socket1.userInfo.flag,
-                city: socket1.userInfo.city,
-                hobby: socket1.userInfo.preferences.hobby
+                country: dictionary.getCountryCode(socket1.userInfo.countryCode),
+                hobby: dictionary.getHobbyCode(socket1.userInfo.preferences.hobby)
             }
         });
 
@@ -129,12 +190,14 @@ class SocketManager {
             console.log(`Report filed: ${socket.id} reported ${socket.matchedWith}`);
 
             // Temporarily block reported user (for demo - in production, save to database)
-            this.reportedUsers.add(socket.matchedWith);
+            const reportedSocket = this.io.sockets.sockets.get(socket.matchedWith);
+            if (reportedSocket) {
+                this.blockUser(reportedSocket.userInfo, REPORT_BLOCK_MS);
 
-            // Remove block after 10 minutes (for demo)
-            setTimeout(() => {
-                this.reportedUsers.delete(socket.matchedWith);
-            }, 10 * 60 * 1000);
+                if (this.violations) {
+                    this.violations.recordReport(this.identityOf(reportedSocket.userInfo), socket.userInfo.ip);
+                }
+            }
 
             // Disconnect the match
             this.disconnectMatch(socket);
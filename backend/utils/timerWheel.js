@@ -0,0 +1,120 @@
+// Hashed timer wheel for TTL-based expiry
+// One interval timer per wheel no matter how many keys are pending, so a burst of
+// blocks, session timeouts or negative-cache entries does not create a timer each.
+
+class TimerWheel {
+    /**
+     * @param {Object} options
+     * @param {number} options.tickMs - expiry resolution in milliseconds
+     * @param {number} options.slots - number of wheel slots; tickMs * slots is one revolution
+     * @param {Function} options.onExpire - called with (key, value) when an entry expires
+     */
+    constructor({ tickMs = 1000, slots = 512, onExpire = null } = {}) {
+        this.tickMs = tickMs;
+        this.slots = Array.from({ length: slots }, () => new Set());
+        this.cursor = 0;
+        this.entries = new Map(); // key -> { slot, rounds, value }
+        this.onExpire = onExpire;
+        this.timer = null;
+    }
+
+    get size() {
+        return this.entries.size;
+    }
+
+    /**
+     * Add a key that expires after ttlMs; re-adding a key resets its expiry
+     */
+    add(key, ttlMs, value = true) {
+        this.delete(key);
+
+        const ticks = Math.max(1, Math.ceil(ttlMs / this.tickMs));
+        const slot = (this.cursor + ticks) % this.slots.length;
+        const rounds = Math.floor((ticks - 1) / this.slots.length);
+
+        this.entries.set(key, { slot, rounds, value });
+        this.slots[slot].add(key);
+        this.start();
+
+        return this;
+    }
+
+    has(key) {
+        return this.entries.has(key);
+    }
+
+    get(key) {
+        const entry = this.entries.get(key);
+        return entry ? entry.value : undefined;
+    }
+
+    delete(key) {
+        const entry = this.entries.get(key);
+        if (!entry) {
+            return false;
+        }
+
+        this.slots[entry.slot].delete(key);
+        this.entries.delete(key);
+        if (this.entries.size === 0) {
+            this.stop();
+        }
+
+        return true;
+    }
+
+    clear() {
+        for (const slot of this.slots) {
+            slot.clear();
+        }
+        this.entries.clear();
+        this.stop();
+    }
+
+    /**
+     * Advance the wheel one slot and expire entries whose last round has come
+     */
+    tick() {
+        this.cursor = (this.cursor + 1) % this.slots.length;
+        const slot = this.slots[this.cursor];
+
+        // Snapshot so keys re-added by onExpire wait a full revolution
+        for (const key of Array.from(slot)) {
+            const entry = this.entries.get(key);
+            if (!entry || entry.slot !== this.cursor) {
+                continue; // removed or moved by an earlier onExpire
+            }
+            if (entry.rounds > 0) {
+                entry.rounds--;
+                continue;
+            }
+
+            slot.delete(key);
+            this.entries.delete(key);
+            if (this.onExpire) {
+                this.onExpire(key, entry.value);
+            }
+        }
+
+        if (this.entries.size === 0) {
+            this.stop();
+        }
+    }
+
+    start() {
+        if (!this.timer) {
+            this.timer = setInterval(() => this.tick(), this.tickMs);
+            // Pending expiries should not keep the process alive on shutdown
+            this.timer.unref();
+        }
+    }
+
+    stop() {
+        if (this.timer) {
+            clearInterval(this.timer);
+            this.timer = null;
+        }
+    }
+}
+
+module.exports = TimerWheel;
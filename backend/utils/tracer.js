@@ -0,0 +1,168 @@
+// Sampled latency spans for the match lifecycle
+// One connection in sampleEvery is traced. A span runs from the trace's previous lifecycle
+// point (or an explicit start) to now, so a trace reads as a waterfall of where the time
+// went. Spans land in a fixed ring of typed arrays - recording allocates nothing - and
+// percentiles are computed over the ring only when a summary is asked for. Unsampled
+// connections carry no trace and cost a single property check per stage.
+const fs = require('fs');
+const path = require('path');
+const { performance } = require('perf_hooks');
+
+// Lifecycle stages, in the order a user goes through them
+const STAGES = [
+    'handshake',
+    'set-hobby',
+    'enqueue',
+    'match',
+    'match-found',
+    'offer-relay',
+    'answer-relay',
+    'first-ice'
+];
+
+class Tracer {
+    /**
+     * @param {Object} options
+     * @param {string[]} [options.stages] - stage names, in lifecycle order
+     * @param {number} options.sampleEvery - trace one connection in this many; 0 disables
+     * @param {number} options.capacity - spans kept for the percentile summaries
+     * @param {string} [options.exportFile] - append every span as a JSON line to this file
+     */
+    constructor({ stages = STAGES, sampleEvery = 20, capacity = 4096, exportFile = null }) {
+        this.stages = stages;
+        this.sampleEvery = sampleEvery;
+        this.capacity = capacity;
+
+        this.traceIds = new Uint32Array(capacity);
+        this.stageIds = new Uint8Array(capacity);
+        this.starts = new Float64Array(capacity);
+        this.durations = new Float64Array(capacity);
+        this.next = 0;
+        this.size = 0;
+
+        this.totals = new Float64Array(stages.length);
+        this.connections = 0;
+        this.nextTraceId = 1;
+
+        this.out = null;
+        if (exportFile) {
+            fs.mkdirSync(path.dirname(exportFile), { recursive: true });
+            this.out = fs.createWriteStream(exportFile, { flags: 'a' });
+            this.out.on('error', (error) => {
+                console.error('Trace export failed:', error.message);
+                this.out = null;
+            });
+        }
+    }
+
+    now() {
+        return performance.now();
+    }
+
+    /**
+     * Decide whether a new connection is traced; returns its trace or null
+     */
+    begin() {
+        if (!this.sampleEvery || this.connections++ % this.sampleEvery !== 0) {
+            return null;
+        }
+        return { id: this.nextTraceId++, mark: this.now(), seen: 0 };
+    }
+
+    /**
+     * Start a new matching round: lifecycle stages may be recorded again
+     */
+    reset(trace) {
+        trace.seen = 0;
+    }
+
+    /**
+     * Record a stage once per round, ending now
+     * @param {Object} trace - from begin()
+     * @param {number} stage - index into stages
+     * @param {number} [start] - defaults to the end of the trace's previous span
+     */
+    span(trace, stage, start = trace.mark) {
+        const bit = 1 << stage;
+        if (trace.seen & bit) {
+            return;
+        }
+        trace.seen |= bit;
+
+        const end = this.now();
+        trace.mark = end;
+        this.record(trace.id, stage, start, end - start);
+    }
+
+    record(traceId, stage, start, duration) {
+        const i = this.next;
+        this.traceIds[i] = traceId;
+        this.stageIds[i] = stage;
+        this.starts[i] = start;
+        this.durations[i] = duration;
+        this.next = (i + 1) % this.capacity;
+        if (this.size < this.capacity) {
+            this.size++;
+        }
+        this.totals[stage]++;
+
+        if (this.out) {
+            this.out.write(JSON.stringify({
+                trace: traceId,
+                stage: this.stages[stage],
+                start: Math.round(performance.timeOrigin + start),
+                ms: +duration.toFixed(3)
+            }) + '\n');
+        }
+    }
+
+    /**
+     * Per-stage percentiles (ms) over the spans still in the ring
+     */
+    summary() {
+        const byStage = this.stages.map(() => []);
+        for (let i = 0; i < this.size; i++) {
+            byStage[this.stageIds[i]].push(this.durations[i]);
+        }
+
+        const stages = {};
+        this.stages.forEach((name, stage) => {
+            const values = byStage[stage].sort((a, b) => a - b);
+            const at = p => (values.length ? +values[Math.min(values.length - 1, Math.floor(p / 100 * values.length))].toFixed(2) : 0);
+            stages[name] = {
+                total: this.totals[stage],
+                window: values.length,
+                p50: at(50),
+                p90: at(90),
+                p99: at(99),
+                max: at(100)
+            };
+        });
+
+        return {
+            sampleEvery: this.sampleEvery,
+            traces: this.nextTraceId - 1,
+            exporting: Boolean(this.out),
+            stages
+        };
+    }
+
+    close() {
+        if (this.out) {
+            this.out.end();
+            this.out = null;
+        }
+    }
+}
+
+Tracer.STAGES = STAGES;
+Tracer.HANDSHAKE = 0;
+Tracer.SET_HOBBY = 1;
+Tracer.ENQUEUE = 2;
+Tracer.MATCH = 3;
+Tracer.MATCH_FOUND = 4;
+Tracer.OFFER_RELAY = 5;
+Tracer.ANSWER_RELAY = 6;
+Tracer.FIRST_ICE = 7;
+
+module.exports = Tracer;
@@ -0,0 +1,45 @@
+// Socket.io transport and compression policy
+// Clients open a websocket directly instead of long-polling first and upgrading, which
+// saves the polling handshake round trips and the extra HTTP requests through nginx.
+// Polling stays enabled as a fallback unless SOCKET_TRANSPORTS drops it.
+//
+// Per-message deflate only applies to frames above WS_DEFLATE_THRESHOLD bytes: SDP offers
+// and answers (several KB of repetitive text) compress well, while ICE candidates and
+// emoji reactions are smaller than the deflate overhead and are sent as-is.
+const config = require('../config/environment');
+
+const KNOWN_TRANSPORTS = ['websocket', 'polling'];
+
+function transports() {
+    const allowed = config.SOCKET_TRANSPORTS.filter(name => KNOWN_TRANSPORTS.includes(name));
+    return allowed.length > 0 ? allowed : KNOWN_TRANSPORTS;
+}
+
+/**
+ * Engine.io options for the Socket.io server
+ */
+function transportOptions() {
+    return {
+        transports: transports(),
+        // Oversized frames are refused by the transport before they are parsed
+        maxHttpBufferSize: config.SOCKET_MAX_PAYLOAD_BYTES,
+        perMessageDeflate: config.WS_DEFLATE_ENABLED
+            ? {
+                threshold: config.WS_DEFLATE_THRESHOLD,
+                // Signaling frames are small and latency-bound; favour speed over ratio
+                zlibDeflateOptions: { level: 1 },
+                // No context takeover: no per-connection zlib window kept between frames
+                serverNoContextTakeover: true,
+                clientNoContextTakeover: true
+            }
+            : false,
+        httpCompression: config.WS_DEFLATE_ENABLED
+            ? { threshold: config.WS_DEFLATE_THRESHOLD }
+            : false
+    };
+}
+
+module.exports = {
+    transports,
+    transportOptions
+};
@@ -0,0 +1,87 @@
+// Decaying violation counters with automatic temporary bans
+// Each counter is an exponentially decaying score updated in O(1) on every report, so
+// there is no window to slide and no scan over users. Idle counters expire through a
+// timer wheel. Listeners receive 'ban' (userId, banMs) as soon as a score crosses the
+// threshold.
+//
+// User ids are durable identities (session ids), so reconnecting does not clear a record.
+// Recent pairings are kept for a while so a report that arrives out of band (the REST
+// endpoint) only counts against someone the reporter was actually matched with.
+const EventEmitter = require('events');
+const TimerWheel = require('./timerWheel');
+
+// Counters are dropped once they have decayed for this many half-lives
+const EXPIRY_HALF_LIVES = 4;
+
+class ViolationStore extends EventEmitter {
+    /**
+     * @param {Object} options
+     * @param {number} options.halfLifeMs - time for a score to decay by half
+     * @param {number} options.banThreshold - decayed reports against a user that trigger a ban
+     * @param {number} options.banMs - how long a ban lasts
+     * @param {number} options.reporterLimit - decayed reports from one IP before its reports are ignored
+     * @param {number} options.pairWindowMs - how long after a match either side may report the other
+     */
+    constructor({ halfLifeMs = 3600000, banThreshold = 3, banMs = 3600000, reporterLimit = 10, pairWindowMs = 600000 } = {}) {
+        super();
+        this.decayRate = Math.LN2 / halfLifeMs;
+        this.ttlMs = halfLifeMs * EXPIRY_HALF_LIVES;
+        this.banThreshold = banThreshold;
+        this.banMs = banMs;
+        this.reporterLimit = reporterLimit;
+        this.pairWindowMs = pairWindowMs;
+
+        this.violations = new TimerWheel(); // reported user -> { score, updatedAt }
+        this.reporters = new TimerWheel(); // reporter IP -> { score, updatedAt }
+        this.pairs = new TimerWheel(); // "reporter id|partner socket id" -> partner user id
+    }
+
+    decayed(counter, now) {
+        return counter.score * Math.exp(-this.decayRate * (now - counter.updatedAt));
+    }
+
+    increment(counters, key, now) {
+        const counter = counters.get(key) || { score: 0, updatedAt: now };
+        counter.score = this.decayed(counter, now) + 1;
+        counter.updatedAt = now;
+        counters.add(key, this.ttlMs, counter);
+        return counter.score;
+    }
+
+    /**
+     * Count a report; returns false if the reporter is over its limit and the report was ignored
+     */
+    recordReport(reportedUserId, reporterIP, now = Date.now()) {
+        // Scores are compared rounded so reports in quick succession count as whole reports
+        if (Math.round(this.increment(this.reporters, reporterIP, now)) > this.reporterLimit) {
+            return false;
+        }
+
+        if (Math.round(this.increment(this.violations, reportedUserId, now)) >= this.banThreshold) {
+            this.emit('ban', reportedUserId, this.banMs);
+        }
+
+        return true;
+    }
+
+    /**
+     * Remember that userId was matched with the socket partnerSocketId (user partnerUserId)
+     */
+    recordPair(userId, partnerSocketId, partnerUserId) {
+        this.pairs.add(`${userId}|${partnerSocketId}`, this.pairWindowMs, partnerUserId);
+    }
+
+    /**
+     * The user behind partnerSocketId if userId was matched with them recently, else null
+     */
+    pairedUser(userId, partnerSocketId) {
+        return this.pairs.get(`${userId}|${partnerSocketId}`) || null;
+    }
+
+    getViolationScore(reportedUserId, now = Date.now()) {
+        const counter = this.violations.get(reportedUserId);
+        return counter ? this.decayed(counter, now) : 0;
+    }
+}
+
+module.exports = ViolationStore;
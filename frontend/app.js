@@ -22,6 +22,15 @@ class StrangerFaceApp {
             socket: null
         };
 
+        // Backend server
+        this.serverUrl = 'https://stranger-face-backend.onrender.com';
+
+        // Shared hobby/country dictionary - match payloads only carry codes into it
+        this.dictionary = null;
+
+        // Signed session token; presented on reconnect so the server can resume our session
+        this.sessionToken = null;
+
         // WebRTC configuration with STUN servers
         this.rtcConfig = {
             iceServers: [
@@ -50,6 +59,13 @@ class StrangerFaceApp {
         // Queued ICE candidates
         this.queuedIceCandidates = [];
 
+        // Time of the last match-found, for the first-frame metric
+        this.matchFoundAt = null;
+
+        // Emoji clicks waiting for the next batch
+        this.pendingReactions = {};
+        this.reactionTimer = null;
+
         if (document.readyState === 'loading') {
             document.addEventListener('DOMContentLoaded', () => this.init());
         } else {
@@ -63,6 +79,9 @@ class StrangerFaceApp {
         // Cache DOM elements
         this.cacheElements();
         
+        // Load the shared dictionary before any match can arrive
+        await this.loadDictionary();
+
         // Initialize Socket.IO connection to backend
         await this.initializeSocket();
         
@@ -80,8 +99,9 @@ class StrangerFaceApp {
         try {
             console.log('🔌 Connecting to backend server...');
             
-            // Connect to your Render backend
-            this.socket = io('https://stranger-face-backend.onrender.com', {
+            // Connect to your Render backend - websocket first, no polling handshake
+            this.socket = io(this.serverUrl, {
+                auth: (cb) => cb({ token: this.sessionToken }),
                 transports: ['websocket', 'polling'],
                 timeout: 20000,
                 reconnection: true,
@@ -94,6 +114,30 @@ class StrangerFaceApp {
                 this.showNotification('Connected to server', 'success');
             });
 
+            // Session state after (re)connecting - a resumed session keeps its match or queue spot
+            this.socket.on('session', (data) => {
+                this.sessionToken = data.token;
+                console.log(data.resumed ? '🔁 Session resumed' : '🆕 New session');
+
+                // Search again after being moved to another server
+                if (!data.resumed && this.state.currentView === 'loadingScreen' && this.state.selectedHobby) {
+                    this.startRealSearch();
+                }
+
+                // The old session expired, so the room we were in is gone
+                if (!data.resumed && this.state.currentView === 'chatScreen') {
+                    this.handlePartnerDisconnected();
+                }
+            });
+
+            // Server is shutting down - reconnect to another node after the jittered delay
+            this.socket.on('server-draining', (data) => {
+                console.log(`🚧 Server draining, reconnecting in ${data.reconnectAfter}ms`);
+                setTimeout(() => {
+                    this.socket.connect();
+                }, data.reconnectAfter);
+            });
+
             this.socket.on('disconnect', (reason) => {
                 console.log('❌ Disconnected from server:', reason);
                 this.showNotification('Disconnected from server', 'error');
@@ -101,6 +145,13 @@ class StrangerFaceApp {
 
             this.socket.on('connect_error', (error) => {
                 console.error('❌ Connection error:', error);
+
+                // Websocket blocked (proxy or firewall) - retry with long-polling, which
+                // still upgrades to a websocket later if the network allows it
+                if (this.socket.io.opts.transports[0] === 'websocket') {
+                    console.log('↩️ Falling back to long-polling');
+                    this.socket.io.opts.transports = ['polling', 'websocket'];
+                }
                 this.showNotification('Failed to connect to server', 'error');
             });
 
@@ -126,9 +177,13 @@ class StrangerFaceApp {
                 await this.handleIceCandidate(data);
             });
 
-            this.socket.on('partner-disconnected', () => {
+            this.socket.on('emoji-reactions', (data) => {
+                this.showEmojiReactions(data.reactions);
+            });
+
+            this.socket.on('partner-disconnected', (data) => {
                 console.log('👋 Partner disconnected');
-                this.handlePartnerDisconnected();
+                this.handlePartnerDisconnected(data);
             });
 
             this.socket.on('waiting-for-match', () => {
@@ -147,6 +202,30 @@ class StrangerFaceApp {
         }
     }
 
+    // Load the hobby/country dictionary, cached in localStorage by version
+    async loadDictionary(version = null) {
+        try {
+            const cached = JSON.parse(localStorage.getItem('strangerFaceDictionary'));
+            if (cached && (!version || cached.version === version)) {
+                this.dictionary = cached;
+                return;
+            }
+        } catch (error) {
+            console.warn('⚠️ Ignoring unreadable cached dictionary');
+        }
+
+        try {
+            // A versioned URL so a cached body of older tables is never reused
+            const query = version ? `?v=${encodeURIComponent(version)}` : '';
+            const response = await fetch(`${this.serverUrl}/api/dictionary${query}`);
+            this.dictionary = await response.json();
+            localStorage.setItem('strangerFaceDictionary', JSON.stringify(this.dictionary));
+            console.log(`📖 Loaded dictionary ${this.dictionary.version}`);
+        } catch (error) {
+            console.error('❌ Failed to load dictionary:', error);
+        }
+    }
+
     // Safe WebRTC setRemoteDescription helper
     async safeSetRemoteDescription(pc, description) {
         const desc = new RTCSessionDescription(description);
@@ -401,6 +480,7 @@ class StrangerFaceApp {
                     
                     // Set the stream immediately
                     remoteVideoElement.srcObject = remoteStream;
+                    remoteVideoElement.addEventListener('loadeddata', () => this.reportFirstFrame(), { once: true });
                     
                     // CRITICAL: Enhanced force play with stream validation
                     const forcePlay = async () => {
@@ -766,7 +846,8 @@ class StrangerFaceApp {
     }
 
     // Start real search for users with same hobby
-    async startRealSearch() {
+    // requestMatch is false when the server has already put us back in the queue
+    async startRealSearch(requestMatch = true) {
         console.log(`🔍 Starting REAL search for ${this.state.selectedHobby.name} enthusiasts...`);
         
         // Update loading text
@@ -780,9 +861,11 @@ class StrangerFaceApp {
 
         // Send hobby preference to backend
         if (this.socket && this.socket.connected) {
-            console.log('📤 Sending hobby preference to backend');
-            this.socket.emit('set-hobby-preference', this.state.selectedHobby.id);
-            this.socket.emit('find-match');
+            if (requestMatch) {
+                console.log('📤 Sending hobby preference to backend');
+                this.socket.emit('set-hobby-preference', this.state.selectedHobby.id);
+                this.socket.emit('find-match');
+            }
         } else {
             console.error('❌ Socket not connected');
             this.showNotification('Connection to server lost. Please refresh and try again.', 'error');
@@ -795,12 +878,21 @@ class StrangerFaceApp {
     // Handle real match found from backend
     async handleRealMatchFound(matchData) {
         console.log('🎉 REAL match found!', matchData);
+        this.matchFoundAt = performance.now();
+
+        // Refresh the dictionary if the server's tables changed since we cached it
+        if (!this.dictionary || this.dictionary.version !== matchData.dictionaryVersion) {
+            await this.loadDictionary(matchData.dictionaryVersion);
+        }
+
+        const dictionary = this.dictionary || { hobbies: [], countries: [] };
+        const country = dictionary.countries[matchData.partner.country] || {};
         
         this.state.currentStranger = {
-            country: matchData.partner.country || 'Unknown',
-            countryCode: matchData.partner.countryCode || 'XX',
-            flag: matchData.partner.flag || '🌍',
-            hobby: matchData.partner.hobby || this.state.selectedHobby.id,
+            country: country.country || 'Unknown',
+            countryCode: country.countryCode || 'XX',
+            flag: country.flag || '🌍',
+            hobby: dictionary.hobbies[matchData.partner.hobby] || this.state.selectedHobby.id,
             roomId: matchData.roomId
         };
 
@@ -960,10 +1052,10 @@ class StrangerFaceApp {
         // Stop session timer
         this.stopSessionTimer();
         
-        // Request new match
+        // Request new match - the server requeues us, no find-match needed
         if (this.socket && this.socket.connected) {
             this.socket.emit('next-stranger');
-            this.startRealSearch();
+            this.startRealSearch(false);
         } else {
             this.showNotification('Connection lost. Please refresh and try again.', 'error');
         }
@@ -1032,10 +1124,16 @@ class StrangerFaceApp {
     }
 
     // Handle partner disconnected
-    handlePartnerDisconnected() {
+    handlePartnerDisconnected(data = {}) {
         this.showNotification('Partner disconnected. Finding new match...', 'info');
         this.closePeerConnection();
         this.stopSessionTimer();
+
+        // Already back in the queue - the next match-found may follow immediately
+        if (data && data.requeued) {
+            this.startRealSearch(false);
+            return;
+        }
         
         // Automatically start new search
         setTimeout(() => {
@@ -1107,23 +1205,50 @@ class StrangerFaceApp {
         }
     }
 
-    // Send emoji reaction
+    // Report time from match-found to the first remote video frame, once per call
+    reportFirstFrame() {
+        if (!this.matchFoundAt || !this.socket) return;
+
+        const firstFrameMs = Math.round(performance.now() - this.matchFoundAt);
+        this.matchFoundAt = null;
+        console.log(`🖼️ First remote frame after ${firstFrameMs}ms`);
+        this.socket.emit('call-metrics', { firstFrameMs });
+    }
+
+    // Send emoji reaction - clicks are counted and sent once per window
     sendEmojiReaction(emoji) {
-        console.log(`💫 Sending emoji reaction: ${emoji}`);
-        
         // Create floating emoji
         this.createFloatingEmoji(emoji);
         
-        // Send to other user via socket
         if (this.socket && this.state.currentStranger) {
-            this.socket.emit('emoji-reaction', { 
-                emoji, 
-                roomId: this.state.currentStranger.roomId,
-                timestamp: Date.now() 
-            });
+            this.pendingReactions[emoji] = (this.pendingReactions[emoji] || 0) + 1;
+            if (!this.reactionTimer) {
+                this.reactionTimer = setTimeout(() => this.flushEmojiReactions(), 250);
+            }
         }
     }
 
+    // Send the batched reactions as one volatile frame; dropped, never queued, on a busy link
+    flushEmojiReactions() {
+        const reactions = this.pendingReactions;
+        this.pendingReactions = {};
+        this.reactionTimer = null;
+
+        if (this.socket && this.state.currentStranger) {
+            console.log('💫 Sending emoji reactions:', reactions);
+            this.socket.volatile.emit('emoji-reactions', { reactions });
+        }
+    }
+
+    // Show a partner's batched reactions, a few floating emoji per kind at most
+    showEmojiReactions(reactions = {}) {
+        Object.entries(reactions).forEach(([emoji, count]) => {
+            for (let i = 0; i < Math.min(count, 5); i++) {
+                setTimeout(() => this.createFloatingEmoji(emoji), i * 100);
+            }
+        });
+    }
+
     // Create floating emoji animation
     createFloatingEmoji(emoji) {
         const container = document.getElementById('emojiReactions');
@@ -0,0 +1,285 @@
+# Socket.io load generator for the matchmaking and signaling backend
+#
+# Simulates N virtual clients, each running the real client protocol against a live
+# server: connect, set-hobby-preference, find-match, then per call an offer, an answer
+# to the partner's offer, a burst of ICE candidates, and finally next-stranger or
+# disconnect. Arrivals are a Poisson process; hobbies are drawn from a configurable mix.
+#
+# Reports connection rate and percentiles for connect time, time to match, relay
+# latency (partner's send to our receipt - both ends live in this process) and the
+# error rate by kind.
+#
+# Requires: pip install "python-socketio[asyncio_client]" numpy
+#
+# Usage:
+#   python load_test.py --url http://localhost:5000 --clients 2000 --rate 200
+#   python load_test.py --hobbies music=4,gaming=3,art=1 --next-probability 0.7 --out load.json
+import argparse
+import asyncio
+import itertools
+import json
+import resource
+import sys
+import time
+from collections import Counter, defaultdict
+
+import numpy as np
+import socketio
+
+HOBBIES = ['singing', 'dancing', 'music', 'coding', 'gaming', 'art', 'books', 'travel']
+
+# Media sections of a typical browser offer; the o= line carries the message id
+SDP_BODY = '\r\n'.join([
+    's=-', 't=0 0', 'a=group:BUNDLE 0 1', 'a=msid-semantic: WMS stream',
+    'm=audio 9 UDP/TLS/RTP/SAVPF 111 0 8',
+    'c=IN IP4 0.0.0.0', 'a=rtcp:9 IN IP4 0.0.0.0', 'a=ice-ufrag:Zx7q', 'a=ice-pwd:3bqjW0p9Yv8Z2l0vEo1Z6v2N',
+    'a=fingerprint:sha-256 7B:8B:F0:65:5F:78:E2:51:3B:AC:6F:F3:3F:46:1B:35:DC:B8:5F:64:1A:24:C2:43:F0:A1:58:D0:A1:2C:19:08',
+    'a=setup:actpass', 'a=mid:0', 'a=extmap:1 urn:ietf:params:rtp-hdrext:sdes:mid', 'a=sendrecv', 'a=rtcp-mux',
+    'a=rtpmap:111 opus/48000/2', 'a=fmtp:111 minptime=10;useinbandfec=1', 'a=rtpmap:0 PCMU/8000', 'a=rtpmap:8 PCMA/8000',
+    'm=video 9 UDP/TLS/RTP/SAVPF 96 97 98 99',
+    'c=IN IP4 0.0.0.0', 'a=rtcp:9 IN IP4 0.0.0.0', 'a=ice-ufrag:Zx7q', 'a=ice-pwd:3bqjW0p9Yv8Z2l0vEo1Z6v2N',
+    'a=setup:actpass', 'a=mid:1', 'a=extmap:1 urn:ietf:params:rtp-hdrext:sdes:mid', 'a=sendrecv', 'a=rtcp-mux',
+    'a=rtpmap:96 VP8/90000', 'a=rtcp-fb:96 nack', 'a=rtcp-fb:96 nack pli', 'a=rtcp-fb:96 transport-cc',
+    'a=rtpmap:97 rtx/90000', 'a=fmtp:97 apt=96',
+    'a=rtpmap:98 VP9/90000', 'a=fmtp:98 profile-id=0', 'a=rtpmap:99 rtx/90000', 'a=fmtp:99 apt=98',
+    ''
+])
+
+
+class Stats:
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.errors = Counter()
+        self.clients = 0
+        self.connect_times = []
+
+    def record(self, name, seconds):
+        self.samples[name].append(seconds * 1000)
+
+    def error(self, kind):
+        self.errors[kind] += 1
+
+    def summary(self, elapsed):
+        result = {
+            'clients': self.clients,
+            'seconds': round(elapsed, 2),
+            'connected': len(self.connect_times)
+        }
+
+        if len(self.connect_times) > 1:
+            window = max(self.connect_times) - min(self.connect_times)
+            result['connectionsPerSecond'] = round(len(self.connect_times) / window, 1) if window else None
+
+        for name, values in sorted(self.samples.items()):
+            samples = np.asarray(values)
+            p50, p90, p99 = np.percentile(samples, [50, 90, 99])
+            result[name + 'Ms'] = {
+                'count': len(samples),
+                'mean': round(float(samples.mean()), 2),
+                'p50': round(float(p50), 2),
+                'p90': round(float(p90), 2),
+                'p99': round(float(p99), 2),
+                'max': round(float(samples.max()), 2)
+            }
+
+        result['errors'] = {
+            kind: {'count': count, 'percentOfClients': round(100 * count / max(self.clients, 1), 2)}
+            for kind, count in self.errors.most_common()
+        }
+        return result
+
+
+class Registry:
+    """Send times of relayed messages, keyed by an id embedded in the payload"""
+
+    def __init__(self):
+        self.ids = itertools.count(1)
+        self.sent = {}
+
+    def stamp(self):
+        message_id = next(self.ids)
+        self.sent[message_id] = time.perf_counter()
+        return message_id
+
+    def received(self, message_id, stats, name):
+        sent = self.sent.pop(message_id, None)
+        if sent is not None:
+            stats.record(name, time.perf_counter() - sent)
+
+    def sdp(self, kind):
+        return {'type': kind, 'sdp': 'v=0\r\no=- %d 2 IN IP4 127.0.0.1\r\n%s' % (self.stamp(), SDP_BODY)}
+
+    def candidate(self, index):
+        return {
+            'candidate': 'candidate:%d 1 udp 2122260223 10.0.%d.%d %d typ host generation 0'
+                         % (self.stamp(), index // 250 % 250, index % 250 + 1, 50000 + index % 10000),
+            'sdpMid': '0',
+            'sdpMLineIndex': 0
+        }
+
+
+def sdp_id(description):
+    return int(description['sdp'].split('\r\n', 2)[1].split(' ')[1])
+
+
+def candidate_id(candidate):
+    return int(candidate['candidate'].split(' ', 1)[0][len('candidate:'):])
+
+
+async def virtual_client(index, hobby, args, stats, registry, rng):
+    sio = socketio.AsyncClient(reconnection=False)
+    events = asyncio.Queue()
+
+    async def on_match(data):
+        events.put_nowait('match')
+
+    async def on_partner_left(data=None):
+        events.put_nowait('partner-left')
+
+    async def on_offer(data):
+        registry.received(sdp_id(data['offer']), stats, 'relay')
+        await sio.emit('answer', {'answer': registry.sdp('answer')})
+
+    async def on_answer(data):
+        registry.received(sdp_id(data['answer']), stats, 'relay')
+
+    async def on_candidate(data):
+        registry.received(candidate_id(data['candidate']), stats, 'relay')
+
+    async def on_error(data):
+        stats.error('server-error')
+
+    sio.on('match-found', on_match)
+    sio.on('partner-disconnected', on_partner_left)
+    sio.on('offer', on_offer)
+    sio.on('answer', on_answer)
+    sio.on('ice-candidate', on_candidate)
+    sio.on('error', on_error)
+
+    started = time.perf_counter()
+    try:
+        await sio.connect(args.url, transports=['websocket'], wait_timeout=args.connect_timeout)
+    except (socketio.exceptions.ConnectionError, asyncio.TimeoutError):
+        stats.error('connect')
+        return
+    stats.record('connect', time.perf_counter() - started)
+    stats.connect_times.append(time.perf_counter())
+
+    try:
+        await sio.emit('set-hobby-preference', hobby)
+        search_started = time.perf_counter()
+        await sio.emit('find-match')
+
+        calls = 0
+        while calls < args.calls:
+            # Wait for a match; a partner leaving before we are matched changes nothing
+            try:
+                while await asyncio.wait_for(events.get(), args.match_timeout) != 'match':
+                    pass
+            except asyncio.TimeoutError:
+                stats.error('match-timeout')
+                break
+            stats.record('timeToMatch', time.perf_counter() - search_started)
+            calls += 1
+
+            await sio.emit('offer', {'offer': registry.sdp('offer')})
+            for i in range(args.ice):
+                await sio.emit('ice-candidate', {'candidate': registry.candidate(index * 64 + i)})
+
+            # Stay in the call until it ends or the partner leaves (we are requeued)
+            try:
+                await asyncio.wait_for(events.get(), rng.exponential(args.call_seconds))
+                search_started = time.perf_counter()
+                continue
+            except asyncio.TimeoutError:
+                pass
+
+            if calls >= args.calls or rng.random() >= args.next_probability:
+                break
+            search_started = time.perf_counter()
+            await sio.emit('next-stranger')
+    except socketio.exceptions.SocketIOError:
+        stats.error('disconnected')
+    finally:
+        await sio.disconnect()
+
+
+def parse_hobbies(spec):
+    if not spec:
+        return HOBBIES, np.full(len(HOBBIES), 1 / len(HOBBIES))
+
+    names, weights = [], []
+    for part in spec.split(','):
+        name, _, weight = part.partition('=')
+        if name not in HOBBIES:
+            raise SystemExit('unknown hobby: %s' % name)
+        names.append(name)
+        weights.append(float(weight or 1))
+    weights = np.asarray(weights)
+    return names, weights / weights.sum()
+
+
+def raise_file_limit():
+    """Each virtual client holds a socket; lift the soft descriptor limit to the hard one"""
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+
+async def run(args):
+    rng = np.random.default_rng(args.seed)
+    names, weights = parse_hobbies(args.hobbies)
+    hobbies = rng.choice(names, args.clients, p=weights)
+    arrivals = np.cumsum(rng.exponential(1 / args.rate, args.clients))
+
+    stats = Stats()
+    stats.clients = args.clients
+    registry = Registry()
+    loop = asyncio.get_running_loop()
+
+    started = loop.time()
+    tasks = []
+    for index in range(args.clients):
+        delay = started + arrivals[index] - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        client_rng = np.random.default_rng([args.seed, index])
+        tasks.append(asyncio.create_task(
+            virtual_client(index, str(hobbies[index]), args, stats, registry, client_rng)
+        ))
+
+    await asyncio.gather(*tasks)
+    return stats.summary(loop.time() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test the Stranger Face signaling server')
+    parser.add_argument('--url', default='http://localhost:5000', help='server URL')
+    parser.add_argument('--clients', type=int, default=1000, help='virtual clients in total')
+    parser.add_argument('--rate', type=float, default=100, help='mean arrivals per second (Poisson)')
+    parser.add_argument('--hobbies', help='hobby mix as name=weight,... (default: uniform)')
+    parser.add_argument('--calls', type=int, default=3, help='maximum calls per client')
+    parser.add_argument('--call-seconds', type=float, default=5, help='mean call length')
+    parser.add_argument('--next-probability', type=float, default=0.8,
+                        help='chance of next-stranger after a call instead of leaving')
+    parser.add_argument('--ice', type=int, default=8, help='ICE candidates sent per call')
+    parser.add_argument('--match-timeout', type=float, default=30, help='seconds to wait for a match')
+    parser.add_argument('--connect-timeout', type=float, default=10, help='seconds to wait for connect')
+    parser.add_argument('--seed', type=int, default=1, help='random seed')
+    parser.add_argument('--out', help='write the report JSON here instead of stdout')
+    args = parser.parse_args()
+
+    raise_file_limit()
+    print('Running %d clients at %.0f/s against %s ...' % (args.clients, args.rate, args.url), file=sys.stderr)
+    result = asyncio.run(run(args))
+
+    output = json.dumps(result, indent=2)
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            f.write(output)
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
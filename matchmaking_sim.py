@@ -0,0 +1,389 @@
+# Offline discrete-event simulator for matchmaking capacity planning
+#
+# Replays the matcher's policies against synthetic traffic to predict wait times, queue
+# depth and match quality before a rule change ships:
+#   server            server.js findMatch: per-hobby FIFO, first waiting user not met
+#                     within the rematch window (partner history), banned users refused
+#   server-no-history the same without rematch avoidance
+#   socketmanager     socketManager.js findMatch/isCompatible: one global FIFO; same hobby,
+#                     or either side without one; never the same IP or a blocked user
+#   fallback          server, plus a waiting user is offered to any hobby queue after
+#                     --fallback-seconds
+#
+# Users arrive per hobby as Poisson processes, make up to --max-calls calls, skip some
+# calls early, choose next or leave when they end a call (the partner is requeued, as
+# the server does) and abandon the queue after an exponential patience. Reports feed
+# the socketmanager block (10 minutes) and the server ban (after VIOLATION_BAN_THRESHOLD
+# reports; decay is not modeled).
+#
+# Traffic for every scenario is drawn up front with NumPy and the results are reduced
+# with vectorized percentiles, histograms and searchsorted queue-depth curves; only the
+# event loop itself is sequential. Runs are deterministic for a given --seed.
+#
+# Usage:
+#   python matchmaking_sim.py --load 1,2,5,10 --policy server,fallback --out sweep.json
+#   python matchmaking_sim.py --rate 5 --hobbies music=4,gaming=3,art=1 --hours 2
+import argparse
+import heapq
+import itertools
+import json
+import sys
+import time
+from collections import deque
+
+import numpy as np
+
+HOBBIES = ['singing', 'dancing', 'music', 'coding', 'gaming', 'art', 'books', 'travel']
+POLICIES = ['server', 'server-no-history', 'socketmanager', 'fallback']
+
+# Matching and moderation defaults from backend/config/environment.js and socketManager.js
+PARTNER_HISTORY_SIZE = 8
+REMATCH_WINDOW_S = 300
+REPORT_BLOCK_S = 600
+VIOLATION_BAN_THRESHOLD = 3
+VIOLATION_BAN_S = 3600
+
+# Log-spaced wait-time histogram bounds, seconds
+WAIT_BINS = np.concatenate(([0], np.logspace(-1, 3, 25)))
+
+ARRIVE, CALL_END, ABANDON, FALLBACK = range(4)
+
+
+def draw_population(params, rng):
+    """All random inputs for one run, drawn vectorized"""
+    rates = params['weights'] * params['rate'] * params['load']
+    n = int(rng.poisson(rates.sum() * params['duration']))
+    calls = params['max_calls']
+
+    skip = rng.random((n, calls)) < params['skip_probability']
+    population = {
+        'n': n,
+        'arrive': np.sort(rng.uniform(0, params['duration'], n)),
+        'hobby': rng.choice(len(rates), n, p=rates / rates.sum()),
+        'ip': rng.integers(0, max(1, int(n / params['users_per_ip'])), n),
+        'patience': rng.exponential(params['patience'], n),
+        'call_len': np.where(skip,
+                             rng.exponential(params['skip_seconds'], (n, calls)),
+                             rng.exponential(params['call_seconds'], (n, calls))),
+        'stay': rng.random((n, calls)) < params['next_probability'],
+        'report': rng.random((n, calls)) < params['report_probability']
+    }
+    population['hobby'][rng.random(n) < params['no_hobby_fraction']] = -1
+    return population
+
+
+class Simulation:
+    def __init__(self, params, population):
+        self.params = params
+        self.policy = params['policy']
+        self.pop = population
+        n = population['n']
+
+        self.events = []
+        self.sequence = itertools.count()
+        self.calls = np.zeros(n, dtype=np.int64)
+        self.waiting_since = np.full(n, np.nan)
+        self.wait_token = np.zeros(n, dtype=np.int64)
+        self.reports = np.zeros(n, dtype=np.int64)
+        self.blocked_until = np.zeros(n)
+        self.history = {}
+
+        # Waiting users in FIFO order: one queue per hobby, or one global queue
+        self.queues = {}
+
+        # Waiting episodes: (start, end, hobby, matched)
+        self.episodes = []
+        self.matches = 0
+        self.repeat_pairs = 0
+        self.cross_hobby = 0
+        self.refused = 0
+
+    def push(self, t, kind, a, b=0):
+        heapq.heappush(self.events, (t, next(self.sequence), kind, a, b))
+
+    def queue_key(self, user):
+        return 0 if self.policy == 'socketmanager' else self.pop['hobby'][user]
+
+    def met_recently(self, a, b, t):
+        for partner, met_at in self.history.get(a, ()):
+            if partner == b:
+                return t - met_at < REMATCH_WINDOW_S
+        return False
+
+    def compatible(self, a, b, t):
+        pop = self.pop
+        if self.policy == 'socketmanager':
+            if t < self.blocked_until[a] or t < self.blocked_until[b]:
+                return False
+            if pop['ip'][a] == pop['ip'][b]:
+                return False
+            hobby_a, hobby_b = pop['hobby'][a], pop['hobby'][b]
+            return hobby_a < 0 or hobby_b < 0 or hobby_a == hobby_b
+        if self.policy == 'server-no-history':
+            return True
+        return not self.met_recently(a, b, t)
+
+    def search(self, user, t):
+        """findMatch: match with the first compatible waiting user, or wait"""
+        if self.policy != 'socketmanager':
+            if self.pop['hobby'][user] < 0 or t < self.blocked_until[user]:
+                # Refused by the server: no hobby set, or banned
+                self.refused += 1
+                return
+        if np.isnan(self.waiting_since[user]):
+            self.waiting_since[user] = t
+
+        queue = self.queues.setdefault(self.queue_key(user), {})
+        for candidate in queue:
+            if self.compatible(user, candidate, t):
+                del queue[candidate]
+                self.match(user, candidate, t)
+                return
+
+        queue[user] = True
+        self.wait_token[user] += 1
+        self.push(t + self.pop['patience'][user], ABANDON, user, self.wait_token[user])
+        if self.policy == 'fallback':
+            self.push(t + self.params['fallback_seconds'], FALLBACK, user, self.wait_token[user])
+
+    def fallback(self, user, t):
+        """Offer a long-waiting user the oldest compatible user in any other hobby queue"""
+        best = None
+        for key, queue in self.queues.items():
+            if key == self.queue_key(user):
+                continue
+            for candidate in queue:
+                if self.compatible(user, candidate, t):
+                    if best is None or self.waiting_since[candidate] < self.waiting_since[best[1]]:
+                        best = (key, candidate)
+                    break
+        if best is None:
+            self.push(t + self.params['fallback_seconds'], FALLBACK, user, self.wait_token[user])
+            return
+        del self.queues[self.queue_key(user)][user]
+        del self.queues[best[0]][best[1]]
+        self.cross_hobby += 1
+        self.match(user, best[1], t)
+
+    def end_wait(self, user, t, matched):
+        self.episodes.append((self.waiting_since[user], t, self.pop['hobby'][user], matched))
+        self.waiting_since[user] = np.nan
+        self.wait_token[user] += 1
+
+    def match(self, a, b, t):
+        if self.met_recently(a, b, t):
+            self.repeat_pairs += 1
+        for user, partner in ((a, b), (b, a)):
+            history = self.history.setdefault(user, deque(maxlen=PARTNER_HISTORY_SIZE))
+            history.appendleft((partner, t))
+            self.end_wait(user, t, True)
+        self.matches += 1
+
+        # The call lasts until the first of the two planned lengths; that user ends it
+        length_a = self.pop['call_len'][a, self.calls[a]]
+        length_b = self.pop['call_len'][b, self.calls[b]]
+        ender, partner = (a, b) if length_a <= length_b else (b, a)
+        self.calls[a] += 1
+        self.calls[b] += 1
+        self.push(t + min(length_a, length_b), CALL_END, ender, partner)
+
+    def end_call(self, ender, partner, t):
+        call = self.calls[ender] - 1
+        if self.pop['report'][ender, call]:
+            self.reports[partner] += 1
+            if self.policy == 'socketmanager':
+                self.blocked_until[partner] = t + REPORT_BLOCK_S
+            elif self.reports[partner] >= VIOLATION_BAN_THRESHOLD:
+                self.blocked_until[partner] = t + VIOLATION_BAN_S
+
+        # The partner is requeued by the server before the ender's next search
+        if self.calls[partner] < self.params['max_calls']:
+            self.search(partner, t)
+        if self.pop['stay'][ender, call] and self.calls[ender] < self.params['max_calls']:
+            self.search(ender, t)
+
+    def abandon(self, user, token, t):
+        if token != self.wait_token[user]:
+            return
+        del self.queues[self.queue_key(user)][user]
+        self.end_wait(user, t, False)
+
+    def run(self):
+        for user, t in enumerate(self.pop['arrive']):
+            self.push(t, ARRIVE, user)
+
+        end = self.params['duration']
+        while self.events:
+            t, _, kind, a, b = heapq.heappop(self.events)
+            if t > end:
+                break
+            if kind == ARRIVE:
+                self.search(a, t)
+            elif kind == CALL_END:
+                self.end_call(a, b, t)
+            elif kind == ABANDON:
+                self.abandon(a, b, t)
+            elif kind == FALLBACK and b == self.wait_token[a]:
+                self.fallback(a, t)
+
+        # Users still waiting at the end are censored episodes
+        for queue in self.queues.values():
+            for user in queue:
+                self.episodes.append((self.waiting_since[user], end, self.pop['hobby'][user], False))
+
+
+def queue_depth(starts, ends, grid):
+    """Users waiting at each grid time: episodes started minus episodes ended"""
+    return (np.searchsorted(np.sort(starts), grid, side='right')
+            - np.searchsorted(np.sort(ends), grid, side='right'))
+
+
+def percentiles(values):
+    if len(values) == 0:
+        return {'p50': None, 'p90': None, 'p99': None, 'mean': None}
+    p50, p90, p99 = np.percentile(values, [50, 90, 99])
+    return {'p50': round(float(p50), 2), 'p90': round(float(p90), 2),
+            'p99': round(float(p99), 2), 'mean': round(float(values.mean()), 2)}
+
+
+def summarize(params, sim, points):
+    episodes = np.array(sim.episodes, dtype=float).reshape(-1, 4)
+    starts, ends, hobbies, matched = episodes.T
+    matched = matched.astype(bool)
+    waits = ends - starts
+
+    # Steady state only: episodes that started after the warm-up
+    steady = starts >= params['warmup']
+    matched_waits = waits[steady & matched]
+    abandoned = steady & ~matched & (ends < params['duration'])
+
+    grid = np.linspace(0, params['duration'], points)
+    by_hobby = {
+        name: queue_depth(starts[hobbies == code], ends[hobbies == code], grid).tolist()
+        for code, name in enumerate(HOBBIES)
+        if np.any(hobbies == code)
+    }
+    histogram, _ = np.histogram(matched_waits, bins=WAIT_BINS)
+
+    return {
+        'params': {key: value for key, value in params.items() if key != 'weights'},
+        'users': sim.pop['n'],
+        'matches': sim.matches,
+        'repeatPairs': sim.repeat_pairs,
+        'crossHobbyMatches': sim.cross_hobby,
+        'refusedSearches': sim.refused,
+        'abandonRate': round(float(abandoned.sum() / max(steady.sum(), 1)), 4),
+        'waitSeconds': percentiles(matched_waits),
+        'waitHistogram': {
+            'boundsSeconds': [round(float(bound), 3) for bound in WAIT_BINS[1:]],
+            'counts': histogram.tolist()
+        },
+        'queueDepth': {
+            'timeSeconds': grid.round(1).tolist(),
+            'total': queue_depth(starts, ends, grid).tolist(),
+            'byHobby': by_hobby
+        }
+    }
+
+
+def parse_hobbies(spec):
+    if not spec:
+        return np.full(len(HOBBIES), 1 / len(HOBBIES))
+    weights = np.zeros(len(HOBBIES))
+    for part in spec.split(','):
+        name, _, weight = part.partition('=')
+        if name not in HOBBIES:
+            raise SystemExit('unknown hobby: %s' % name)
+        weights[HOBBIES.index(name)] = float(weight or 1)
+    return weights / weights.sum()
+
+
+def parse_list(spec, cast):
+    return [cast(value) for value in spec.split(',')]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Simulate Stranger Face matchmaking for capacity planning')
+    parser.add_argument('--policy', default='server', help='comma-separated: ' + ', '.join(POLICIES))
+    parser.add_argument('--load', default='1', help='comma-separated traffic multipliers to sweep')
+    parser.add_argument('--rate', type=float, default=1.0, help='arrivals per second at load 1')
+    parser.add_argument('--hobbies', help='hobby mix as name=weight,... (default: uniform)')
+    parser.add_argument('--hours', type=float, default=1.0, help='simulated time per scenario')
+    parser.add_argument('--warmup', type=float, default=300, help='seconds excluded from wait statistics')
+    parser.add_argument('--max-calls', type=int, default=10, help='calls per user before leaving')
+    parser.add_argument('--call-seconds', default='60', help='mean call length (sweepable)')
+    parser.add_argument('--skip-probability', default='0.4', help='chance a call is skipped early (sweepable)')
+    parser.add_argument('--skip-seconds', type=float, default=5, help='mean length of a skipped call')
+    parser.add_argument('--next-probability', default='0.8', help='chance of next instead of leaving (sweepable)')
+    parser.add_argument('--patience', default='60', help='mean seconds a user waits before leaving (sweepable)')
+    parser.add_argument('--report-probability', type=float, default=0.01, help='chance a call ends with a report')
+    parser.add_argument('--no-hobby-fraction', type=float, default=0.0, help='users without a hobby')
+    parser.add_argument('--users-per-ip', type=float, default=1.0, help='mean users sharing one IP (NAT)')
+    parser.add_argument('--fallback-seconds', type=float, default=20, help='wait before the fallback policy widens')
+    parser.add_argument('--points', type=int, default=120, help='samples per queue-depth curve')
+    parser.add_argument('--seed', type=int, default=1, help='random seed')
+    parser.add_argument('--out', help='write the sweep JSON here instead of stdout')
+    args = parser.parse_args()
+
+    policies = parse_list(args.policy, str)
+    for policy in policies:
+        if policy not in POLICIES:
+            raise SystemExit('unknown policy: %s' % policy)
+
+    grid = list(itertools.product(
+        policies,
+        parse_list(args.load, float),
+        parse_list(args.call_seconds, float),
+        parse_list(args.skip_probability, float),
+        parse_list(args.next_probability, float),
+        parse_list(args.patience, float)
+    ))
+
+    traffic = {key: i for i, key in enumerate(dict.fromkeys(point[1:] for point in grid))}
+
+    scenarios = []
+    for index, (policy, load, call_seconds, skip_probability, next_probability, patience) in enumerate(grid):
+        params = {
+            'policy': policy,
+            'load': load,
+            'rate': args.rate,
+            'weights': parse_hobbies(args.hobbies),
+            'duration': args.hours * 3600,
+            'warmup': args.warmup,
+            'max_calls': args.max_calls,
+            'call_seconds': call_seconds,
+            'skip_probability': skip_probability,
+            'skip_seconds': args.skip_seconds,
+            'next_probability': next_probability,
+            'patience': patience,
+            'report_probability': args.report_probability,
+            'no_hobby_fraction': args.no_hobby_fraction,
+            'users_per_ip': args.users_per_ip,
+            'fallback_seconds': args.fallback_seconds
+        }
+
+        # Same traffic for every policy at a given point of the grid
+        rng = np.random.default_rng([args.seed, traffic[grid[index][1:]]])
+
+        started = time.perf_counter()
+        sim = Simulation(params, draw_population(params, rng))
+        sim.run()
+        result = summarize(params, sim, args.points)
+        result['simulationSeconds'] = round(time.perf_counter() - started, 2)
+        scenarios.append(result)
+
+        wait = result['waitSeconds']
+        print('%-18s load %-5g users %-8d matches %-8d wait p50 %-7s p99 %-7s abandon %.1f%%'
+              % (policy, load, result['users'], result['matches'], wait['p50'], wait['p99'],
+                 100 * result['abandonRate']), file=sys.stderr)
+
+    output = json.dumps({'scenarios': scenarios}, indent=2)
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            f.write(output)
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,288 @@
+# Offline report analytics for the trust & safety team
+#
+# Streams the backend report log (backend/logs/reports/reports-*.log[.gz]) in chunks,
+# turns each chunk into NumPy column arrays and aggregates them vectorized:
+#   - daily rollups by reason, country, hobby and hour of day
+#   - top reported users (Misra-Gries heavy hitters, bounded memory)
+#   - hourly time series
+# Records without a parseable timestamp are counted as undated and left out of the daily
+# and hourly rollups (they still count toward top offenders).
+# Memory is bounded by the chunk size and the number of distinct categories, not the
+# size of the log.
+#
+# Usage:
+#   python report_analytics.py [LOG_DIR] [--out rollup.json]
+#   python report_analytics.py --benchmark 50000000     # synthetic log benchmark
+import argparse
+import gzip
+import json
+import os
+import re
+import resource
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+
+import numpy as np
+
+DEFAULT_LOG_DIR = os.path.join('backend', 'logs', 'reports')
+SEGMENT_PATTERN = re.compile(r'^reports-(\d+)\.log(\.gz)?$')
+
+REASONS = ['inappropriate_behavior', 'harassment', 'nudity', 'spam', 'underage', 'violence', 'other']
+HOBBIES = ['singing', 'dancing', 'music', 'coding', 'gaming', 'art', 'books', 'travel']
+
+# Combined (day, category) keys: day index * KEY_STRIDE + category code
+KEY_STRIDE = 1 << 20
+
+
+def list_segments(log_dir):
+    segments = []
+    for name in os.listdir(log_dir):
+        match = SEGMENT_PATTERN.match(name)
+        if match:
+            segments.append((int(match.group(1)), bool(match.group(2)), os.path.join(log_dir, name)))
+
+    # Skip a .gz whose .log still exists (compression was interrupted)
+    plain = {sequence for sequence, compressed, _ in segments if not compressed}
+    return [path for sequence, compressed, path in sorted(segments)
+            if not (compressed and sequence in plain)]
+
+
+def read_chunks(log_dir, chunk_size):
+    """Yield lists of raw JSON lines, at most chunk_size per list"""
+    chunk = []
+    for path in list_segments(log_dir):
+        opener = gzip.open if path.endswith('.gz') else open
+        with opener(path, 'rb') as segment:
+            for line in segment:
+                if len(line) > 1:
+                    chunk.append(line)
+                    if len(chunk) >= chunk_size:
+                        yield chunk
+                        chunk = []
+    if chunk:
+        yield chunk
+
+
+def parse_chunk(lines):
+    """Parse a chunk with a single json.loads call; torn lines fall back to per-line parsing"""
+    try:
+        return json.loads(b'[' + b','.join(lines) + b']')
+    except ValueError:
+        records = []
+        for line in lines:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                pass
+        return records
+
+
+def parse_timestamps(records):
+    """datetime64[s] per record; NaT where the timestamp is missing or unparseable"""
+    # ISO strings: the first 19 characters parse as datetime64 directly
+    stamps = [record.get('timestamp') or '' for record in records]
+    try:
+        return np.array([stamp[:19] for stamp in stamps], dtype='datetime64[s]')
+    except (ValueError, TypeError):
+        parsed = np.empty(len(stamps), dtype='datetime64[s]')
+        for i, stamp in enumerate(stamps):
+            try:
+                parsed[i] = np.datetime64(stamp[:19], 's')
+            except (ValueError, TypeError):
+                parsed[i] = np.datetime64('NaT')
+        return parsed
+
+
+def encode(records, field, table):
+    """Map a string field to integer codes, growing table as new values appear"""
+    return np.fromiter(
+        (table.setdefault(record.get(field) or 'unknown', len(table)) for record in records),
+        dtype=np.int64,
+        count=len(records)
+    )
+
+
+class Rollup:
+    def __init__(self, top_capacity=10000):
+        self.tables = {dimension: {} for dimension in ('reason', 'country', 'hobby')}
+        self.daily = {dimension: Counter() for dimension in self.tables}
+        self.daily_hours = Counter()
+        self.daily_totals = Counter()
+        self.hourly = Counter()
+        self.top_capacity = top_capacity
+        self.offenders = Counter()
+        self.records = 0
+        self.undated = 0
+
+    def add(self, records):
+        n = len(records)
+        if n == 0:
+            return
+        self.records += n
+
+        reported = np.array([record.get('reportedUserId') or '' for record in records])
+        users, counts = np.unique(reported, return_counts=True)
+        self.offenders.update(dict(zip(users.tolist(), counts.tolist())))
+        self.trim_offenders()
+
+        # Undated records have no day or hour to go into
+        stamps = parse_timestamps(records)
+        dated = ~np.isnat(stamps)
+        if not dated.all():
+            self.undated += int(n - dated.sum())
+            records = [record for record, keep in zip(records, dated) if keep]
+            stamps = stamps[dated]
+            if len(records) == 0:
+                return
+
+        hours = stamps.astype('datetime64[h]')
+        days = stamps.astype('datetime64[D]')
+        day_index = days.astype(np.int64)
+        hour_of_day = (hours - days).astype(np.int64)
+
+        accumulate(self.daily_totals, day_index)
+        accumulate(self.hourly, hours.astype(np.int64))
+        accumulate(self.daily_hours, day_index * KEY_STRIDE + hour_of_day)
+
+        for dimension, table in self.tables.items():
+            codes = encode(records, dimension, table)
+            accumulate(self.daily[dimension], day_index * KEY_STRIDE + codes)
+
+    def trim_offenders(self):
+        """Misra-Gries: keep at most top_capacity candidates by subtracting the cut-off count"""
+        if len(self.offenders) <= self.top_capacity:
+            return
+        counts = np.fromiter(self.offenders.values(), dtype=np.int64, count=len(self.offenders))
+        cutoff = np.partition(counts, -self.top_capacity - 1)[-self.top_capacity - 1]
+        self.offenders = Counter({
+            user: count - cutoff for user, count in self.offenders.items() if count > cutoff
+        })
+
+    def result(self, top):
+        names = {dimension: {code: name for name, code in table.items()}
+                 for dimension, table in self.tables.items()}
+
+        days = defaultdict(lambda: {
+            'total': 0,
+            'byReason': {},
+            'byCountry': {},
+            'byHobby': {},
+            'byHour': [0] * 24
+        })
+        for day, count in self.daily_totals.items():
+            days[day]['total'] = count
+        for key, count in self.daily_hours.items():
+            days[key // KEY_STRIDE]['byHour'][key % KEY_STRIDE] = count
+        for dimension, field in (('reason', 'byReason'), ('country', 'byCountry'), ('hobby', 'byHobby')):
+            for key, count in self.daily[dimension].items():
+                days[key // KEY_STRIDE][field][names[dimension][key % KEY_STRIDE]] = count
+
+        return {
+            'records': self.records,
+            'undatedRecords': self.undated,
+            'days': {str(np.datetime64(day, 'D')): days[day] for day in sorted(days)},
+            # Counts are lower bounds once the candidate set has been trimmed
+            'topOffenders': [
+                {'reportedUserId': user, 'reports': count}
+                for user, count in self.offenders.most_common(top)
+            ],
+            'hourly': {
+                str(np.datetime64(hour, 'h')): self.hourly[hour] for hour in sorted(self.hourly)
+            }
+        }
+
+
+def accumulate(counter, keys):
+    values, counts = np.unique(keys, return_counts=True)
+    counter.update(dict(zip(values.tolist(), counts.tolist())))
+
+
+def analyze(log_dir, chunk_size, top):
+    rollup = Rollup()
+    for lines in read_chunks(log_dir, chunk_size):
+        rollup.add(parse_chunk(lines))
+    return rollup.result(top)
+
+
+def write_synthetic_log(log_dir, records, segment_records=5000000, seed=7):
+    """Write a synthetic gzipped report log shaped like the backend's"""
+    rng = np.random.default_rng(seed)
+    countries = ['US', 'GB', 'DE', 'FR', 'IN', 'BR', 'JP', 'KR', 'CA', 'AU', 'MX', 'TR', 'XX']
+    start = np.datetime64('2026-01-01T00:00:00', 's').astype(np.int64)
+    batch = 100000
+
+    written = 0
+    sequence = 1
+    while written < records:
+        path = os.path.join(log_dir, 'reports-%06d.log.gz' % sequence)
+        with gzip.open(path, 'wb', compresslevel=1) as segment:
+            in_segment = 0
+            while in_segment < segment_records and written < records:
+                n = min(batch, segment_records - in_segment, records - written)
+                stamps = (start + np.sort(rng.integers(0, 30 * 86400, n))).astype('datetime64[s]')
+                reasons = rng.choice(REASONS, n, p=[0.3, 0.2, 0.1, 0.2, 0.05, 0.05, 0.1])
+                country = rng.choice(countries, n)
+                hobby = rng.choice(HOBBIES, n)
+                # Zipf-distributed offenders so there are real heavy hitters
+                users = rng.zipf(1.3, n) % 1000000
+                lines = [
+                    '{"id":"%d","reportedUserId":"u%d","reporterIP":"10.0.0.1","reason":"%s",'
+                    '"country":"%s","hobby":"%s","timestamp":"%s.000Z","status":"pending"}\n'
+                    % (written + i, users[i], reasons[i], country[i], hobby[i], stamps[i])
+                    for i in range(n)
+                ]
+                segment.write(''.join(lines).encode())
+                written += n
+                in_segment += n
+        sequence += 1
+
+
+def benchmark(records, chunk_size, top):
+    with tempfile.TemporaryDirectory() as log_dir:
+        print('Writing %d synthetic records to %s ...' % (records, log_dir), file=sys.stderr)
+        started = time.perf_counter()
+        write_synthetic_log(log_dir, records)
+        print('  written in %.1fs' % (time.perf_counter() - started), file=sys.stderr)
+
+        started = time.perf_counter()
+        result = analyze(log_dir, chunk_size, top)
+        elapsed = time.perf_counter() - started
+
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return {
+        'records': result['records'],
+        'chunkSize': chunk_size,
+        'seconds': round(elapsed, 2),
+        'recordsPerSecond': int(result['records'] / elapsed),
+        'peakRssMb': round(peak_mb, 1),
+        'days': len(result['days'])
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Daily rollups of Stranger Face reports')
+    parser.add_argument('log_dir', nargs='?', default=DEFAULT_LOG_DIR, help='report log directory')
+    parser.add_argument('--chunk-size', type=int, default=500000, help='records parsed per chunk')
+    parser.add_argument('--top', type=int, default=20, help='number of top offenders to list')
+    parser.add_argument('--out', help='write the rollup JSON here instead of stdout')
+    parser.add_argument('--benchmark', type=int, metavar='RECORDS',
+                        help='benchmark on a synthetic log with this many records')
+    args = parser.parse_args()
+
+    if args.benchmark:
+        result = benchmark(args.benchmark, args.chunk_size, args.top)
+    else:
+        result = analyze(args.log_dir, args.chunk_size, args.top)
+
+    output = json.dumps(result, indent=2)
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            f.write(output)
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()